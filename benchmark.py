@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""
+오프라인 벤치마크
+
+녹화된(또는 합성) 픽스처로 파서, 메트릭 계산, 워크북 저장 단계의
+소요 시간과 최대 메모리를 측정한다. 네트워크/브라우저는 사용하지 않는다.
+
+사용법:
+    python benchmark.py                          # realistic + 10x 측정
+    python benchmark.py --save bench_baseline.json
+    python benchmark.py --compare bench_baseline.json
+    python benchmark.py --fixtures fixtures/     # 녹화된 픽스처 사용
+
+녹화 픽스처 디렉토리 구조 (없는 항목은 합성 데이터로 대체):
+    smbs/YYYY.MM.DD.html   SMBS FxSwapUS.jsp 결과 페이지
+    kmb/*.xls              KMB 파생금리 엑셀 파일
+    krx/KOSPI.csv          pykrx get_market_trading_value_by_date 결과
+    krx/KOSDAQ.csv
+    fx/fx_matrix.csv       fetch_fx_matrix 결과 (행=티커, 열=날짜)
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# realistic 크기 (10x는 각 값에 10을 곱함)
+BASE_SIZES = {
+    "smbs_pages": 20,     # 한 달치 SMBS 결과 페이지
+    "swap_dates": 250,    # 1년치 bid/offer
+    "kmb_rows": 250,      # KMB 엑셀 한 파일
+    "krx_dates": 6700,    # 1998-12 ~ 현재
+    "fx_dates": 4000,     # 2009-12 ~ 현재
+}
+SCALES = {"realistic": 1, "10x": 10}
+EXCEL_MAX_COLS = 16384
+
+TENORS = ["1M", "2M", "3M", "6M", "1Y"]
+KRX_COLUMNS = ["기관합계", "기타법인", "개인", "외국인합계", "전체"]
+FX_SYMBOLS = [
+    "AUDUSD=X", "CAD=X", "CHF=X", "CNY=X", "EURUSD=X", "GBPUSD=X", "IDR=X",
+    "INR=X", "JPY=X", "KRW=X", "MYR=X", "NOK=X", "NZDUSD=X", "PHP=X",
+    "SEK=X", "SGD=X", "THB=X", "TWD=X", "HKD=X", "DX-Y.NYB",
+]
+
+# ==================== 합성 픽스처 ====================
+def _obfuscate(text):
+    """SMBS 페이지의 d1('...') 스크립트 인코딩 흉내 (%_XX)"""
+    return "".join(f"%_{ord(ch):02X}" for ch in text)
+
+def make_smbs_html(date_str, rng):
+    """SMBS FxSwapUS.jsp 결과 페이지와 같은 구조의 HTML"""
+    headers = "".join(f"<th>{h}</th>" for h in ["구분"] + TENORS)
+    rows = []
+    base = rng.uniform(-4.0, -1.0, size=len(TENORS))
+    for side, shift in [("Bid", -0.05), ("Offer", 0.05)]:
+        cells = [f"<td>{side}</td>"]
+        for v in base + shift:
+            cells.append(f"<td><script>d1('{_obfuscate(f'{v:.2f}')}');</script></td>")
+        rows.append("<tr>" + "".join(cells) + "</tr>")
+    filler = "".join(f"<p>navigation {i}</p>" for i in range(200))
+    return (
+        "<html><body>" + filler +
+        "<table><caption>환율 조회</caption><tr><td>-</td></tr></table>"
+        "<table><caption>F/X Swap POINT 결과 표</caption>"
+        f"<thead><tr>{headers}</tr></thead><tbody>{''.join(rows)}</tbody></table>"
+        "</body></html>"
+    )
+
+def make_swap_frame(n_dates, rng):
+    """fetch_fx_swap_points_range_selenium 결과 (날짜별 Bid/Offer 두 행)"""
+    dates = pd.bdate_range(end="2025-06-30", periods=n_dates)
+    mids = rng.uniform(-4.0, -1.0, size=(n_dates, len(TENORS)))
+    bid = pd.DataFrame(mids - 0.05, index=dates, columns=TENORS)
+    offer = pd.DataFrame(mids + 0.05, index=dates, columns=TENORS)
+    bid.insert(0, "Side", "Bid")
+    offer.insert(0, "Side", "Offer")
+    out = pd.concat([bid, offer]).sort_index(kind="stable")
+    out.index.name = "date"
+    return out
+
+def make_kmb_frame(n_rows, rng):
+    """KMB 파생금리 엑셀을 읽은 직후의 프레임 ('전송일'은 YY/MM/DD 문자열)"""
+    dates = pd.bdate_range(end="2025-06-30", periods=n_rows)[::-1]
+    data = {"전송일": pd.Series(dates.strftime("%y/%m/%d"), dtype=object)}
+    for tenor in ["3M", "6M", "9M", "1Y", "2Y", "3Y", "5Y", "10Y"]:
+        data[tenor] = rng.uniform(2.0, 4.0, size=n_rows).round(4)
+    return pd.DataFrame(data)
+
+def make_krx_frame(n_dates, rng):
+    """pykrx get_market_trading_value_by_date 결과와 같은 형태"""
+    dates = pd.bdate_range(end="2025-06-30", periods=n_dates)
+    flows = rng.normal(0, 2e11, size=(n_dates, len(KRX_COLUMNS) - 1))
+    flows[:, -1] = -flows[:, :-1].sum(axis=1)
+    data = np.column_stack([flows, np.zeros(n_dates)]).astype("int64")
+    df = pd.DataFrame(data, index=dates, columns=KRX_COLUMNS)
+    df.index.name = "날짜"
+    return df
+
+def make_fx_matrix(n_dates, rng):
+    """fetch_fx_matrix 결과 (행=티커, 열=날짜) - 일부 결측 포함"""
+    dates = pd.bdate_range(end="2025-06-30", periods=n_dates)
+    start = rng.uniform(0.5, 1500.0, size=len(FX_SYMBOLS))
+    steps = rng.normal(0, 0.005, size=(len(FX_SYMBOLS), n_dates))
+    values = start[:, None] * np.exp(np.cumsum(steps, axis=1))
+    values[rng.random(values.shape) < 0.01] = np.nan
+    return pd.DataFrame(values, index=FX_SYMBOLS, columns=dates)
+
+# ==================== 녹화 픽스처 ====================
+def load_fixtures(fixtures_dir, scale, rng):
+    """녹화 픽스처를 읽고, 없는 항목은 합성 데이터로 채워 scale배로 늘림"""
+    sizes = {k: v * scale for k, v in BASE_SIZES.items()}
+    fx = {}
+
+    pages = sorted(glob.glob(os.path.join(fixtures_dir or "", "smbs", "*.html"))) if fixtures_dir else []
+    if pages:
+        recorded = []
+        for p in pages:
+            with open(p, encoding="utf-8") as f:
+                recorded.append((os.path.splitext(os.path.basename(p))[0], f.read()))
+        fx["smbs_pages"] = [recorded[i % len(recorded)] for i in range(sizes["smbs_pages"])]
+    else:
+        dates = pd.bdate_range(end="2025-06-30", periods=sizes["smbs_pages"]).strftime("%Y.%m.%d")
+        fx["smbs_pages"] = [(d, make_smbs_html(d, rng)) for d in dates]
+
+    fx["swap_frame"] = make_swap_frame(sizes["swap_dates"], rng)
+
+    xls = sorted(glob.glob(os.path.join(fixtures_dir or "", "kmb", "*.xls"))) if fixtures_dir else []
+    if xls:
+        recorded = pd.read_excel(xls[0])
+        reps = -(-sizes["kmb_rows"] // max(len(recorded), 1))
+        fx["kmb_frame"] = pd.concat([recorded] * reps, ignore_index=True).iloc[:sizes["kmb_rows"]]
+    else:
+        fx["kmb_frame"] = make_kmb_frame(sizes["kmb_rows"], rng)
+
+    for market in ["KOSPI", "KOSDAQ"]:
+        path = os.path.join(fixtures_dir or "", "krx", f"{market}.csv")
+        if fixtures_dir and os.path.exists(path):
+            fx[f"krx_{market}"] = _tile_dates(pd.read_csv(path, index_col=0, parse_dates=True), sizes["krx_dates"])
+        else:
+            fx[f"krx_{market}"] = make_krx_frame(sizes["krx_dates"], rng)
+
+    path = os.path.join(fixtures_dir or "", "fx", "fx_matrix.csv")
+    if fixtures_dir and os.path.exists(path):
+        recorded = pd.read_csv(path, index_col=0)
+        recorded.columns = pd.to_datetime(recorded.columns)
+        fx["fx_matrix"] = _tile_dates(recorded.T, sizes["fx_dates"]).T
+    else:
+        fx["fx_matrix"] = make_fx_matrix(sizes["fx_dates"], rng)
+
+    return fx
+
+def _tile_dates(df, n_dates):
+    """녹화 데이터를 반복해 n_dates 영업일 길이로 늘림 (날짜는 다시 부여)"""
+    reps = -(-n_dates // max(len(df), 1))
+    out = pd.concat([df] * reps).iloc[-n_dates:].copy()
+    out.index = pd.bdate_range(end=df.index.max(), periods=n_dates)
+    return out
+
+# ==================== 측정 ====================
+def measure(func, repeat=3):
+    """
+    단계 하나의 소요 시간과 최대 메모리 측정
+
+    메모리는 tracemalloc으로 한 번 측정하고, 시간은 tracemalloc을 끈 상태에서
+    repeat번 측정해 최소/중앙값을 기록한다.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - t0)
+
+    return {
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "peak_mb": peak / 1024 / 1024,
+    }
+
+def build_stages(fx, workdir):
+    """측정할 단계 목록 {단계명: 인자 없는 함수}"""
+    import fx_swap_updater
+    import fx_analyze
+    import irs_crs
+    import trading_value_kospi
+    from workbook import publish_sheets
+
+    swap_raw = fx["swap_frame"]
+    krx_both = fx["krx_KOSPI"].add(fx["krx_KOSDAQ"], fill_value=0)
+    fx_clean = fx_analyze.clean_fx_matrix(fx["fx_matrix"])
+    # FX_Data는 날짜가 열이므로 Excel 열 한도(인덱스 열 제외)까지만 기록
+    fx_sheet = fx_clean.iloc[:, -(EXCEL_MAX_COLS - 1):]
+
+    def parse_smbs():
+        for date_str, html in fx["smbs_pages"]:
+            fx_swap_updater._parse_table(html, date_str)
+
+    def publish():
+        path = os.path.join(workdir, "bench.xlsx")
+        pd.DataFrame().to_excel(path, sheet_name="Sheet1")
+        # 카탈로그도 작업 디렉토리에 기록 (운영 data_catalog.json 항목을 덮어쓰지 않음)
+        publish_sheets(path, {
+            "Swap_Point": fx_swap_updater.calculate_mid_values(swap_raw),
+            "FX_Data": fx_sheet,
+            "Kospi_Liquidity": trading_value_kospi.compute_foreign_flow_metrics(krx_both),
+        }, catalog_file=os.path.join(workdir, "data_catalog.json"))
+
+    return {
+        "smbs_parse_table": parse_smbs,
+        "swap_calculate_mid_values": lambda: fx_swap_updater.calculate_mid_values(swap_raw),
+        "kmb_normalize": lambda: irs_crs.format_kmb_dates(irs_crs.normalize_kmb_frame(fx["kmb_frame"].copy())),
+        "krx_foreign_flow": lambda: (
+            trading_value_kospi.compute_foreign_flow_metrics(fx["krx_KOSPI"]),
+            trading_value_kospi.compute_foreign_flow_metrics(fx["krx_KOSPI"].add(fx["krx_KOSDAQ"], fill_value=0)),
+        ),
+        "fx_clean_matrix": lambda: fx_analyze.clean_fx_matrix(fx["fx_matrix"]),
+        "fx_basic_metrics": lambda: fx_analyze.calculate_basic_metrics(fx_clean),
+        "workbook_publish": publish,
+    }
+
+def run_benchmarks(fixtures_dir=None, scales=("realistic", "10x"), stages=None, repeat=3, seed=0):
+    """
+    Returns:
+    --------
+    dict
+        {"scale/stage": {"min_s", "median_s", "peak_mb"}}
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in scales:
+            rng = np.random.default_rng(seed)
+            fx = load_fixtures(fixtures_dir, SCALES[scale], rng)
+            for name, func in build_stages(fx, workdir).items():
+                if stages and name not in stages:
+                    continue
+                key = f"{scale}/{name}"
+                try:
+                    results[key] = measure(func, repeat=repeat)
+                except ImportError as e:
+                    print(f"{key}: 건너뜀 ({e})")
+                    continue
+                r = results[key]
+                print(f"{key:<40} {r['median_s'] * 1000:10.1f} ms  (min {r['min_s'] * 1000:.1f})  peak {r['peak_mb']:8.1f} MB")
+    return results
+
+def compare(results, baseline, threshold=1.2):
+    """
+    기준값 대비 비교. 시간 또는 메모리가 threshold배 이상이면 회귀로 표시
+
+    Returns:
+    --------
+    list
+        회귀한 단계명 목록
+    """
+    regressions = []
+    print(f"\n{'stage':<40} {'time x':>8} {'mem x':>8}")
+    for key, r in results.items():
+        base = baseline.get(key)
+        if base is None:
+            print(f"{key:<40} {'(new)':>8}")
+            continue
+        t_ratio = r["median_s"] / base["median_s"] if base["median_s"] else float("inf")
+        m_ratio = r["peak_mb"] / base["peak_mb"] if base["peak_mb"] else float("inf")
+        flag = ""
+        if t_ratio >= threshold or m_ratio >= threshold:
+            regressions.append(key)
+            flag = "  <-- 회귀"
+        print(f"{key:<40} {t_ratio:8.2f} {m_ratio:8.2f}{flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="오프라인 파서/메트릭/저장 벤치마크")
+    parser.add_argument("--fixtures", help="녹화 픽스처 디렉토리")
+    parser.add_argument("--scale", action="append", choices=list(SCALES), help="측정할 크기 (기본: 전체)")
+    parser.add_argument("--stage", action="append", help="측정할 단계 (기본: 전체)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="결과를 JSON 기준값으로 저장")
+    parser.add_argument("--compare", help="JSON 기준값과 비교")
+    parser.add_argument("--threshold", type=float, default=1.2, help="회귀 판정 배수 (기본 1.2)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        fixtures_dir=args.fixtures,
+        scales=args.scale or list(SCALES),
+        stages=args.stage,
+        repeat=args.repeat,
+    )
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\n기준값 저장: {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+공유 Chrome 드라이버 풀
+
+SMBS(fx_swap_updater)와 KMB(irs_crs) 크롤러가 Chrome을 매번 새로 띄우지 않고
+미리 띄워 둔 headless 인스턴스를 빌려 쓰고 반납한다.
+반납 시 상태를 점검해 이상이 있는 인스턴스는 종료하고 버린다.
+이미지/CSS/폰트 요청은 기본으로 차단한다.
+
+사용 예:
+    from browser_pool import get_pool
+
+    with get_pool().lease() as driver:
+        driver.get(url)
+"""
+import atexit
+import contextlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import span
+
+# 차단할 리소스 (Network.setBlockedURLs 패턴)
+BLOCKED_URLS = [
+    "*.css", "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf",
+]
+
+class DriverPool:
+    def __init__(self, max_size=2, headless=True, block_assets=True, page_load_timeout=30):
+        """
+        Parameters:
+        -----------
+        max_size : int
+            동시에 띄울 수 있는 최대 Chrome 인스턴스 수
+        headless : bool
+            headless 모드 여부
+        block_assets : bool
+            이미지/CSS/폰트 차단 여부
+        page_load_timeout : int
+            페이지 로딩 제한 시간 (초)
+        """
+        self.max_size = max_size
+        self.headless = headless
+        self.block_assets = block_assets
+        self.page_load_timeout = page_load_timeout
+        self._idle = []
+        self._created = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def _create_driver(self):
+        """Chrome 인스턴스 생성 (SMBS/KMB 공통 옵션)"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options as ChromeOptions
+
+        opts = ChromeOptions()
+        if self.headless:
+            opts.add_argument("--headless=new")
+        opts.add_argument("--no-sandbox")
+        opts.add_argument("--disable-gpu")
+        opts.add_argument("--disable-dev-shm-usage")
+        opts.add_argument("--lang=ko-KR")
+        opts.add_argument("--window-size=1920,1080")
+        opts.add_argument("--disable-blink-features=AutomationControlled")
+        opts.add_experimental_option("excludeSwitches", ["enable-automation"])
+        opts.add_experimental_option("useAutomationExtension", False)
+        prefs = {
+            "download.prompt_for_download": False,
+            "download.directory_upgrade": True,
+            "safebrowsing.enabled": True,
+        }
+        if self.block_assets:
+            prefs["profile.managed_default_content_settings.images"] = 2
+        opts.add_experimental_option("prefs", prefs)
+
+        with span("browser_pool", "fetch", step="launch"):
+            drv = webdriver.Chrome(options=opts)
+        drv.set_page_load_timeout(self.page_load_timeout)
+        if self.block_assets:
+            drv.execute_cdp_cmd("Network.enable", {})
+            drv.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+        return drv
+
+    @staticmethod
+    def _is_healthy(driver):
+        """반납된 인스턴스 점검 후 빈 페이지로 초기화"""
+        try:
+            driver.execute_script("return 1;")
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+            return len(driver.window_handles) == 1
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def warm(self, n=None):
+        """n개(기본: max_size)까지 인스턴스를 미리 병렬로 띄워 둠"""
+        with self._cond:
+            n = min(n or self.max_size, self.max_size) - self._created
+            if n <= 0:
+                return
+            self._created += n
+
+        with ThreadPoolExecutor(max_workers=n) as ex:
+            futures = [ex.submit(self._create_driver) for _ in range(n)]
+        with self._cond:
+            for f in futures:
+                if f.exception() is None and self._closed:
+                    self._created -= 1
+                    self._quit(f.result())
+                elif f.exception() is None:
+                    self._idle.append(f.result())
+                else:
+                    self._created -= 1
+                    print(f"브라우저 예열 실패: {f.exception()}")
+            self._cond.notify_all()
+
+    def acquire(self, download_path=None, timeout=None):
+        """
+        유휴 인스턴스를 빌림 (없고 여유가 있으면 새로 생성, 아니면 반납까지 대기)
+
+        Parameters:
+        -----------
+        download_path : str or None
+            파일 다운로드 경로 (KMB 엑셀 다운로드용)
+        timeout : float or None
+            반납 대기 최대 시간 (초)
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("이미 종료된 드라이버 풀입니다.")
+            while not self._idle and self._created >= self.max_size:
+                if not self._cond.wait(timeout):
+                    raise TimeoutError("사용 가능한 브라우저가 없습니다.")
+            if self._idle:
+                driver = self._idle.pop()
+            else:
+                driver = None
+                self._created += 1
+
+        if driver is None:
+            try:
+                driver = self._create_driver()
+            except Exception:
+                with self._cond:
+                    self._created -= 1
+                    self._cond.notify()
+                raise
+
+        if download_path:
+            driver.execute_cdp_cmd("Page.setDownloadBehavior", {
+                "behavior": "allow", "downloadPath": download_path,
+            })
+        return driver
+
+    def release(self, driver):
+        """인스턴스 반납 - 점검에 실패하면 종료하고 버림"""
+        healthy = not self._closed and self._is_healthy(driver)
+        if not healthy:
+            self._quit(driver)
+        with self._cond:
+            if healthy:
+                self._idle.append(driver)
+            else:
+                self._created -= 1
+            self._cond.notify()
+
+    @contextlib.contextmanager
+    def lease(self, download_path=None, timeout=None):
+        """acquire/release를 묶은 context manager"""
+        driver = self.acquire(download_path=download_path, timeout=timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def close(self):
+        """유휴 인스턴스 모두 종료 (빌려간 인스턴스는 반납 시 종료)"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+        for driver in idle:
+            self._quit(driver)
+
+# headless 여부별 공유 풀
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(headless=True, max_size=2):
+    """프로세스 전체에서 공유하는 드라이버 풀 반환"""
+    with _pools_lock:
+        pool = _pools.get(headless)
+        if pool is None or pool._closed:
+            pool = _pools[headless] = DriverPool(max_size=max_size, headless=headless)
+        return pool
+
+def close_pools():
+    """모든 공유 풀 종료"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+atexit.register(close_pools)
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+거래소 휴장일 기반 영업일 엔진
+
+pd.bdate_range / BDay는 주말만 제외하므로 한국 공휴일에도 SMBS를 조회하고
+빈 표를 받느라 페이지 한 번을 낭비한다. 이 모듈은 캘린더별 휴장일을
+연도 단위로 캐시하고, 저장된 날짜와 기대 영업일을 비교해 빠진 날짜만 찾는다.
+
+지원 캘린더:
+    KRX       한국거래소 (근로자의날, 연말휴장일 포함)
+    SEOUL_FX  서울 외환시장 (KRX 휴장일 기준)
+    NY        뉴욕 (NYSE)
+
+휴장일은 holidays 패키지를 사용하고, 패키지에 없는 임시 휴장일은
+조회 결과가 비어 있던 날짜를 known_holidays.json에 기록해 다음부터 건너뛴다.
+일시적으로 빈 응답을 받은 영업일이 휴장일로 굳지 않도록, 서로 다른 조회에서
+CLOSURE_CONFIRMATIONS번 비어 있어야 (또는 confirmed=True로 기록해야) 휴장일로 확정한다.
+확정 전 관측 횟수는 같은 파일의 "pending" 항목에 둔다.
+"""
+import json
+import os
+import threading
+from datetime import date, timedelta
+from functools import lru_cache
+
+import pandas as pd
+
+CALENDARS = ("KRX", "SEOUL_FX", "NY")
+DEFAULT_CALENDAR = "SEOUL_FX"
+KNOWN_HOLIDAYS_FILE = "known_holidays.json"
+CLOSURE_CONFIRMATIONS = 2  # 휴장일로 확정하기까지 필요한 빈 조회 횟수
+
+# 캘린더 -> holidays.financial_holidays 시장 코드
+_MARKET_CODES = {
+    "KRX": "XKRX",
+    "SEOUL_FX": "XKRX",
+    "NY": "NYSE",
+}
+
+_lock = threading.Lock()
+_warned = False
+
+def _to_date(d):
+    if isinstance(d, str):
+        return pd.to_datetime(d.replace(".", "-")).date()
+    if isinstance(d, pd.Timestamp):
+        return d.date()
+    if hasattr(d, "date") and callable(d.date):
+        return d.date()
+    return d
+
+# ==================== 휴장일 캐시 ====================
+@lru_cache(maxsize=None)
+def _library_holidays(calendar, year):
+    """holidays 패키지의 연도별 휴장일 (없으면 빈 집합)"""
+    global _warned
+    try:
+        import holidays
+    except ImportError:
+        if not _warned:
+            print("holidays 패키지가 없어 주말과 기록된 휴장일만 제외합니다.")
+            _warned = True
+        return frozenset()
+    return frozenset(holidays.financial_holidays(_MARKET_CODES[calendar], years=year))
+
+def _load_known(path=KNOWN_HOLIDAYS_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def _save_known(known, path=KNOWN_HOLIDAYS_FILE):
+    """빈 pending 항목을 정리하고 원자적으로 저장"""
+    pending = known.get("pending", {})
+    for calendar in [c for c, v in pending.items() if not v]:
+        del pending[calendar]
+    if not pending:
+        known.pop("pending", None)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(known, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+@lru_cache(maxsize=None)
+def _known_holidays(calendar, path=KNOWN_HOLIDAYS_FILE):
+    """조회 결과가 비어 있어 기록된 휴장일"""
+    return frozenset(date.fromisoformat(d) for d in _load_known(path).get(calendar, []))
+
+def holidays_between(start, end, calendar=DEFAULT_CALENDAR):
+    """start~end 사이의 (주말이 아닌) 휴장일 목록"""
+    if calendar not in CALENDARS:
+        raise ValueError(f"calendar must be one of {CALENDARS}")
+    start, end = _to_date(start), _to_date(end)
+    known = _known_holidays(calendar)
+    out = set()
+    for year in range(start.year, end.year + 1):
+        out |= _library_holidays(calendar, year)
+    out |= known
+    return sorted(d for d in out if start <= d <= end and d.weekday() < 5)
+
+def record_closure(d, calendar=DEFAULT_CALENDAR, path=KNOWN_HOLIDAYS_FILE, confirmed=False):
+    """
+    휴장일로 보이는 날짜 기록 (예: SMBS 결과 표가 비어 있던 날)
+
+    빈 결과가 CLOSURE_CONFIRMATIONS번 쌓이거나 confirmed=True이면 휴장일로 확정되어
+    다음 실행부터 sessions()/missing_sessions()에서 제외된다.
+    그 전까지는 영업일로 남아 있으므로 갭 복구에서 다시 조회한다.
+
+    Returns:
+    --------
+    bool
+        휴장일로 확정되었는지 여부
+    """
+    key = _to_date(d).isoformat()
+    with _lock:
+        known = _load_known(path)
+        dates = set(known.get(calendar, []))
+        if key in dates:
+            return True
+        pending = known.setdefault("pending", {}).setdefault(calendar, {})
+        seen = pending.get(key, 0) + 1
+        if confirmed or seen >= CLOSURE_CONFIRMATIONS:
+            pending.pop(key, None)
+            dates.add(key)
+            known[calendar] = sorted(dates)
+        else:
+            pending[key] = seen
+        _save_known(known, path)
+        _known_holidays.cache_clear()
+        return key in dates
+
+def clear_closure(d, calendar=DEFAULT_CALENDAR, path=KNOWN_HOLIDAYS_FILE):
+    """빈 결과 관측 기록 삭제 (그 날짜에 데이터가 확인되었을 때)"""
+    key = _to_date(d).isoformat()
+    with _lock:
+        known = _load_known(path)
+        pending = known.get("pending", {}).get(calendar, {})
+        if key not in pending:
+            return
+        del pending[key]
+        _save_known(known, path)
+
+# ==================== 영업일 ====================
+def sessions(start, end, calendar=DEFAULT_CALENDAR):
+    """
+    start~end (양끝 포함) 영업일
+
+    Returns:
+    --------
+    pd.DatetimeIndex
+    """
+    start, end = _to_date(start), _to_date(end)
+    if start > end:
+        return pd.DatetimeIndex([])
+    return pd.bdate_range(start=start, end=end, freq="C",
+                          holidays=holidays_between(start, end, calendar))
+
+def is_session(d, calendar=DEFAULT_CALENDAR):
+    d = _to_date(d)
+    return d.weekday() < 5 and not holidays_between(d, d, calendar)
+
+def next_session(d, calendar=DEFAULT_CALENDAR):
+    """d 다음 영업일 (datetime.date)"""
+    d = _to_date(d) + timedelta(days=1)
+    while not is_session(d, calendar):
+        d += timedelta(days=1)
+    return d
+
+def missing_sessions(stored_dates, start=None, end=None, calendar=DEFAULT_CALENDAR):
+    """
+    저장된 날짜와 기대 영업일을 비교해 빠진 영업일 반환 (gap detector)
+
+    Parameters:
+    -----------
+    stored_dates : iterable
+        이미 저장된 날짜 (DatetimeIndex, 문자열 등)
+    start, end : date-like or None
+        검사 범위 (기본값: 저장된 첫 날짜 ~ 오늘)
+    calendar : str
+        CALENDARS 중 하나
+
+    Returns:
+    --------
+    pd.DatetimeIndex
+        빠진 영업일 (오름차순)
+    """
+    stored = pd.DatetimeIndex(pd.to_datetime(list(stored_dates))).normalize()
+    if start is None:
+        if stored.empty:
+            raise ValueError("저장된 날짜가 없으면 start를 지정해야 합니다.")
+        start = stored.min()
+    if end is None:
+        end = pd.Timestamp.today()
+    expected = sessions(start, end, calendar)
+    return expected[~expected.isin(stored)]
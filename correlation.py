@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+롤링 상관/베타 행렬 엔진
+
+(통화, 날짜) 수익률 배열에서 모든 통화 쌍(DXY 포함)의 N일 롤링 공분산, 상관계수,
+베타 행렬을 날짜마다 계산한다. indicators와 같이 누적합 차분으로 구간 합을 구하므로
+구간마다 처음부터 다시 계산하지 않는다 (4,000일 x 25 x 25 기준 1초 이내).
+
+매일 한 줄씩 들어오는 데이터는 RollingCovariance로 O(통화 수^2)만에 갱신한다.
+
+결과 모양:
+    행렬 함수   (날짜, 통화, 통화)   -> corr[-1]이 최근 행렬
+    벡터 함수   (통화, 날짜)         indicators와 같은 시간 축 규칙
+
+NaN 규칙은 indicators와 같다 (구간에 NaN이 있으면 해당 쌍은 NaN).
+
+사용 예:
+    import correlation
+
+    result = correlation.fx_correlation(fx_matrix_clean, window=60, flow=flow_series)
+    result["corr"][-1]          # 최근 60일 상관 행렬
+    result["flow_corr"]         # 통화별 수익률 vs 외국인 순매수 롤링 상관
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+import indicators as ind
+
+DEFAULT_WINDOW = 60
+
+def _centered(x):
+    """전체 평균을 뺀 값 (누적합 차분의 자릿수 손실 감소, 공분산은 평행이동에 불변)"""
+    x = np.asarray(x, dtype=float)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        center = np.nanmean(x, axis=-1, keepdims=True) if x.size else 0.0
+    return x - np.nan_to_num(center)
+
+def _corr_from_cov(cov):
+    d = np.sqrt(np.diagonal(cov, axis1=-2, axis2=-1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / (d[..., :, None] * d[..., None, :])
+    return np.clip(corr, -1.0, 1.0, where=~np.isnan(corr), out=corr)
+
+def _beta_from_cov(cov):
+    var = np.diagonal(cov, axis1=-2, axis2=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return cov / var[..., None, :]
+
+# ==================== 배치 계산 ====================
+def rolling_cov(x, window, ddof=1):
+    """
+    window 구간 공분산 행렬
+
+    Parameters:
+    -----------
+    x : array-like
+        (통화, 날짜) 수익률
+    window : int
+        구간 길이
+    ddof : int
+        자유도 보정
+
+    Returns:
+    --------
+    np.ndarray
+        (날짜, 통화, 통화). 앞 window-1일과 NaN이 낀 쌍은 NaN
+    """
+    xc = _centered(x)
+    s1 = ind.rolling_sum(xc, window)                               # (통화, 날짜)
+    s2 = ind.rolling_sum(xc[:, None, :] * xc[None, :, :], window)  # (통화, 통화, 날짜)
+    cov = (s2 - s1[:, None, :] * s1[None, :, :] / window) / (window - ddof)
+    return np.moveaxis(cov, -1, 0)
+
+def rolling_corr_matrix(x, window):
+    """window 구간 상관 행렬 (날짜, 통화, 통화)"""
+    return _corr_from_cov(rolling_cov(x, window))
+
+def rolling_beta_matrix(x, window):
+    """
+    window 구간 베타 행렬 (날짜, 통화, 통화)
+
+    beta[t, i, j]는 통화 i 수익률을 통화 j 수익률에 회귀한 기울기 (cov_ij / var_j)
+    """
+    return _beta_from_cov(rolling_cov(x, window))
+
+def rolling_corr(x, y, window):
+    """
+    각 행과 y 하나의 window 구간 상관계수
+
+    Parameters:
+    -----------
+    x : array-like
+        (통화, 날짜) 또는 (날짜,)
+    y : array-like
+        (날짜,) 비교 대상 (예: 외국인 순매수)
+
+    Returns:
+    --------
+    np.ndarray
+        x와 같은 모양
+    """
+    xc, yc = _centered(x), _centered(y)
+    sx, sy = ind.rolling_sum(xc, window), ind.rolling_sum(yc, window)
+    sxy = ind.rolling_sum(xc * yc, window)
+    sxx, syy = ind.rolling_sum(xc * xc, window), ind.rolling_sum(yc * yc, window)
+    cov = sxy - sx * sy / window
+    var_x = np.maximum(sxx - sx * sx / window, 0.0)
+    var_y = np.maximum(syy - sy * sy / window, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.sqrt(var_x * var_y)
+    return np.clip(corr, -1.0, 1.0, where=~np.isnan(corr), out=corr)
+
+# ==================== 증분 갱신 ====================
+class RollingCovariance:
+    def __init__(self, n, window=DEFAULT_WINDOW, ddof=1):
+        """
+        하루씩 들어오는 수익률 벡터로 최근 window일 공분산을 유지
+
+        들어온 값과 빠지는 값의 외적만 더하고 빼며, window번 갱신할 때마다
+        보관 중인 구간으로 합계를 다시 계산해 부동소수점 오차 누적을 막는다.
+
+        Parameters:
+        -----------
+        n : int
+            통화 수
+        window : int
+            구간 길이
+        ddof : int
+            자유도 보정
+        """
+        self.n, self.window, self.ddof = n, window, ddof
+        self._buf = np.zeros((window, n))           # 최근 window일 (기준값 차감, NaN은 0)
+        self._nan = np.zeros((window, n), dtype=bool)
+        self._shift = None                          # 기준값 (첫 관측치)
+        self._s1 = np.zeros(n)
+        self._s2 = np.zeros((n, n))
+        self._nan_count = np.zeros(n, dtype=np.int64)
+        self.count = 0
+
+    @classmethod
+    def from_history(cls, x, window=DEFAULT_WINDOW, ddof=1):
+        """(통화, 날짜) 이력의 마지막 window일로 초기화"""
+        x = np.asarray(x, dtype=float)
+        rc = cls(x.shape[0], window, ddof)
+        for col in x[:, -window:].T:
+            rc.update(col)
+        return rc
+
+    def _resum(self):
+        self._s1 = self._buf.sum(axis=0)
+        self._s2 = self._buf.T @ self._buf
+
+    def update(self, x):
+        """
+        하루치 수익률 반영
+
+        Parameters:
+        -----------
+        x : array-like
+            (통화,) 수익률. NaN은 해당 통화가 구간에 남아 있는 동안 그 통화 쌍을 NaN으로 만든다
+        """
+        x = np.asarray(x, dtype=float)
+        nan = np.isnan(x)
+        if self._shift is None:
+            self._shift = np.where(nan, 0.0, x)
+        new = np.where(nan, 0.0, x - self._shift)
+
+        slot = self.count % self.window
+        old = self._buf[slot].copy()
+        self._nan_count += nan.astype(np.int64) - self._nan[slot]
+        self._buf[slot] = new
+        self._nan[slot] = nan
+        self.count += 1
+
+        if self.count % self.window == 0:
+            self._resum()
+        else:
+            self._s1 += new - old
+            self._s2 += np.outer(new, new) - np.outer(old, old)
+
+    def cov(self):
+        """현재 공분산 행렬 (통화, 통화). 관측치가 window보다 적으면 NaN"""
+        if self.count < self.window:
+            return np.full((self.n, self.n), np.nan)
+        w = self.window
+        cov = (self._s2 - np.outer(self._s1, self._s1) / w) / (w - self.ddof)
+        bad = self._nan_count > 0
+        cov[bad, :] = np.nan
+        cov[:, bad] = np.nan
+        return cov
+
+    def corr(self):
+        return _corr_from_cov(self.cov())
+
+    def beta(self):
+        return _beta_from_cov(self.cov())
+
+# ==================== FX 유니버스 ====================
+def fx_correlation(fx_matrix, window=DEFAULT_WINDOW, flow=None):
+    """
+    FX 유니버스 전체의 롤링 상관/베타 행렬과 외국인 수급 상관
+
+    Parameters:
+    -----------
+    fx_matrix : pd.DataFrame
+        clean_fx_matrix 결과 (행=통화, 열=날짜)
+    window : int
+        구간 길이 (영업일)
+    flow : pd.Series or None
+        날짜 인덱스의 KOSPI 외국인 순매수. 두 데이터에 모두 있는 날짜에서 (FX 수익률은
+        그 날짜들 사이의 수익률) 계산한 뒤 fx_matrix 날짜로 되돌림 (KRX 휴장일은 NaN)
+
+    Returns:
+    --------
+    dict
+        names, dates, corr / beta (날짜, 통화, 통화), flow_corr (통화, 날짜) 또는 None
+    """
+    dates = pd.DatetimeIndex(fx_matrix.columns)
+    rets = ind.pct_change(fx_matrix.to_numpy(dtype=float))
+    cov = rolling_cov(rets, window)
+
+    flow_corr = None
+    if flow is not None:
+        flow = pd.Series(flow, dtype=float)
+        flow.index = pd.to_datetime(flow.index)
+        flow = flow[~flow.index.duplicated(keep="last")].dropna()
+        pos = np.flatnonzero(dates.isin(flow.index))
+        common_rets = ind.pct_change(fx_matrix.to_numpy(dtype=float)[:, pos])
+        flow_corr = np.full(rets.shape, np.nan)
+        flow_corr[:, pos] = rolling_corr(common_rets, flow.reindex(dates[pos]).to_numpy(), window)
+
+    return {
+        "names": list(fx_matrix.index),
+        "dates": dates,
+        "corr": _corr_from_cov(cov),
+        "beta": _beta_from_cov(cov),
+        "flow_corr": flow_corr,
+    }
+
+def matrix_frame(result, key="corr", date=-1):
+    """fx_correlation 결과의 특정 날짜 행렬을 DataFrame으로 (date: 위치 또는 날짜)"""
+    pos = date if isinstance(date, (int, np.integer)) else result["dates"].get_loc(pd.Timestamp(date))
+    names = result["names"]
+    return pd.DataFrame(result[key][pos], index=names, columns=names)
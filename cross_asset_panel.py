@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+자산 간 정렬 패널
+
+FX 매트릭스, 스왑포인트, IRS/CRS, KOSPI, 수급 지표를 하나의 영업일 인덱스
+(1970-01-01 기준 일수, int64)에 정렬해 둔다. 값은 (컬럼, 날짜) 배열 하나에
+컬럼별로 연속 저장되므로 panel.column(...)은 복사 없는 뷰를 돌려준다.
+
+원천별 날짜 형식은 자동으로 맞춘다:
+    DatetimeIndex 인덱스      fx_swap_mid.csv, Swap_Point
+    'YYYY-MM-DD' 문자열 인덱스  Kospi_Liquidity
+    '날짜' / '전송일' / 'date' 컬럼  Kospi, IRS, CRS, 워크북에서 읽은 Swap_Point
+    날짜가 열 이름인 매트릭스    fetch_fx_matrix / FX_Data (통화 x 날짜)
+
+원천이 새 날짜를 추가하면 update()로 그 행만 반영한다
+(마지막 날짜 이후 추가는 재배치 없이 끝에 기록).
+
+사용 예:
+    panel = Panel()
+    panel.update("fx", fx_matrix_clean)
+    panel.update("flow", kospi_liquidity)
+    krw = panel.column("fx", "USD_KRW")
+    flow = panel.column("flow", "Foreign Net Buying (Daily)")
+"""
+import numpy as np
+import pandas as pd
+
+import business_calendar
+from data_catalog import DATE_COLUMNS  # 날짜로 쓰는 컬럼 (인덱스가 날짜가 아닐 때)
+
+_INITIAL_CAPACITY = 256
+
+def to_days(values):
+    """날짜 배열 -> 1970-01-01 기준 일수 (int64)"""
+    dates = pd.DatetimeIndex(pd.to_datetime(pd.Index(values), format="mixed"))
+    return dates.to_numpy().astype("datetime64[D]").astype(np.int64)
+
+def from_days(days):
+    """일수 (int64) -> DatetimeIndex"""
+    return pd.DatetimeIndex(np.asarray(days, dtype=np.int64).astype("datetime64[D]"))
+
+def _is_date_like(values):
+    if len(values) == 0:
+        return False
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return True
+    if pd.api.types.is_numeric_dtype(values):
+        return False
+    parsed = pd.to_datetime(pd.Index(values).astype(str), errors="coerce", format="mixed")
+    return bool(parsed.notna().all())
+
+def _split_frame(frame):
+    """
+    원천 프레임을 (일수, 값 배열 (날짜, 컬럼), 컬럼명)으로 분리
+
+    숫자가 아닌 컬럼(예: 구분 문자열)은 제외하고, 같은 날짜가 여러 번 나오면 마지막 행을 쓴다.
+    """
+    if _is_date_like(frame.index):
+        dates, body = frame.index, frame
+    else:
+        date_col = next((c for c in DATE_COLUMNS if c in frame.columns), None)
+        if date_col is not None:
+            dates, body = frame[date_col], frame.drop(columns=date_col)
+        elif _is_date_like(frame.columns):
+            dates, body = frame.columns, frame.T
+        else:
+            raise ValueError("날짜 축을 찾을 수 없습니다 (인덱스, 날짜 컬럼, 열 이름 모두 날짜가 아님).")
+
+    body = body.apply(pd.to_numeric, errors="coerce")
+    body = body.loc[:, body.notna().any()]
+    days = to_days(dates)
+    values = body.to_numpy(dtype=float)
+
+    order = np.argsort(days, kind="stable")
+    days, values = days[order], values[order]
+    keep = np.r_[days[1:] != days[:-1], True]
+    return days[keep], values[keep], [str(c) for c in body.columns]
+
+class Panel:
+    def __init__(self, calendar=None):
+        """
+        Parameters:
+        -----------
+        calendar : str or None
+            business_calendar 캘린더명 (예: 'SEOUL_FX'). 지정하면 해당 영업일만 인덱스에 두고
+            휴장일 행은 버린다. None이면 모든 원천 날짜의 합집합
+        """
+        self.calendar = calendar
+        self.skipped = {}  # 날짜 축을 찾지 못해 건너뛴 원천 -> 사유 (build_panel)
+        self.days = np.empty(0, dtype=np.int64)
+        self.columns = {}  # (원천, 컬럼) -> 행 번호
+        self._data = np.full((0, _INITIAL_CAPACITY), np.nan)
+
+    def __len__(self):
+        return len(self.days)
+
+    def _reserve(self, n_days, n_cols):
+        """(컬럼, 날짜) 저장 공간 확보 (날짜 축은 두 배씩 늘림)"""
+        rows, cap = self._data.shape
+        if n_cols <= rows and n_days <= cap:
+            return
+        new_cap = cap
+        while new_cap < n_days:
+            new_cap *= 2
+        grown = np.full((max(rows, n_cols), new_cap), np.nan)
+        grown[:rows, :len(self.days)] = self._data[:, :len(self.days)]
+        self._data = grown
+
+    def _session_filter(self, days, values):
+        if self.calendar is None or len(days) == 0:
+            return days, values
+        start, end = from_days(days[[0, -1]])
+        sessions = to_days(business_calendar.sessions(start, end, self.calendar))
+        keep = np.isin(days, sessions)
+        return days[keep], values[keep]
+
+    def update(self, source, frame):
+        """
+        원천 데이터를 패널에 반영 (새 원천 추가 또는 기존 원천의 새 행/수정 행)
+
+        Parameters:
+        -----------
+        source : str
+            원천 이름 (예: 'fx', 'swap', 'irs', 'crs', 'kospi', 'flow')
+        frame : pd.DataFrame
+            원천 전체 또는 새로 추가된 행만
+
+        Returns:
+        --------
+        int
+            새로 생긴 날짜 수
+        """
+        days, values, names = _split_frame(frame)
+        days, values = self._session_filter(days, values)
+
+        # 새 컬럼에 행 번호 배정
+        for name in names:
+            self.columns.setdefault((source, name), len(self.columns))
+        rows = np.array([self.columns[(source, name)] for name in names], dtype=np.intp)
+
+        n_old = len(self.days)
+        new_days = np.setdiff1d(days, self.days, assume_unique=True)
+        if n_old == 0 or len(new_days) == 0 or new_days[0] > self.days[-1]:
+            # 끝에 추가 (기존 위치 그대로)
+            self._reserve(n_old + len(new_days), len(self.columns))
+            self.days = np.concatenate([self.days, new_days])
+        else:
+            # 중간에 날짜가 끼어들면 합집합 인덱스로 한 번 재배치
+            merged = np.union1d(self.days, new_days)
+            self._reserve(len(merged), len(self.columns))
+            old = self._data[:, :n_old].copy()
+            self._data[:, :len(merged)] = np.nan
+            self._data[:, np.searchsorted(merged, self.days)] = old
+            self.days = merged
+
+        pos = np.searchsorted(self.days, days)
+        self._data[np.ix_(rows, pos)] = values.T
+        return len(new_days)
+
+    def column(self, source, name):
+        """컬럼 값 (복사 없는 1-D 뷰, 패널 날짜 순)"""
+        return self._data[self.columns[(source, name)], :len(self.days)]
+
+    def block(self, keys):
+        """
+        여러 컬럼을 (컬럼, 날짜) 배열로 반환
+
+        Parameters:
+        -----------
+        keys : list of tuple
+            [(원천, 컬럼), ...]
+        """
+        rows = np.array([self.columns[k] for k in keys], dtype=np.intp)
+        return self._data[rows, :len(self.days)]
+
+    def dates(self):
+        return from_days(self.days)
+
+    def frame(self, source=None):
+        """DataFrame (날짜 x 컬럼)으로 변환 (복사본). source 지정 시 해당 원천만"""
+        keys = [k for k in self.columns if source is None or k[0] == source]
+        columns = [name for _, name in keys] if source else pd.MultiIndex.from_tuples(keys)
+        return pd.DataFrame(self.block(keys).T, index=self.dates(), columns=columns)
+
+def build_panel(sources, calendar=None):
+    """
+    여러 원천을 한 번에 정렬
+
+    날짜 축을 해석할 수 없는 원천은 건너뛰고 panel.skipped에 사유를 남긴다.
+
+    Parameters:
+    -----------
+    sources : dict
+        {원천 이름: DataFrame} (None이거나 빈 프레임은 건너뜀)
+    calendar : str or None
+        Panel 참고
+
+    Returns:
+    --------
+    Panel
+    """
+    panel = Panel(calendar)
+    for source, frame in sources.items():
+        if frame is None or frame.empty:
+            continue
+        try:
+            panel.update(source, frame)
+        except ValueError as e:
+            panel.skipped[source] = str(e)
+            print(f"패널에서 제외: {source} ({e})")
+    return panel
+
+# 워크북 시트 -> 원천 이름
+WORKBOOK_SOURCES = {
+    "FX_Data": "fx",
+    "Swap_Point": "swap",
+    "IRS": "irs",
+    "CRS": "crs",
+    "Kospi": "kospi",
+    "Kospi_Liquidity": "flow",
+}
+
+def load_workbook_panel(excel_path, calendar=None):
+    """워크북의 원천 시트를 한 번 읽어 패널 생성 (없는 시트는 건너뜀)"""
+    sheets = pd.read_excel(excel_path, sheet_name=None, index_col=None)
+    sources = {}
+    for sheet_name, source in WORKBOOK_SOURCES.items():
+        df = sheets.get(sheet_name)
+        if df is None or df.empty:
+            continue
+        first = df.columns[0]
+        if first not in DATE_COLUMNS and str(first).startswith("Unnamed"):
+            df = df.set_index(first)
+        sources[source] = df
+    return build_panel(sources, calendar)
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+데이터셋 최신 상태 카탈로그
+
+데이터셋별 마지막 날짜, 행 수, 내용 해시, 갱신 시각을 작은 JSON 파일 하나에 기록한다.
+상태 확인이나 증분 수집 시작일 계산에 전체 CSV/시트를 읽을 필요가 없다.
+
+데이터셋:
+    swap_points  fx_swap_mid.csv / Swap_Point 시트
+    irs, crs     KMB IRS / CRS 시트
+    kospi        Kospi 시트
+    krx_flow     Kospi_Liquidity 시트 (및 krx_flow/ 연도별 파티션)
+    fx           FX_Data 시트
+
+파일로 관리하는 데이터셋(CSV)은 기록 시 파일 크기와 수정 시각을 함께 저장하고,
+읽을 때 파일이 바뀌었으면 항목을 무시한다 (호출한 쪽이 파일을 읽어 다시 기록).
+
+카탈로그 파일 경로는 DATA_CATALOG_FILE 환경 변수로 바꿀 수 있고 (기본: 현재 디렉토리의
+data_catalog.json), 함수마다 catalog_file 인자로도 지정할 수 있다.
+
+사용 예:
+    import data_catalog
+
+    last = data_catalog.last_date("swap_points", path="fx_swap_mid.csv")
+    if last is None:
+        df = pd.read_csv(...)
+        data_catalog.record("swap_points", df, path="fx_swap_mid.csv")
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+CATALOG_FILE = os.environ.get("DATA_CATALOG_FILE", "data_catalog.json")
+DATASETS = ("swap_points", "irs", "crs", "kospi", "krx_flow", "fx")
+# content_hash 방식 버전. 항목의 hash_version이 다르면 (없으면 1) 해시를 서로 비교할 수 없다
+HASH_VERSION = 2
+
+# 날짜로 쓰는 컬럼 (인덱스가 날짜가 아닐 때)
+DATE_COLUMNS = ("날짜", "전송일", "Date", "date")
+
+_lock = threading.Lock()
+
+def _load(catalog_file=CATALOG_FILE):
+    if not os.path.exists(catalog_file):
+        return {}
+    try:
+        with open(catalog_file, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _date_values(df):
+    """프레임의 날짜 축 (인덱스 -> 날짜 컬럼 -> 날짜형 열 이름 순으로 찾음)"""
+    candidates = [df.index]
+    candidates += [df[c] for c in DATE_COLUMNS if c in df.columns]
+    candidates.append(df.columns)
+    for values in candidates:
+        if len(values) == 0:
+            continue
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return pd.DatetimeIndex(values)
+        if pd.api.types.is_numeric_dtype(values):
+            continue
+        parsed = pd.to_datetime(pd.Index(values).astype(str), errors="coerce", format="mixed")
+        if parsed.notna().mean() > 0.9:
+            return pd.DatetimeIndex(parsed)
+    return pd.DatetimeIndex([])
+
+def content_hash(df):
+    """DataFrame 내용 해시 (인덱스/열 이름 포함, 16자리. 방식은 HASH_VERSION)"""
+    h = hashlib.sha1()
+    values = df.to_numpy()
+    if values.dtype.kind in "biuf":
+        # 숫자 프레임은 값 버퍼를 그대로 해시 (열이 많은 FX 매트릭스도 빠름)
+        h.update(np.ascontiguousarray(values).tobytes())
+    else:
+        h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    for axis in (df.index, df.columns):
+        h.update(pd.util.hash_pandas_object(axis).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+def _file_stamp(path):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime": st.st_mtime}
+
+def record(dataset, df, path=None, track_file=False, catalog_file=CATALOG_FILE, **extra):
+    """
+    데이터셋 상태 기록
+
+    Parameters:
+    -----------
+    dataset : str
+        DATASETS 중 하나
+    df : pd.DataFrame
+        저장한 전체 데이터
+    path : str or None
+        데이터가 저장된 파일 (CSV 또는 워크북)
+    track_file : bool
+        파일 크기/수정 시각을 저장해 파일이 바뀌면 항목을 무효로 볼지 여부
+        (데이터셋 전용 파일일 때만 사용. 여러 시트가 함께 쓰는 워크북은 False)
+    extra : dict
+        함께 기록할 값 (예: sheet='Kospi')
+
+    Returns:
+    --------
+    dict
+        기록한 항목
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f"dataset must be one of {DATASETS}")
+    dates = _date_values(df).dropna()
+    entry = {
+        "first_date": dates.min().strftime("%Y-%m-%d") if len(dates) else None,
+        "last_date": dates.max().strftime("%Y-%m-%d") if len(dates) else None,
+        "rows": int(len(df)),
+        "hash": content_hash(df),
+        "hash_version": HASH_VERSION,
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+        "path": os.path.abspath(path) if path else None,
+    }
+    if path and track_file and os.path.exists(path):
+        entry["file"] = _file_stamp(path)
+    entry.update(extra)
+
+    with _lock:
+        catalog = _load(catalog_file)
+        catalog[dataset] = entry
+        tmp = f"{catalog_file}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(catalog, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, catalog_file)
+    return entry
+
+def get(dataset, path=None, catalog_file=CATALOG_FILE):
+    """
+    데이터셋 항목 (없거나 추적 중인 파일이 바뀌었으면 None)
+
+    Parameters:
+    -----------
+    path : str or None
+        지정하면 기록된 경로와 같을 때만 항목을 반환
+    """
+    entry = _load(catalog_file).get(dataset)
+    if entry is None:
+        return None
+    if path is not None and entry.get("path") != os.path.abspath(path):
+        return None
+    stamp = entry.get("file")
+    if stamp is not None:
+        p = entry.get("path")
+        if not p or not os.path.exists(p) or _file_stamp(p) != stamp:
+            return None
+    return entry
+
+def last_date(dataset, path=None, catalog_file=CATALOG_FILE):
+    """마지막 날짜 (pd.Timestamp). 항목이 없거나 무효면 None"""
+    entry = get(dataset, path, catalog_file)
+    if entry is None or entry.get("last_date") is None:
+        return None
+    return pd.Timestamp(entry["last_date"])
+
+def status(catalog_file=CATALOG_FILE):
+    """
+    전체 데이터셋 상태 표
+
+    Returns:
+    --------
+    pd.DataFrame
+        index=dataset, last_date / rows / hash / updated_at / valid
+    """
+    catalog = _load(catalog_file)
+    rows = []
+    for dataset in DATASETS:
+        entry = catalog.get(dataset)
+        if entry is None:
+            rows.append({"dataset": dataset, "valid": False})
+            continue
+        valid = get(dataset, catalog_file=catalog_file) is not None
+        rows.append({
+            "dataset": dataset,
+            "last_date": entry.get("last_date"),
+            "rows": entry.get("rows"),
+            "hash": entry.get("hash"),
+            "updated_at": entry.get("updated_at"),
+            "valid": valid,
+        })
+    return pd.DataFrame(rows).set_index("dataset")
+
+if __name__ == "__main__":
+    print(status().to_string())
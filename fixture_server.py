@@ -0,0 +1,398 @@
+# -*- coding: utf-8 -*-
+"""
+오프라인 대역 서버 (SMBS / KMB / KRX)
+
+녹화된(또는 합성) 응답을 로컬 HTTP 서버로 재생한다. 지연 시간과 오류율을
+설정할 수 있어 실제 사이트에 접속하지 않고 동시성, 재시도, 파서를 시험할 수 있다.
+
+크롤러는 환경변수로 이 서버를 가리킨다:
+    SMBS_BASE_URL=http://127.0.0.1:8765   fx_swap_updater (FxSwapUS.jsp)
+    KMB_BASE_URL=http://127.0.0.1:8765    irs_crs (deri_rate.do, 엑셀 다운로드)
+    KRX_BASE_URL=http://127.0.0.1:8765    trading_value_kospi / flow_scanner (pykrx 대신)
+
+사용법:
+    python fixture_server.py --port 8765 --latency 0.2 --error-rate 0.05
+    python fixture_server.py --fixtures fixtures/          # 녹화 픽스처 재생
+    python fixture_server.py --load-test krx --workers 1,2,4,8 --requests 200
+    python fixture_server.py --load-test smbs --workers 1,2,4 --requests 40
+
+녹화 픽스처 디렉토리 구조는 benchmark.py와 같다 (없는 항목은 합성 데이터):
+    smbs/YYYY.MM.DD.html   SMBS 결과 페이지
+    kmb/IRS*.xls, kmb/CRS*.xls (또는 kmb/*.xls)
+    krx/KOSPI.csv, krx/KOSDAQ.csv, krx/<종목코드>.csv
+"""
+import argparse
+import glob
+import hashlib
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlencode, urlparse
+from urllib.request import urlopen
+
+import numpy as np
+import pandas as pd
+
+import benchmark
+
+SMBS_PATH = "/Exchange/FxSwapUS.jsp"
+KMB_PATH = "/kor/rate/deri_rate.do"
+KMB_EXCEL_PATH = "/kor/rate/deri_rate_excel.do"
+KRX_PATH = "/krx"
+
+# SMBS 조회 폼 (fx_swap_updater._input_date_step_by_step의 XPath와 같은 구조)
+_SMBS_FORM = """
+<form id="frm_SearchDate" method="get" action="{path}">
+<p><input type="text" id="searchDate" name="searchDate" value="{date}"></p>
+<p></p><p></p>
+<p><a href="#" onclick="document.getElementById('frm_SearchDate').submit(); return false;"><img src="/img/btn_search.gif" alt="조회"></a></p>
+</form>
+"""
+
+# KMB 파생금리 페이지 (irs_crs.KMBRateCrawler.download_and_read의 XPath와 같은 구조)
+_KMB_PAGE = """<html><body><main>
+<article id="article1"><form>
+<nav>
+<button type="button" onclick="window.rateType='IRS'">IRS</button>
+<button type="button" onclick="window.rateType='CRS'">CRS</button>
+</nav>
+</form>
+<footer><button type="button" onclick="location.href='{path}?type=' + (window.rateType || 'IRS')">엑셀 다운로드</button></footer>
+</article>
+</main></body></html>
+"""
+
+# ==================== 응답 데이터 ====================
+class FixtureStore:
+    """녹화 픽스처를 우선 사용하고 없으면 합성 응답을 만드는 저장소"""
+
+    def __init__(self, fixtures_dir=None, seed=0):
+        self.fixtures_dir = fixtures_dir
+        self.seed = seed
+
+    def _path(self, *parts):
+        return os.path.join(self.fixtures_dir, *parts) if self.fixtures_dir else None
+
+    def _rng(self, key):
+        return np.random.default_rng([self.seed, zlib.crc32(key.encode("utf-8"))])
+
+    def smbs_page(self, date_str):
+        """YYYYMMDD 조회 결과 페이지 (주말은 빈 결과 표)"""
+        dotted = f"{date_str[:4]}.{date_str[4:6]}.{date_str[6:]}"
+        path = self._path("smbs", f"{dotted}.html")
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                return f.read()
+
+        form = _SMBS_FORM.format(path=SMBS_PATH, date=date_str)
+        if pd.Timestamp(date_str).weekday() >= 5:
+            body = ("<table><caption>F/X Swap POINT 결과 표</caption>"
+                    f"<thead><tr><th>{dotted}</th></tr></thead><tbody></tbody></table>")
+            return f"<html><body>{form}{body}</body></html>"
+        html = benchmark.make_smbs_html(dotted, self._rng(date_str))
+        # 결과 표 앞에 조회 폼과 조회 날짜 표시
+        return html.replace("<body>", f"<body>{form}<p>{dotted}</p>", 1)
+
+    def kmb_export(self, rate_type):
+        """KMB 엑셀 다운로드 파일 (bytes)"""
+        if self.fixtures_dir:
+            files = (sorted(glob.glob(self._path("kmb", f"{rate_type}*.xls")))
+                     or sorted(glob.glob(self._path("kmb", "*.xls"))))
+            if files:
+                with open(files[0], "rb") as f:
+                    return f.read()
+        # 합성: xlsx 형식 (pd.read_excel은 확장자가 아니라 내용으로 형식을 판별)
+        buf = io.BytesIO()
+        benchmark.make_kmb_frame(benchmark.BASE_SIZES["kmb_rows"], self._rng(rate_type)).to_excel(buf, index=False)
+        return buf.getvalue()
+
+    def krx_trading_value(self, start, end, ticker, detail=False):
+        """get_market_trading_value_by_date와 같은 형태의 프레임"""
+        path = self._path("krx", f"{ticker}.csv")
+        if path and os.path.exists(path):
+            df = pd.read_csv(path, index_col=0, parse_dates=True)
+            return df.loc[pd.Timestamp(start):pd.Timestamp(end)]
+
+        # 같은 날짜는 어떤 기간으로 조회해도 같은 값이 나오도록 연도 단위로 생성
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        columns = benchmark.KRX_COLUMNS
+        scale = 2e11 if ticker in ("KOSPI", "KOSDAQ") else 2e9
+        frames = []
+        for year in range(start.year, end.year + 1):
+            dates = pd.bdate_range(f"{year}-01-01", f"{year}-12-31")
+            rng = np.random.default_rng([self.seed, zlib.crc32(ticker.encode("utf-8")), year])
+            flows = rng.normal(0, scale, size=(len(dates), len(columns) - 1))
+            flows[:, -1] = -flows[:, :-1].sum(axis=1)
+            data = np.column_stack([flows, np.zeros(len(dates))]).astype("int64")
+            frames.append(pd.DataFrame(data, index=dates, columns=columns))
+        df = pd.concat(frames).loc[start:end]
+        df.index.name = "날짜"
+        return df
+
+    def krx_tickers(self, date, market="KOSPI"):
+        path = self._path("krx", f"tickers_{market}.json")
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        base = 0 if market == "KOSPI" else 100000
+        return [f"{base + i * 10:06d}" for i in range(950 if market == "KOSPI" else 1700)]
+
+# ==================== HTTP 서버 ====================
+class FixtureHandler(BaseHTTPRequestHandler):
+    server_version = "FixtureServer/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, body, content_type="text/html; charset=utf-8", headers=None):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        if status == 200:
+            # 조건부 요청 지원: 본문 해시를 ETag로 보내고 같으면 304
+            etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+            headers = {**(headers or {}), "ETag": etag}
+            if self.headers.get("If-None-Match") == etag:
+                with self.server.lock:
+                    self.server.stats["not_modified"] += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _inject(self):
+        """설정된 지연/오류 적용. 오류를 보냈으면 True"""
+        srv = self.server
+        with srv.lock:
+            srv.stats["requests"] += 1
+            delay = srv.latency + srv.rng.uniform(0, srv.jitter)
+            fail = srv.rng.random() < srv.error_rate
+            if fail:
+                srv.stats["errors"] += 1
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            self._send(503, "Service Unavailable (injected)")
+        return fail
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        q = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        store = self.server.store
+
+        if url.path.startswith("/img/"):
+            return self._send(204, b"", "image/gif")
+        if url.path == "/stats":
+            with self.server.lock:
+                return self._send(200, json.dumps(self.server.stats), "application/json")
+        if self._inject():
+            return
+
+        try:
+            if url.path == SMBS_PATH:
+                date_str = q.get("searchDate", "").replace(".", "") or datetime.today().strftime("%Y%m%d")
+                return self._send(200, store.smbs_page(date_str))
+            if url.path == KMB_PATH:
+                return self._send(200, _KMB_PAGE.format(path=KMB_EXCEL_PATH))
+            if url.path == KMB_EXCEL_PATH:
+                rate_type = q.get("type", "IRS")
+                filename = f"KMB_파생금리_일자별_{rate_type}_{datetime.now():%Y%m%d%H%M%S%f}.xls"
+                return self._send(200, store.kmb_export(rate_type), "application/vnd.ms-excel", {
+                    "Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}",
+                })
+            if url.path == f"{KRX_PATH}/trading_value":
+                df = store.krx_trading_value(q["start"], q["end"], q.get("ticker", "KOSPI"),
+                                             q.get("detail") == "1")
+                return self._send(200, df.to_csv(), "text/csv; charset=utf-8")
+            if url.path == f"{KRX_PATH}/tickers":
+                tickers = store.krx_tickers(q.get("date"), q.get("market", "KOSPI"))
+                return self._send(200, json.dumps(tickers), "application/json")
+            if url.path == f"{KRX_PATH}/ticker_name":
+                return self._send(200, json.dumps(f"종목{q['ticker']}", ensure_ascii=False), "application/json")
+        except KeyError as e:
+            return self._send(400, f"missing parameter {e}")
+        self._send(404, "Not Found")
+
+def start_server(host="127.0.0.1", port=0, fixtures_dir=None, latency=0.0, jitter=0.0,
+                 error_rate=0.0, seed=0, verbose=False):
+    """
+    대역 서버를 백그라운드 스레드로 시작
+
+    Parameters:
+    -----------
+    port : int
+        0이면 빈 포트 자동 선택
+    latency, jitter : float
+        응답마다 latency + U(0, jitter)초 지연
+    error_rate : float
+        503 응답을 보낼 확률 (0~1)
+
+    Returns:
+    --------
+    tuple
+        (server, base_url). 종료는 server.shutdown()
+    """
+    server = ThreadingHTTPServer((host, port), FixtureHandler)
+    server.daemon_threads = True
+    server.store = FixtureStore(fixtures_dir, seed)
+    server.latency, server.jitter, server.error_rate = latency, jitter, error_rate
+    server.rng = random.Random(seed)
+    server.lock = threading.Lock()
+    server.stats = {"requests": 0, "errors": 0, "not_modified": 0}
+    server.verbose = verbose
+    threading.Thread(target=server.serve_forever, name="fixture-server", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+def _serve_in_process(queue, kwargs):
+    server, base_url = start_server(**kwargs)
+    queue.put(base_url)
+    threading.Event().wait()
+
+def start_server_process(**kwargs):
+    """
+    대역 서버를 별도 프로세스로 시작 (부하 시험 시 클라이언트와 GIL을 나눠 쓰지 않도록)
+
+    Returns:
+    --------
+    tuple
+        (process, base_url). 종료는 process.terminate()
+    """
+    import multiprocessing
+
+    queue = multiprocessing.Queue()
+    proc = multiprocessing.Process(target=_serve_in_process, args=(queue, kwargs), daemon=True)
+    proc.start()
+    return proc, queue.get(timeout=30)
+
+# ==================== KRX 재생 클라이언트 ====================
+class KRXReplayClient:
+    """pykrx.stock과 같은 이름의 함수로 대역 서버를 조회 (KRX_BASE_URL 설정 시 사용)"""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip("/") + KRX_PATH
+        self.timeout = timeout
+
+    def _get(self, endpoint, **params):
+        with urlopen(f"{self.base_url}/{endpoint}?{urlencode(params)}", timeout=self.timeout) as resp:
+            return resp.read()
+
+    def get_market_trading_value_by_date(self, start, end, ticker, detail=False):
+        body = self._get("trading_value", start=start, end=end, ticker=ticker, detail=int(bool(detail)))
+        return pd.read_csv(io.BytesIO(body), index_col=0, parse_dates=True)
+
+    def get_market_ticker_list(self, date=None, market="KOSPI"):
+        return json.loads(self._get("tickers", date=date or "", market=market))
+
+    def get_market_ticker_name(self, ticker):
+        return json.loads(self._get("ticker_name", ticker=ticker))
+
+# ==================== 부하 시험 ====================
+def load_test_krx(base_url, workers, n_requests):
+    """flow_scanner의 병렬 수집을 worker 수별로 실행 (캐시는 매번 비움)"""
+    import flow_scanner
+
+    os.environ["KRX_BASE_URL"] = base_url
+    tickers = KRXReplayClient(base_url).get_market_ticker_list("", "KOSPI")[:n_requests]
+    cache_dir = tempfile.mkdtemp(prefix="fixture_krx_")
+    try:
+        t0 = time.perf_counter()
+        flows, failed = flow_scanner.fetch_universe_flows(
+            tickers, "20250101", "20250630", cache_dir=cache_dir, max_workers=workers, rate=1e6)
+        elapsed = time.perf_counter() - t0
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return {"elapsed_s": elapsed, "ok": len(tickers) - len(failed), "failed": len(failed)}
+
+def load_test_smbs(base_url, workers, n_requests):
+    """SMBS 날짜 조회를 worker 수만큼의 브라우저로 나눠 실행"""
+    from concurrent.futures import ThreadPoolExecutor
+    import browser_pool
+    import fx_swap_updater
+
+    fx_swap_updater.SMBS_URL = f"{base_url}{SMBS_PATH}"
+    dates = [d.strftime("%Y.%m.%d") for d in pd.bdate_range(end="2025-06-30", periods=n_requests)]
+    chunks = [dates[i::workers] for i in range(workers)]
+
+    browser_pool.close_pools()
+    pool = browser_pool.get_pool(headless=True, max_size=workers)
+    pool.warm()
+    try:
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            frames = list(ex.map(fx_swap_updater.fetch_fx_swap_points_dates_selenium, chunks))
+        elapsed = time.perf_counter() - t0
+    finally:
+        browser_pool.close_pools()
+    ok = sum(df.index.nunique() for df in frames if not df.empty)
+    return {"elapsed_s": elapsed, "ok": ok, "failed": len(dates) - ok}
+
+LOAD_TESTS = {"krx": load_test_krx, "smbs": load_test_smbs}
+
+def run_load_test(target, workers_list, n_requests, **server_kwargs):
+    """worker 수별 처리량 표 출력"""
+    proc, base_url = start_server_process(**server_kwargs)
+    results = []
+    try:
+        print(f"{'workers':>8} {'elapsed s':>10} {'ok':>6} {'failed':>7} {'req/s':>8}")
+        for workers in workers_list:
+            r = LOAD_TESTS[target](base_url, workers, n_requests)
+            r["workers"] = workers
+            r["throughput"] = r["ok"] / r["elapsed_s"] if r["elapsed_s"] else float("nan")
+            results.append(r)
+            print(f"{workers:>8} {r['elapsed_s']:>10.2f} {r['ok']:>6} {r['failed']:>7} {r['throughput']:>8.1f}")
+        stats = json.loads(urlopen(f"{base_url}/stats").read())
+        print(f"서버 요청 {stats['requests']}건, 주입 오류 {stats['errors']}건")
+    finally:
+        proc.terminate()
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SMBS/KMB/KRX 오프라인 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", help="녹화 픽스처 디렉토리")
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="추가 무작위 지연 최대값 (초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 응답 확률 (0~1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="요청 로그 출력")
+    parser.add_argument("--load-test", choices=list(LOAD_TESTS), help="부하 시험 대상")
+    parser.add_argument("--workers", default="1,2,4,8", help="부하 시험 worker 수 목록")
+    parser.add_argument("--requests", type=int, default=200, help="부하 시험 요청 수")
+    args = parser.parse_args(argv)
+
+    server_kwargs = dict(fixtures_dir=args.fixtures, latency=args.latency, jitter=args.jitter,
+                         error_rate=args.error_rate, seed=args.seed, verbose=args.verbose)
+    if args.load_test:
+        workers = [int(w) for w in args.workers.split(",")]
+        run_load_test(args.load_test, workers, args.requests, host=args.host, port=0, **server_kwargs)
+        return 0
+
+    server, base_url = start_server(host=args.host, port=args.port, **server_kwargs)
+    print(f"대역 서버 실행 중: {base_url}")
+    print(f"  SMBS_BASE_URL={base_url}  KMB_BASE_URL={base_url}  KRX_BASE_URL={base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
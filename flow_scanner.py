@@ -0,0 +1,204 @@
+# Per-Ticker Foreign Net Buying Scanner (KOSPI constituents)
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from workbook import EXCEL_PATH, publish_sheets
+from instrumentation import span
+import indicators as ind
+from trading_value_kospi import SUM_WINDOW, Z_WINDOW, krx_stock
+
+CACHE_DIR = "krx_ticker_cache"   # <CACHE_DIR>/<ticker>.csv (daily trading value by investor)
+LOOKBACK_DAYS = 150              # calendar days fetched for a new ticker (> SUM_WINDOW + Z_WINDOW sessions)
+MAX_WORKERS = 8
+REQUESTS_PER_SECOND = 5          # shared across all workers
+MAX_RETRIES = 3
+
+class RateLimiter:
+    """Space out calls from all threads to at most `rate` per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+def _cache_path(ticker: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, f"{ticker}.csv")
+
+def _read_cache(ticker: str, cache_dir: str) -> pd.DataFrame | None:
+    path = _cache_path(ticker, cache_dir)
+    if not os.path.exists(path):
+        return None
+    return pd.read_csv(path, index_col=0, parse_dates=True)
+
+def fetch_ticker_flow(ticker: str, start: str, end: str, limiter: RateLimiter,
+                      cache_dir: str = CACHE_DIR) -> pd.Series:
+    """
+    Daily foreign net buying value of one ticker, served from the local cache
+    and topped up from the last cached day onwards. The last cached day is
+    fetched again and overwritten, since a run during trading hours caches a
+    partial row for that day.
+
+    Args:
+        ticker (str): KRX ticker code (e.g. "005930")
+        start (str): Start date in YYYYMMDD format
+        end (str): End date in YYYYMMDD format
+        limiter (RateLimiter): Shared request limiter
+        cache_dir (str): Cache directory
+
+    Returns:
+        pd.Series: 외국인합계 indexed by date (start ~ end)
+    """
+    stock = krx_stock()
+
+    cached = _read_cache(ticker, cache_dir)
+    fetch_start = start
+    if cached is not None and not cached.empty:
+        if cached.index[0] <= pd.Timestamp(start):
+            fetch_start = cached.index[-1].strftime("%Y%m%d")
+        else:
+            cached = None
+
+    new = None
+    if fetch_start <= end:
+        with span("flow_scanner", "fetch", ticker=ticker) as sp:
+            for attempt in range(MAX_RETRIES):
+                limiter.wait()
+                try:
+                    new = stock.get_market_trading_value_by_date(fetch_start, end, ticker)
+                    break
+                except Exception:
+                    if attempt == MAX_RETRIES - 1:
+                        raise
+                    sp["retries"] += 1
+                    time.sleep(2 ** attempt)
+            sp["rows"] = len(new)
+
+    df = cached
+    if new is not None and not new.empty:
+        new.index = pd.DatetimeIndex(new.index)
+        df = new if df is None else pd.concat([df[~df.index.isin(new.index)], new]).sort_index()
+        os.makedirs(cache_dir, exist_ok=True)
+        df.to_csv(_cache_path(ticker, cache_dir), encoding="utf-8-sig")
+
+    if df is None:
+        return pd.Series(dtype=float, name=ticker)
+    return df.loc[pd.Timestamp(start):pd.Timestamp(end), "외국인합계"].astype(float).rename(ticker)
+
+def fetch_universe_flows(tickers: list, start: str, end: str, cache_dir: str = CACHE_DIR,
+                         max_workers: int = MAX_WORKERS, rate: float = REQUESTS_PER_SECOND) -> tuple:
+    """
+    Fetch foreign net buying for many tickers concurrently.
+
+    Returns:
+        tuple: (flows, failed) - flows is a (ticker, date) DataFrame, failed a list of tickers
+    """
+    limiter = RateLimiter(rate)
+    series, failed = [], []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(fetch_ticker_flow, t, start, end, limiter, cache_dir): t for t in tickers}
+        for i, future in enumerate(as_completed(futures), 1):
+            ticker = futures[future]
+            try:
+                series.append(future.result())
+            except Exception as e:
+                failed.append(ticker)
+                print(f"{ticker}: fetch failed -> {e}")
+            if i % 100 == 0:
+                print(f"{i}/{len(tickers)} tickers fetched")
+    if not series:
+        return pd.DataFrame(), failed
+    flows = pd.concat(series, axis=1).sort_index().T
+    return flows, failed
+
+def rank_foreign_flow(flows: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cross-sectional ranking on the latest date, using the same metric
+    definitions as get_foreign_flow (20-day cumulative, 60D z-score of it).
+
+    Args:
+        flows (pd.DataFrame): (ticker, date) daily foreign net buying
+
+    Returns:
+        pd.DataFrame: One row per ticker, sorted by 20-day cumulative net buying
+    """
+    values = flows.to_numpy(dtype=float)
+    # A day without a row after listing is a day without trading (0); before listing stays NaN
+    listed = np.cumsum(~np.isnan(values), axis=1) > 0
+    values = np.where(listed & np.isnan(values), 0.0, values)
+
+    sum20 = ind.rolling_sum(values, SUM_WINDOW)
+    z60 = ind.rolling_zscore(sum20, Z_WINDOW, ddof=0)
+    last_sum = sum20[:, -1]
+
+    out = pd.DataFrame({
+        "Foreign Net Buying (Daily)": values[:, -1],
+        "Foreign Net Buying (Recent 20 Trading Days Cumulative)": last_sum,
+        "Recent 20 Trading Days Cumulative Z-score (60D)": z60[:, -1],
+        # Where this ticker's 20-day flow sits within today's cross-section
+        "Cross-sectional Z-score (20D Cumulative)": ind.zscore(last_sum, ddof=0),
+    }, index=flows.index)
+    out.index.name = "Ticker"
+
+    order = np.argsort(-np.nan_to_num(last_sum, nan=-np.inf), kind="stable")
+    out = out.iloc[order]
+    out.insert(0, "Rank", np.arange(1, len(out) + 1))
+    return out
+
+def scan_foreign_flow(date: str | None = None, market: str = "KOSPI", cache_dir: str = CACHE_DIR,
+                      max_workers: int = MAX_WORKERS, rate: float = REQUESTS_PER_SECOND) -> pd.DataFrame:
+    """
+    Rank every ticker of the market by 20-day foreign net buying.
+
+    Args:
+        date (str): Scan date in YYYYMMDD format (default: today)
+        market (str): "KOSPI" | "KOSDAQ"
+        cache_dir (str): Per-ticker cache directory
+        max_workers (int): Concurrent fetches
+        rate (float): Maximum requests per second across all workers
+
+    Returns:
+        pd.DataFrame: Output of rank_foreign_flow with a Name column
+    """
+    stock = krx_stock()
+
+    end = date or datetime.today().strftime("%Y%m%d")
+    start = (pd.Timestamp(end) - pd.Timedelta(days=LOOKBACK_DAYS)).strftime("%Y%m%d")
+
+    with span("flow_scanner", "fetch", step="tickers") as sp:
+        tickers = stock.get_market_ticker_list(end, market=market)
+        sp["rows"] = len(tickers)
+    print(f"Scanning {len(tickers)} {market} tickers ({start} ~ {end})")
+
+    flows, failed = fetch_universe_flows(tickers, start, end, cache_dir, max_workers, rate)
+    if flows.empty:
+        return pd.DataFrame()
+    if failed:
+        print(f"Failed tickers ({len(failed)}): {failed}")
+
+    with span("flow_scanner", "compute", market=market) as sp:
+        ranking = rank_foreign_flow(flows)
+        sp["rows"] = len(ranking)
+    ranking.insert(1, "Name", [stock.get_market_ticker_name(t) for t in ranking.index])
+    return ranking
+
+def main(excel_path: str = EXCEL_PATH):
+    ranking = scan_foreign_flow()
+    publish_sheets(excel_path, {"Foreign_Flow_Scan": ranking})
+    print("Foreign_Flow_Scan data saved successfully!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+FX 익스포저 리스크 (원화 기준)
+
+clean_fx_matrix 결과(USD/XXX)에서 통화별 원화 수익률 행렬을 만들고,
+여러 포트폴리오의 과거 시뮬레이션 VaR/ES, EWMA VaR/ES, 스트레스 시나리오 손익을
+행렬 연산 몇 번으로 한꺼번에 계산한다.
+
+포지션은 (포트폴리오, 통화) 원화 금액이며 통화 코드는 'USD', 'EUR', 'JPY' ... 형식이다.
+XXX 1단위의 원화 가치는 USD_KRW / USD_XXX (USD는 USD_KRW)이고, DXY 같은 지수는 제외한다.
+손실은 양수로 표시한다.
+
+수익률 행렬은 fx_matrix 내용 해시로 캐시하므로 같은 데이터로 여러 번 호출해도
+한 번만 계산한다.
+
+사용 예:
+    import fx_risk
+
+    positions = pd.DataFrame({'USD': [1e9, -5e8], 'JPY': [2e8, 3e8]}, index=['A', 'B'])
+    report = fx_risk.risk_report(fx_matrix_clean, positions)
+"""
+from collections import OrderedDict
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from universe import FX_UNIVERSE
+from data_catalog import content_hash
+
+BASE = "KRW"
+CONFIDENCE = 0.99
+LOOKBACK = 500            # 과거 시뮬레이션 기간 (영업일)
+EWMA_LAMBDA = 0.94        # RiskMetrics 일간 감쇠 계수
+
+# 이름: 기간 (시작일, 종료일) 또는 통화별 충격 {통화: 원화 대비 변화율}
+SCENARIOS = {
+    "2011 EU Debt Crisis": ("2011-08-01", "2011-09-30"),
+    "2015 CNY Devaluation": ("2015-08-10", "2015-08-31"),
+    "2020 COVID": ("2020-02-19", "2020-03-19"),
+    "2022 USD Rally": ("2022-08-01", "2022-10-21"),
+    "KRW -10%": {"*": 0.10},
+    "KRW +10%": {"*": -0.10},
+}
+
+_CACHE_SIZE = 8
+_return_cache = OrderedDict()
+
+def _currency_rows(fx_matrix):
+    """(통화 코드, 행 이름) 목록. 통화 경로의 USD_XXX 중 KRW 제외"""
+    names = set(fx_matrix.index)
+    rows = []
+    for symbol, name, region, order, quote, route in FX_UNIVERSE.entries:
+        if route == "currency" and name in names and name != f"USD_{BASE}":
+            rows.append((name.split("_", 1)[1], name))
+    return rows
+
+def krw_prices(fx_matrix):
+    """
+    통화별 원화 가격 (XXX 1단위의 원화 가치)
+
+    Returns:
+    --------
+    pd.DataFrame
+        행=통화 코드 ('USD' 포함), 열=날짜
+    """
+    usd_krw = fx_matrix.loc[f"USD_{BASE}"].to_numpy(dtype=float)
+    rows = _currency_rows(fx_matrix)
+    usd_xxx = fx_matrix.loc[[name for _, name in rows]].to_numpy(dtype=float)
+    prices = np.vstack([usd_krw, usd_krw / usd_xxx])
+    return pd.DataFrame(prices, index=["USD"] + [code for code, _ in rows], columns=fx_matrix.columns)
+
+def krw_returns(fx_matrix):
+    """
+    통화별 원화 기준 일간 로그 수익률 (캐시)
+
+    Returns:
+    --------
+    tuple
+        (currencies, dates, R) - R은 (날짜, 통화) 배열이며 첫 날짜는 제외
+    """
+    key = content_hash(fx_matrix)
+    if key in _return_cache:
+        _return_cache.move_to_end(key)
+        return _return_cache[key]
+
+    prices = krw_prices(fx_matrix)
+    logp = np.log(prices.to_numpy(dtype=float))
+    R = np.ascontiguousarray(np.diff(logp, axis=1).T)
+    R = np.nan_to_num(R)  # 휴장일 등 결측은 변화 없음으로 처리
+    result = (list(prices.index), pd.DatetimeIndex(prices.columns[1:]), R)
+
+    _return_cache[key] = result
+    if len(_return_cache) > _CACHE_SIZE:
+        _return_cache.popitem(last=False)
+    return result
+
+def _position_matrix(positions, currencies):
+    """포지션 DataFrame -> (포트폴리오, 통화) 배열 (R의 통화 순서)"""
+    unknown = set(positions.columns) - set(currencies)
+    if unknown:
+        raise ValueError(f"수익률이 없는 통화: {sorted(unknown)}")
+    return positions.reindex(columns=currencies, fill_value=0.0).to_numpy(dtype=float)
+
+def historical_var(positions, fx_matrix, confidence=CONFIDENCE, lookback=LOOKBACK, horizon=1):
+    """
+    과거 시뮬레이션 VaR/ES
+
+    최근 lookback일 수익률을 현재 포지션에 적용한 손익 분포의 꼬리에서 계산한다.
+    (손익 = 포지션 x (exp(r) - 1), 모든 포트폴리오를 행렬곱 한 번으로 계산)
+
+    Parameters:
+    -----------
+    positions : pd.DataFrame
+        (포트폴리오, 통화) 원화 금액
+    confidence : float
+        신뢰수준
+    lookback : int
+        사용할 최근 영업일 수
+    horizon : int
+        보유 기간 (일). sqrt(horizon)으로 환산
+
+    Returns:
+    --------
+    pd.DataFrame
+        index=포트폴리오, columns=['Hist VaR', 'Hist ES']
+    """
+    currencies, dates, R = krw_returns(fx_matrix)
+    W = _position_matrix(positions, currencies)
+    losses = -(W @ np.expm1(R[-lookback:]).T)            # (포트폴리오, 시나리오)
+
+    # 꼬리 관측치 수 (1 - confidence) x 표본 수 (부동소수점 오차로 올림되지 않도록 반올림 후 올림)
+    n_tail = max(1, int(np.ceil(round((1 - confidence) * losses.shape[1], 9))))
+    tail = np.partition(losses, -n_tail, axis=1)[:, -n_tail:]
+    scale = np.sqrt(horizon)
+    return pd.DataFrame({
+        "Hist VaR": tail.min(axis=1) * scale,
+        "Hist ES": tail.mean(axis=1) * scale,
+    }, index=positions.index)
+
+def ewma_cov(R, lam=EWMA_LAMBDA):
+    """EWMA 공분산 (RiskMetrics, 평균 0 가정). R: (날짜, 통화)"""
+    n = len(R)
+    weights = (1 - lam) * lam ** np.arange(n - 1, -1, -1)
+    weights /= weights.sum()
+    return (R * weights[:, None]).T @ R
+
+def ewma_var(positions, fx_matrix, confidence=CONFIDENCE, lam=EWMA_LAMBDA, horizon=1):
+    """
+    EWMA 공분산 기반 정규분포 VaR/ES
+
+    Returns:
+    --------
+    pd.DataFrame
+        index=포트폴리오, columns=['EWMA VaR', 'EWMA ES', 'EWMA Vol']
+    """
+    currencies, dates, R = krw_returns(fx_matrix)
+    W = _position_matrix(positions, currencies)
+    cov = ewma_cov(R, lam)
+    sigma = np.sqrt(np.maximum(np.einsum("pk,kl,pl->p", W, cov, W), 0.0)) * np.sqrt(horizon)
+
+    dist = NormalDist()
+    z = dist.inv_cdf(confidence)
+    return pd.DataFrame({
+        "EWMA VaR": z * sigma,
+        "EWMA ES": dist.pdf(z) / (1 - confidence) * sigma,
+        "EWMA Vol": sigma,
+    }, index=positions.index)
+
+def scenario_shocks(fx_matrix, scenarios=SCENARIOS):
+    """
+    시나리오별 통화 충격 (원화 대비 변화율)
+
+    기간 시나리오는 시작일과 종료일 원화 가격의 변화율, 지정 충격은 그대로 쓴다
+    ('*'는 지정하지 않은 모든 통화).
+
+    Returns:
+    --------
+    pd.DataFrame
+        (시나리오, 통화). 데이터가 없는 기간 시나리오는 제외
+    """
+    prices = krw_prices(fx_matrix).ffill(axis=1)
+    dates = pd.DatetimeIndex(prices.columns)
+    rows = {}
+    for name, spec in scenarios.items():
+        if isinstance(spec, dict):
+            default = spec.get("*", 0.0)
+            rows[name] = [spec.get(ccy, default) for ccy in prices.index]
+            continue
+        start, end = pd.Timestamp(spec[0]), pd.Timestamp(spec[1])
+        if start < dates[0] or end > dates[-1]:
+            continue
+        i0 = dates.searchsorted(start, side="right") - 1
+        i1 = dates.searchsorted(end, side="right") - 1
+        rows[name] = prices.iloc[:, i1].to_numpy() / prices.iloc[:, max(i0, 0)].to_numpy() - 1
+    return pd.DataFrame.from_dict(rows, orient="index", columns=prices.index)
+
+def scenario_pnl(positions, fx_matrix, scenarios=SCENARIOS):
+    """
+    시나리오 손익 (포트폴리오, 시나리오) 원화 금액
+
+    Returns:
+    --------
+    pd.DataFrame
+        손익 (이익이 양수)
+    """
+    shocks = scenario_shocks(fx_matrix, scenarios)
+    W = _position_matrix(positions, list(shocks.columns))
+    return pd.DataFrame(W @ np.nan_to_num(shocks.to_numpy()).T, index=positions.index, columns=shocks.index)
+
+def risk_report(fx_matrix, positions, confidence=CONFIDENCE, lookback=LOOKBACK, horizon=1,
+                scenarios=SCENARIOS):
+    """
+    포트폴리오별 VaR/ES와 시나리오 손익을 한 표로
+
+    Parameters:
+    -----------
+    fx_matrix : pd.DataFrame
+        clean_fx_matrix 결과
+    positions : pd.DataFrame
+        (포트폴리오, 통화) 원화 금액
+
+    Returns:
+    --------
+    pd.DataFrame
+        Hist VaR/ES, EWMA VaR/ES/Vol, 시나리오별 손익
+    """
+    return pd.concat([
+        historical_var(positions, fx_matrix, confidence, lookback, horizon),
+        ewma_var(positions, fx_matrix, confidence, horizon=horizon),
+        scenario_pnl(positions, fx_matrix, scenarios),
+    ], axis=1)
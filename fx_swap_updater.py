@@ -1,29 +1,27 @@
 # -*- coding: utf-8 -*-
 import os
 import re
-import time
-import random
-from typing import List
+from typing import List, TYPE_CHECKING
 from urllib.parse import unquote
 import pandas as pd
 import numpy as np
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
-import xlwings as xw
+from datetime import datetime
 import warnings
-
-# Selenium
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
-
-warnings.filterwarnings('ignore')
-
-SMBS_URL = "http://www.smbs.biz/Exchange/FxSwapUS.jsp"
+from workbook import EXCEL_PATH, publish_sheets
+from instrumentation import span
+from browser_pool import get_pool
+import business_calendar
+import data_catalog
+import swap_store
+
+# Selenium / bs4 / xlwings는 무거우므로 실제 사용하는 함수 안에서 import
+if TYPE_CHECKING:
+    from selenium import webdriver
+
+# SMBS_BASE_URL 환경변수로 다른 서버(예: fixture_server.py)를 가리킬 수 있음
+SMBS_BASE_URL = os.environ.get("SMBS_BASE_URL", "http://www.smbs.biz").rstrip("/")
+SMBS_URL = f"{SMBS_BASE_URL}/Exchange/FxSwapUS.jsp"
+CALENDAR = "SEOUL_FX"  # SMBS 스왑포인트는 서울 외환시장 영업일 기준
 
 # ==================== 웹 크롤링 관련 함수들 ====================
 _script_pat = re.compile(r"""d[1-9]\s*\(\s*'(.*?)'\s*\)\s*;?""", re.S)
@@ -53,6 +51,8 @@ def _cell_text(tag) -> str:
     return tag.get_text(" ", strip=True)
 
 def _parse_table(html: str, date_str: str) -> pd.DataFrame:
+    from bs4 import BeautifulSoup
+    
     soup = BeautifulSoup(html, "lxml")
     target_tbl = None
     for tbl in soup.find_all("table"):
@@ -102,66 +102,109 @@ def _parse_table(html: str, date_str: str) -> pd.DataFrame:
     df.insert(0, "date", date_str)
     return df
 
-def _build_driver(headless: bool = True) -> webdriver.Chrome:
-    opts = ChromeOptions()
-    if headless:
-        opts.add_argument("--headless=new")
-    opts.add_argument("--no-sandbox")
-    opts.add_argument("--disable-gpu")
-    opts.add_argument("--disable-dev-shm-usage")
-    opts.add_argument("--lang=ko-KR")
-    drv = webdriver.Chrome(options=opts)
-    drv.set_page_load_timeout(30)
-    return drv
-
-def _input_date_step_by_step(driver: webdriver.Chrome, date_str: str):
-    # 페이지 하단 스크롤
-    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    time.sleep(0.5)
+# 결과 표(caption 기준) 찾기 - 없으면 null
+_RESULT_TABLE_JS = """
+var tbls = document.getElementsByTagName('table');
+for (var i = 0; i < tbls.length; i++) {
+    var cap = tbls[i].getElementsByTagName('caption')[0];
+    if (cap && cap.textContent.indexOf('F/X Swap POINT 결과 표') >= 0) { return tbls[i]; }
+}
+return null;
+"""
+
+# 날짜를 한 번에 입력하고 입력 이벤트 발생
+_SET_VALUE_JS = """
+arguments[0].value = arguments[1];
+arguments[0].dispatchEvent(new Event('input', {bubbles: true}));
+arguments[0].dispatchEvent(new Event('change', {bubbles: true}));
+"""
+
+WAIT_TIMEOUT = 10   # 조건 대기 최대 시간 (초)
+WAIT_POLL = 0.1     # 조건 확인 주기 (초)
+
+def _result_table_html(driver: "webdriver.Chrome"):
+    """현재 결과 표 요소와 outerHTML (없으면 None, None)"""
+    table = driver.execute_script(_RESULT_TABLE_JS)
+    if table is None:
+        return None, None
+    return table, driver.execute_script("return arguments[0].outerHTML;", table)
+
+def _search_completed(old_table, old_html, date_str: str):
+    """
+    조회 완료 판정 조건 (WebDriverWait용)
+    
+    - 페이지가 다시 로드되어 이전 결과 표가 stale 상태가 되었거나
+    - 결과 표 내용이 바뀌었거나
+    - 결과 표에 요청한 날짜가 표시되면 완료
+    """
+    from selenium.common.exceptions import StaleElementReferenceException
+    
+    dotted = f"{date_str[:4]}.{date_str[4:6]}.{date_str[6:]}"
+    
+    def _cond(driver):
+        if driver.execute_script("return document.readyState;") != "complete":
+            return False
+        if old_table is not None:
+            try:
+                driver.execute_script("return arguments[0].tagName;", old_table)
+            except StaleElementReferenceException:
+                return True
+        _, html = _result_table_html(driver)
+        if html is None:
+            return False
+        return html != old_html or dotted in html or date_str in html
+    
+    return _cond
+
+def _input_date_step_by_step(driver: "webdriver.Chrome", date_str: str):
+    """
+    날짜 입력 후 조회 버튼을 누르고 결과 표가 갱신될 때까지 대기
+    
+    고정 sleep 없이 명시적 조건만 기다린다. 결과 갱신 대기가 시간 초과되면
+    페이지에는 이전 날짜의 결과 표가 남아 있으므로 False를 반환한다
+    (호출한 쪽은 그 날짜를 건너뛰고, 이전 표를 요청한 날짜로 저장하지 않는다).
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
     
     try:
-        search_input = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, '//*[@id="searchDate"]'))
+        search_input = WebDriverWait(driver, WAIT_TIMEOUT, poll_frequency=WAIT_POLL).until(
+            EC.presence_of_element_located((By.XPATH, '//*[@id="searchDate"]'))
         )
-        driver.execute_script("arguments[0].scrollIntoView(true);", search_input)
-        time.sleep(0.3)
-        search_input.click()
-        time.sleep(0.3)
-        
-        # 기존 내용 완전 삭제
-        driver.execute_script("arguments[0].value = '';", search_input)
-        search_input.send_keys(Keys.CONTROL + "a")
-        search_input.send_keys(Keys.DELETE)
-        search_input.clear()
-        for _ in range(20):
-            search_input.send_keys(Keys.BACK_SPACE)
-        time.sleep(0.2)
-        
-        # 날짜 입력
-        search_input.send_keys(date_str)
-        time.sleep(0.2)
-        
-        # 조회 버튼 클릭
-        search_btn = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, '//*[@id="frm_SearchDate"]/p[4]/a/img'))
+        search_btn = WebDriverWait(driver, WAIT_TIMEOUT, poll_frequency=WAIT_POLL).until(
+            EC.presence_of_element_located((By.XPATH, '//*[@id="frm_SearchDate"]/p[4]/a/img'))
         )
-        driver.execute_script("arguments[0].scrollIntoView(true);", search_btn)
-        time.sleep(0.3)
-        search_btn.click()
-        time.sleep(0.5)
-        
-        return True
-        
     except TimeoutException:
         return False
+    
+    old_table, old_html = _result_table_html(driver)
+    
+    # 날짜 입력 (키 입력 대신 값 할당 한 번)
+    driver.execute_script(_SET_VALUE_JS, search_input, date_str)
+    
+    # 조회 버튼 클릭
+    driver.execute_script("arguments[0].click();", search_btn)
+    
+    with span("fx_swap", "wait", date=date_str) as sp:
+        try:
+            WebDriverWait(driver, WAIT_TIMEOUT, poll_frequency=WAIT_POLL).until(
+                _search_completed(old_table, old_html, date_str)
+            )
+        except TimeoutException:
+            sp["status"] = "timeout"
+            return False
+    
+    return True
 
 def get_business_days_list(start_date: str, end_date: str) -> List[str]:
-    """pandas BDay를 사용해서 영업일 리스트 생성"""
+    """서울 외환시장 휴장일을 제외한 영업일 리스트 생성"""
     start = pd.to_datetime(start_date, format="%Y.%m.%d")
     end = pd.to_datetime(end_date, format="%Y.%m.%d")
     
     # 영업일 범위 생성
-    business_days = pd.bdate_range(start=start, end=end)
+    business_days = business_calendar.sessions(start, end, CALENDAR)
     
     return [d.strftime("%Y.%m.%d") for d in business_days]
 
@@ -170,36 +213,55 @@ def fetch_fx_swap_points_range_selenium(start_date: str, end_date: str | None =
     if end_date is None:
         end_date = datetime.today().strftime("%Y.%m.%d")
     
-    # pandas를 사용해서 영업일 리스트 생성
+    # 휴장일을 제외한 영업일 리스트 생성
     business_days_list = get_business_days_list(start_date, end_date)
     
+    return fetch_fx_swap_points_dates_selenium(business_days_list, headless=headless)
+
+def fetch_fx_swap_points_dates_selenium(business_days_list: List[str], headless: bool = True) -> pd.DataFrame:
+    """지정한 날짜들(YYYY.MM.DD)의 FX Swap Point 데이터를 브라우저 한 번으로 크롤링"""
+    today_str = datetime.today().strftime("%Y.%m.%d")
+    
     if not business_days_list:
         return pd.DataFrame()
 
-    driver = _build_driver(headless=headless)
+    pool = get_pool(headless=headless)
+    driver = pool.acquire()
     dfs: List[pd.DataFrame] = []
     
     try:
-        driver.get(SMBS_URL)
-        time.sleep(2)
+        with span("fx_swap", "fetch", url=SMBS_URL):
+            driver.get(SMBS_URL)
         
         for date_str in business_days_list:
             date_str_input = date_str.replace(".", "")  # YYYYMMDD 형식으로 변환
             
-            success = _input_date_step_by_step(driver, date_str_input)
-            if not success:
-                continue
-
-            time.sleep(1.5)
-            df_day = _parse_table(driver.page_source, date_str)
+            with span("fx_swap", "fetch", date=date_str) as sp:
+                success = _input_date_step_by_step(driver, date_str_input)
+                if not success:
+                    sp["status"] = "skipped"
+                    continue
+
+                html = driver.page_source
+                sp["bytes"] = len(html)
+            
+            with span("fx_swap", "parse", date=date_str) as sp:
+                df_day = _parse_table(html, date_str)
+                sp["bytes"] = len(html)
+                sp["rows"] = len(df_day)
+            
+            # 결과 표는 있는데 행이 없는 지난 날짜는 휴장일 후보로 기록
+            # (여러 번 비어 있어야 휴장일로 확정되어 다음부터 건너뜀)
+            if df_day.empty and "F/X Swap POINT 결과 표" in html and date_str < today_str:
+                if business_calendar.record_closure(date_str, CALENDAR):
+                    print(f"{date_str}: 휴장일로 확정")
             
             if not df_day.empty:
+                business_calendar.clear_closure(date_str, CALENDAR)
                 dfs.append(df_day)
-            
-            time.sleep(random.uniform(0.3, 0.7))
 
     finally:
-        driver.quit()
+        pool.release(driver)
 
     if not dfs:
         return pd.DataFrame()
@@ -251,27 +313,77 @@ def calculate_mid_values(df_all):
 
 # ==================== 데이터 업데이트 관련 함수들 ====================
 def get_next_business_day(date):
-    """주어진 날짜의 다음 영업일 반환"""
-    if isinstance(date, str):
-        date = pd.to_datetime(date).date()
-    elif hasattr(date, 'date'):
-        date = date.date()
+    """주어진 날짜의 다음 영업일 반환 (주말 및 서울 외환시장 휴장일 제외)"""
+    return business_calendar.next_session(date, CALENDAR)
+
+def _to_block(frame):
+    """xlwings로 한 번에 보낼 2-D object 배열 (NaN -> 빈 셀)"""
+    block = frame.to_numpy(dtype=object)
+    block[pd.isna(block)] = None
+    return block
+
+def _write_delta(ws, frame):
+    """
+    시트와 frame을 비교해 바뀐 구간만 기록
+    
+    헤더(레이아웃)가 같으면 시트의 마지막 행 키(날짜)를 확인해
+    기존 행이 frame의 앞부분과 같으면 마지막 행부터, 아니면 키 열을 한 번 읽어
+    처음 달라지는 행부터 끝까지를 연속된 2-D 배열 하나로 기록한다.
+    레이아웃이 다르면 시트 전체를 다시 쓴다.
+    
+    Returns:
+    --------
+    tuple
+        (방식, 기록 시작 행(0부터, frame 기준), 기록한 행 수)
+    """
+    n_cols = frame.shape[1]
+    header = [str(c) for c in frame.columns]
+    last = ws.used_range.last_cell
+    stored_rows = last.row - 1
+    stored_header = ws.range((1, 1), (1, n_cols)).value if n_cols > 1 else [ws.range((1, 1)).value]
     
-    next_day = date + timedelta(days=1)
-    while next_day.weekday() >= 5:  # 0=월요일, 6=일요일
-        next_day += timedelta(days=1)
-    return next_day
+    if last.column != n_cols or [str(c) for c in stored_header] != header or stored_rows < 1:
+        ws.clear()
+        ws.range((1, 1)).value = [header]
+        if len(frame):
+            ws.range((2, 1)).value = _to_block(frame)
+        return "full", 0, len(frame)
+    
+    keys = pd.DatetimeIndex(frame.iloc[:, 0])
+    last_key = ws.range((last.row, 1)).value
+    if stored_rows <= len(frame) and pd.Timestamp(last_key) == keys[stored_rows - 1]:
+        # 기존 행은 그대로, 마지막 행(당일 재수집 가능)부터 기록
+        start = stored_rows - 1
+    else:
+        stored_keys = pd.DatetimeIndex(ws.range((2, 1), (last.row, 1)).options(ndim=1).value)
+        n = min(len(stored_keys), len(keys))
+        diff = np.flatnonzero(stored_keys[:n] != keys[:n])
+        start = int(diff[0]) if len(diff) else n
+        if len(frame) < stored_rows:
+            ws.range((len(frame) + 2, 1), (last.row, n_cols)).clear_contents()
+    
+    if start < len(frame):
+        ws.range((start + 2, 1)).value = _to_block(frame.iloc[start:])
+    return "delta", start, len(frame) - start
 
 def save_to_excel(df, excel_path, sheet_name):
-    """DataFrame을 Excel 시트에 저장"""
+    """
+    DataFrame을 Excel 시트에 저장
+    
+    새로 추가되거나 바뀐 행만 기록하고 (_write_delta), 시트 레이아웃이 다르면 전체를 다시 쓴다.
+    """
+    import xlwings as xw
+    
     try:
-        wb = xw.Book(excel_path)
-        ws = wb.sheets[sheet_name]
-        ws.clear()
-        df_with_index = df.reset_index()
-        ws.range("A1").value = df_with_index
-        wb.save()
-        print(f"Excel 저장 완료: {sheet_name} 시트")
+        with span("fx_swap", "write", sheet=sheet_name) as sp:
+            wb = xw.Book(excel_path)
+            ws = wb.sheets[sheet_name]
+            df_with_index = df.reset_index()
+            mode, start, n_written = _write_delta(ws, df_with_index)
+            wb.save()
+            sp["rows"] = n_written
+            sp["mode"] = mode
+        print(f"Excel 저장 완료: {sheet_name} 시트 ({mode}, {n_written}행)")
         return True
     except Exception as e:
         print(f"Excel 저장 실패: {e}")
@@ -297,7 +409,10 @@ def update_fx_swap_incremental(csv_file="fx_swap_mid.csv", save_csv=True, excel_
             return None
         
         # 2. 기존 데이터 로드
-        existing_df = pd.read_csv(csv_file, index_col=0, parse_dates=True)
+        with span("fx_swap", "parse", file=csv_file) as sp:
+            existing_df = pd.read_csv(csv_file, index_col=0, parse_dates=True)
+            sp["bytes"] = os.path.getsize(csv_file)
+            sp["rows"] = len(existing_df)
         last_date = existing_df.index[-1]
         
         if isinstance(last_date, str):
@@ -306,7 +421,7 @@ def update_fx_swap_incremental(csv_file="fx_swap_mid.csv", save_csv=True, excel_
         print(f"기존 데이터 마지막 날짜: {last_date.strftime('%Y-%m-%d')}")
         
         # 3. 업데이트 날짜 범위 계산
-        start_date = last_date + pd.tseries.offsets.BDay(1)  # 다음 영업일
+        start_date = pd.Timestamp(get_next_business_day(last_date))  # 다음 영업일
         end_date = pd.Timestamp.today()
         
         if start_date > end_date:
@@ -327,7 +442,11 @@ def update_fx_swap_incremental(csv_file="fx_swap_mid.csv", save_csv=True, excel_
             return existing_df
         
         df_new.columns = ["Side", "1M", "2M", "3M", "6M", "1Y"]
-        df_new_mid = calculate_mid_values(df_new)
+        # Bid/Offer 원본 보관 (Mid 재계산용, CSV와 같은 디렉토리)
+        swap_store.record_quotes(df_new, swap_store.depth_path(csv_file))
+        with span("fx_swap", "compute", step="mid") as sp:
+            df_new_mid = calculate_mid_values(df_new)
+            sp["rows"] = len(df_new_mid)
         
         if df_new_mid.empty:
             print("Mid 값 계산 실패")
@@ -345,7 +464,11 @@ def update_fx_swap_incremental(csv_file="fx_swap_mid.csv", save_csv=True, excel_
         
         # 6. CSV 저장 (옵션)
         if save_csv:
-            combined_df.to_csv(csv_file)
+            with span("fx_swap", "write", file=csv_file) as sp:
+                combined_df.to_csv(csv_file)
+                sp["bytes"] = os.path.getsize(csv_file)
+                sp["rows"] = len(combined_df)
+            data_catalog.record("swap_points", combined_df, path=csv_file, track_file=True)
             print(f"CSV 저장 완료: {csv_file}")
         else:
             print("CSV 저장 건너뜀")
@@ -362,6 +485,70 @@ def update_fx_swap_incremental(csv_file="fx_swap_mid.csv", save_csv=True, excel_
         traceback.print_exc()
         return None
 
+def repair_fx_swap_gaps(csv_file="fx_swap_mid.csv", start_date=None, end_date=None, save_csv=True, headless=True):
+    """
+    이력 중간에 빠진 영업일을 찾아 한 번에 수집하고 제자리에 병합
+    
+    Parameters:
+    - csv_file: 기존 CSV 파일 경로
+    - start_date: 검사 시작일 (기본값: 저장된 첫 날짜)
+    - end_date: 검사 종료일 (기본값: 오늘)
+    - save_csv: CSV 파일 저장 여부
+    - headless: 브라우저 headless 여부
+    
+    Returns:
+    - pd.DataFrame: 보완된 전체 데이터 (실패 시 None)
+    """
+    if not os.path.exists(csv_file):
+        print(f"기존 CSV 파일({csv_file})이 없습니다. 전체 수집이 필요합니다.")
+        return None
+    
+    existing_df = pd.read_csv(csv_file, index_col=0, parse_dates=True)
+    missing = business_calendar.missing_sessions(existing_df.index, start=start_date, end=end_date, calendar=CALENDAR)
+    
+    if len(missing) == 0:
+        print("빠진 영업일이 없습니다.")
+        return existing_df
+    
+    print(f"빠진 영업일: {len(missing)}일 ({missing[0].strftime('%Y-%m-%d')} ~ {missing[-1].strftime('%Y-%m-%d')})")
+    
+    df_new = fetch_fx_swap_points_dates_selenium([d.strftime("%Y.%m.%d") for d in missing], headless=headless)
+    if df_new.empty:
+        print("빠진 날짜의 데이터를 받지 못했습니다.")
+        return existing_df
+    
+    df_new.columns = ["Side", "1M", "2M", "3M", "6M", "1Y"]
+    # Bid/Offer 원본 보관 (Mid 재계산용, CSV와 같은 디렉토리)
+    swap_store.record_quotes(df_new, swap_store.depth_path(csv_file))
+    with span("fx_swap", "compute", step="mid") as sp:
+        df_new_mid = calculate_mid_values(df_new)
+        sp["rows"] = len(df_new_mid)
+    
+    # 기존 행은 그대로 두고 빠진 날짜만 끼워 넣음
+    df_new_mid = df_new_mid[~df_new_mid.index.isin(existing_df.index)]
+    if df_new_mid.empty:
+        print("새로 채울 데이터가 없습니다.")
+        return existing_df
+    
+    combined_df = pd.concat([existing_df, df_new_mid], axis=0).sort_index(kind="stable")
+    
+    still_missing = business_calendar.missing_sessions(combined_df.index, start=start_date, end=end_date, calendar=CALENDAR)
+    print(f"채운 날짜: {len(df_new_mid)}일, 남은 빈 날짜: {len(still_missing)}일")
+    
+    if save_csv:
+        with span("fx_swap", "write", file=csv_file) as sp:
+            if df_new_mid.index.min() > existing_df.index.max():
+                # 모두 마지막 날짜 이후라면 파일 끝에 추가만 함
+                df_new_mid.to_csv(csv_file, mode="a", header=False)
+            else:
+                combined_df.to_csv(csv_file, encoding='utf-8-sig')
+            sp["bytes"] = os.path.getsize(csv_file)
+            sp["rows"] = len(df_new_mid)
+        data_catalog.record("swap_points", combined_df, path=csv_file, track_file=True)
+        print(f"CSV 저장 완료: {csv_file}")
+    
+    return combined_df
+
 def load_existing_data(csv_file="fx_swap_mid.csv"):
     """기존 데이터 로드"""
     if os.path.exists(csv_file):
@@ -378,8 +565,13 @@ def check_data_status(csv_file="fx_swap_mid.csv"):
     print("=== 데이터 상태 확인 ===")
     
     if os.path.exists(csv_file):
-        df = pd.read_csv(csv_file, index_col=0, parse_dates=True)
-        last_date = df.index.max().date()
+        # 카탈로그가 최신이면 CSV를 읽지 않음
+        last_date = data_catalog.last_date("swap_points", path=csv_file)
+        if last_date is None:
+            df = pd.read_csv(csv_file, index_col=0, parse_dates=True)
+            data_catalog.record("swap_points", df, path=csv_file, track_file=True)
+            last_date = df.index.max()
+        last_date = last_date.date()
         next_business = get_next_business_day(last_date)
         today = datetime.now().date()
         
@@ -388,7 +580,7 @@ def check_data_status(csv_file="fx_swap_mid.csv"):
         print(f"오늘 날짜: {today.strftime('%Y-%m-%d')}")
         
         # 업데이트 가능한 영업일 계산
-        business_days = pd.bdate_range(start=next_business, end=today)
+        business_days = business_calendar.sessions(next_business, today, CALENDAR)
         print(f"업데이트 가능한 영업일: {len(business_days)}일")
         
         if len(business_days) > 0:
@@ -398,20 +590,52 @@ def check_data_status(csv_file="fx_swap_mid.csv"):
     else:
         print("기존 데이터 파일이 없습니다. 전체 수집이 필요합니다.")
 
+def refresh_swap_points(csv_file="fx_swap_mid.csv"):
+    """
+    CSV 증분 업데이트 후 전체 데이터를 CSV(utf-8-sig)에 다시 저장
+    
+    Returns:
+    - pd.DataFrame: 업데이트된 전체 데이터 (실패 시 None)
+    """
+    updated_df = update_fx_swap_incremental(
+        csv_file=csv_file,
+        save_csv=False,  # utf-8-sig로 아래에서 직접 저장
+        excel_path=None,
+        sheet_name=None
+    )
+    
+    if updated_df is None:
+        print("데이터 업데이트 실패")
+        return None
+    
+    try:
+        with span("fx_swap", "write", file=csv_file) as sp:
+            updated_df.to_csv(csv_file, encoding='utf-8-sig')
+            sp["bytes"] = os.path.getsize(csv_file)
+            sp["rows"] = len(updated_df)
+        data_catalog.record("swap_points", updated_df, path=csv_file, track_file=True)
+        print(f"✓ 기존 CSV 파일 업데이트 완료: {csv_file}")
+    except Exception as e:
+        print(f"✗ CSV 저장 실패: {e}")
+    
+    return updated_df
+
 # ==================== 메인 실행 부분 ====================
 if __name__ == "__main__":
+    import sys
+    warnings.filterwarnings('ignore')
+    
+    # 빠진 영업일 보완 모드: python fx_swap_updater.py --repair
+    if "--repair" in sys.argv:
+        repair_fx_swap_gaps("fx_swap_mid.csv")
+        sys.exit(0)
+    
     # 데이터 상태 확인
     check_data_status()
     
     print("\n" + "="*50)
     
-    # 데이터 조회만 (저장 안함)
-    updated_df = update_fx_swap_incremental(
-        csv_file="fx_swap_mid.csv",
-        save_csv=False,  # CSV 저장 안함
-        excel_path=None,  # Excel 저장 안함
-        sheet_name=None   # 시트 저장 안함
-    )
+    updated_df = refresh_swap_points("fx_swap_mid.csv")
     
     if updated_df is not None:
         print("\n=== 최근 5행 데이터 ===")
@@ -422,30 +646,5 @@ if __name__ == "__main__":
         print(f"기간: {updated_df.index.min().strftime('%Y-%m-%d')} ~ {updated_df.index.max().strftime('%Y-%m-%d')}")
         print(f"컬럼: {list(updated_df.columns)}")
         
-        # 업데이트된 데이터를 기존 CSV 파일에 저장
-        print("\n" + "="*50)
-        print("업데이트된 데이터를 CSV 파일에 저장 중...")
-        try:
-            updated_df.to_csv("fx_swap_mid.csv", encoding='utf-8-sig')
-            print("✓ 기존 CSV 파일 업데이트 완료: fx_swap_mid.csv")
-        except Exception as e:
-            print(f"✗ CSV 저장 실패: {e}")
-            
-    else:
-        print("데이터 업데이트 실패")
-
-
-Swap_Point=updated_df
-
-
-
-import os
-import inspect
-
-path = r"C:\Users\jesst\Agora\FX\FX_automation.xlsx"
-import pandas as pd
-# Swap_Point.index = pd.to_datetime(Swap_Point.index).strftime("%Y-%m-%d")
-print(Swap_Point)
-with pd.ExcelWriter(path, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
-    Swap_Point.to_excel(writer, sheet_name="Swap_Point", index=True)
-
+        # Swap_Point 시트 저장
+        publish_sheets(EXCEL_PATH, {"Swap_Point": updated_df})
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+기간별 수익률 (horizon) 엔진
+
+정렬된 날짜 인덱스에서 기준일(anchor) 위치를 searchsorted 한 번으로 찾고,
+(통화, 기간) 수익률 표를 한 번의 배열 연산으로 만든다.
+
+기간 표기:
+    YTD / QTD / MTD      최근 날짜가 속한 연/분기/월의 첫 거래일
+    1W, 1M, 3M, 6M, 1Y   최근 날짜에서 달력 기준으로 거슬러 올라간 날 (그날 또는 직전 거래일)
+    10D                  달력 기준 n일 전 (그날 또는 직전 거래일)
+    5B, 21B              n 거래일(열) 전. 이력이 짧으면 첫 열
+    "2024-12-31" 등 날짜  그날 또는 직전 거래일
+
+사용 예:
+    from horizons import horizon_returns
+
+    table = horizon_returns(fx_matrix_clean)            # 행=통화, 열=기간 (%)
+    table = horizon_returns(fx_matrix_clean, {"WoW(%)": "5B", "YTD(%)": "YTD"})
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_HORIZONS = ["MTD", "QTD", "YTD", "1W", "1M", "3M", "6M", "1Y"]
+
+_PERIOD_STARTS = {
+    "YTD": lambda t: pd.Timestamp(t.year, 1, 1),
+    "QTD": lambda t: pd.Timestamp(t.year, 3 * ((t.month - 1) // 3) + 1, 1),
+    "MTD": lambda t: pd.Timestamp(t.year, t.month, 1),
+}
+_LOOKBACK = re.compile(r"^(\d+)([DWMY])$")
+_POSITIONAL = re.compile(r"^(\d+)B$")
+
+def _lookback_offset(n, unit):
+    if unit == "D":
+        return pd.DateOffset(days=n)
+    if unit == "W":
+        return pd.DateOffset(weeks=n)
+    if unit == "M":
+        return pd.DateOffset(months=n)
+    return pd.DateOffset(years=n)
+
+def _normalize(horizons):
+    """list(기간 표기) 또는 dict(이름 -> 기간 표기)를 dict로"""
+    if horizons is None:
+        horizons = DEFAULT_HORIZONS
+    if isinstance(horizons, dict):
+        return dict(horizons)
+    return {str(h): h for h in horizons}
+
+def resolve_anchors(dates, horizons=None):
+    """
+    기간별 기준일의 열 위치
+
+    기준일 후보를 모두 모은 뒤 정수 시각 배열에서 searchsorted(side="right") 한 번으로 찾는다.
+    (기간 시작일 s의 "s 이상 첫 날짜"는 s보다 한 단위 앞선 시각의 right 위치와 같다)
+
+    Parameters:
+    -----------
+    dates : DatetimeIndex
+        오름차순 날짜 (예: fx_matrix_clean.columns)
+    horizons : list or dict or None
+        기간 표기 목록, 또는 {이름: 기간 표기} (기본값: DEFAULT_HORIZONS)
+
+    Returns:
+    --------
+    pd.Series
+        이름 -> 열 위치 (int). 이력 밖이면 -1
+    """
+    horizons = _normalize(horizons)
+    dates = pd.DatetimeIndex(dates)
+    n = len(dates)
+    if n == 0:
+        return pd.Series(-1, index=list(horizons), dtype=np.int64)
+    latest = dates[-1]
+
+    names, targets, is_start, positional = [], [], [], {}
+    for name, spec in horizons.items():
+        key = spec.upper() if isinstance(spec, str) else spec
+        if isinstance(key, str) and key in _PERIOD_STARTS:
+            names.append(name)
+            targets.append(_PERIOD_STARTS[key](latest))
+            is_start.append(True)
+        elif isinstance(key, str) and _POSITIONAL.match(key):
+            positional[name] = max(0, n - 1 - int(_POSITIONAL.match(key).group(1)))
+        elif isinstance(key, str) and _LOOKBACK.match(key):
+            k, unit = _LOOKBACK.match(key).groups()
+            names.append(name)
+            targets.append(latest - _lookback_offset(int(k), unit))
+            is_start.append(False)
+        else:
+            try:
+                anchor = pd.Timestamp(spec)
+            except (ValueError, TypeError):
+                raise ValueError(f"알 수 없는 기간 표기: {spec!r}")
+            names.append(name)
+            targets.append(anchor)
+            is_start.append(False)
+
+    ticks = pd.DatetimeIndex(targets).as_unit(dates.unit).asi8 - np.asarray(is_start, dtype=np.int64)
+    pos = np.searchsorted(dates.asi8, ticks, side="right")
+    # 기간 시작: 그 위치가 곧 첫 거래일 / 과거 시점: 직전 위치가 그날 또는 직전 거래일
+    pos = np.where(is_start, pos, pos - 1)
+    pos = np.where(pos >= n, -1, pos)
+
+    out = pd.Series(dict(zip(names, pos.astype(np.int64))), dtype=np.int64)
+    for name, p in positional.items():
+        out[name] = p
+    return out.reindex(list(horizons))
+
+def horizon_returns(frame, horizons=None):
+    """
+    (통화, 기간) 수익률 표 (%)
+
+    Parameters:
+    -----------
+    frame : pd.DataFrame
+        행=통화, 열=오름차순 날짜 (예: fx_matrix_clean)
+    horizons : list or dict or None
+        resolve_anchors와 같음
+
+    Returns:
+    --------
+    pd.DataFrame
+        행=통화, 열=기간 이름. 최근 값 / 기준일 값 - 1 (%), 기준일이 없으면 NaN
+    """
+    pos = resolve_anchors(frame.columns, horizons)
+    values = frame.to_numpy(dtype=float)
+    idx = pos.to_numpy()
+    if values.shape[1] == 0:
+        base = np.full((values.shape[0], len(idx)), np.nan)
+        current = np.full((values.shape[0], 1), np.nan)
+    else:
+        base = values[:, np.maximum(idx, 0)]
+        base[:, idx < 0] = np.nan
+        current = values[:, -1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        table = (current / base - 1) * 100
+    return pd.DataFrame(table, index=frame.index, columns=pos.index)
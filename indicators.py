@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+벡터화 지표 라이브러리
+
+모든 함수는 마지막 축을 시간 축으로 보는 1-D/2-D 배열을 받는다.
+(예: fx_matrix처럼 행=통화, 열=날짜인 배열을 그대로 넣으면 통화별 결과가 한 번에 나온다)
+롤링 합/평균/분산은 누적합 차분으로 계산하므로 통화마다 Series를 만들지 않는다.
+
+NaN 규칙 (pandas rolling 기본값과 동일):
+    윈도우 안에 NaN이 하나라도 있거나 관측치가 window보다 적으면 결과는 NaN
+
+사용 예:
+    import indicators as ind
+
+    values = fx_matrix.to_numpy(dtype=float)      # (통화, 날짜)
+    rets = ind.pct_change(values)
+    vol = ind.rolling_vol(rets, 21)[:, -1]        # 통화별 최근 21일 연율 변동성
+"""
+import warnings
+
+import numpy as np
+
+TRADING_DAYS = 252
+
+def _as_float(x):
+    return np.asarray(x, dtype=float)
+
+# ==================== 기본 변환 ====================
+def pct_change(x):
+    """직전 대비 변화율 (첫 열은 NaN)"""
+    x = _as_float(x)
+    out = np.full(x.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(x[..., 1:], x[..., :-1], out=out[..., 1:])
+    out[..., 1:] -= 1
+    return out
+
+def diff(x):
+    """직전 대비 차이 (첫 열은 NaN)"""
+    x = _as_float(x)
+    out = np.full(x.shape, np.nan)
+    np.subtract(x[..., 1:], x[..., :-1], out=out[..., 1:])
+    return out
+
+# ==================== 롤링 커널 ====================
+def _window_diff(c, window):
+    """누적합 c에서 길이 window 구간 합 (앞 window-1 열은 NaN)"""
+    out = np.full(c.shape, np.nan)
+    if c.shape[-1] < window:
+        return out
+    out[..., window - 1] = c[..., window - 1]
+    np.subtract(c[..., window:], c[..., :-window], out=out[..., window:])
+    return out
+
+def rolling_sum(x, window):
+    """
+    window 구간 합 (누적합 차분)
+
+    Parameters:
+    -----------
+    x : array-like
+        마지막 축이 시간인 1-D/2-D 배열
+    window : int
+        구간 길이
+
+    Returns:
+    --------
+    np.ndarray
+        x와 같은 모양. 구간에 NaN이 있거나 관측치가 부족하면 NaN
+    """
+    x = _as_float(x)
+    nan = np.isnan(x)
+    out = _window_diff(np.cumsum(np.where(nan, 0.0, x), axis=-1), window)
+    if nan.any():
+        n_nan = _window_diff(np.cumsum(nan, axis=-1, dtype=float), window)
+        out[n_nan > 0] = np.nan
+    return out
+
+def rolling_mean(x, window):
+    """window 구간 평균"""
+    return rolling_sum(x, window) / window
+
+def rolling_var(x, window, ddof=1):
+    """
+    window 구간 분산
+
+    누적합 차분의 자릿수 손실을 줄이기 위해 전체 평균을 빼고 계산한다
+    (분산은 평행이동에 불변).
+    """
+    x = _as_float(x)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        center = np.nanmean(x, axis=-1, keepdims=True) if x.size else 0.0
+    xc = x - np.nan_to_num(center)
+    s1 = rolling_sum(xc, window)
+    s2 = rolling_sum(xc * xc, window)
+    var = (s2 - s1 * s1 / window) / (window - ddof)
+    return np.maximum(var, 0.0, where=~np.isnan(var), out=var)
+
+def rolling_std(x, window, ddof=1):
+    """window 구간 표준편차"""
+    return np.sqrt(rolling_var(x, window, ddof))
+
+def rolling_zscore(x, window, ddof=0):
+    """각 시점 값의 직전 window 구간(자기 포함) 대비 z-score"""
+    x = _as_float(x)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (x - rolling_mean(x, window)) / rolling_std(x, window, ddof)
+
+def zscore(x, ddof=0):
+    """전체 기간 평균/표준편차 기준 z-score (NaN 제외)"""
+    x = _as_float(x)
+    with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(x, axis=-1, keepdims=True)
+        std = np.nanstd(x, axis=-1, ddof=ddof, keepdims=True)
+        return (x - mean) / std
+
+# ==================== 지수 가중 ====================
+def ewma(x, alpha, min_periods=1):
+    """
+    지수가중 이동평균 (adjust=False 재귀식)
+
+    시간 축으로만 반복하고 각 시점은 모든 행을 한 번에 갱신한다.
+    NaN 시점은 직전 값을 유지한다.
+
+    Parameters:
+    -----------
+    x : array-like
+        마지막 축이 시간인 1-D/2-D 배열
+    alpha : float
+        평활 계수 (0 < alpha <= 1)
+    min_periods : int
+        유효 관측치가 이보다 적은 구간은 NaN
+    """
+    x = _as_float(x)
+    out = np.empty(x.shape)
+    prev = np.full(x.shape[:-1], np.nan)
+    for t in range(x.shape[-1]):
+        xt = x[..., t]
+        upd = prev + alpha * (xt - prev)
+        prev = np.where(np.isnan(xt), prev, np.where(np.isnan(prev), xt, upd))
+        out[..., t] = prev
+    if min_periods > 1:
+        out[np.cumsum(~np.isnan(x), axis=-1) < min_periods] = np.nan
+    return out
+
+# ==================== 변동성 ====================
+def rolling_vol(returns, window=21, periods=TRADING_DAYS, ddof=1):
+    """window 구간 표준편차를 연율화한 변동성 (수익률 단위, %는 100을 곱함)"""
+    return rolling_std(returns, window, ddof) * np.sqrt(periods)
+
+def ewma_vol(returns, lam=0.94, periods=TRADING_DAYS, min_periods=1):
+    """RiskMetrics 방식 EWMA 변동성 (연율, 수익률 단위)"""
+    r = _as_float(returns)
+    return np.sqrt(ewma(r * r, 1.0 - lam, min_periods) * periods)
+
+# ==================== RSI ====================
+def rsi(x, window=14, method="sma"):
+    """
+    RSI (0~100)
+
+    Parameters:
+    -----------
+    x : array-like
+        RSI를 계산할 시계열 (마지막 축이 시간)
+    window : int
+        기간
+    method : str
+        "sma"    상승/하락폭의 단순 이동평균
+        "wilder" Wilder 평활 (alpha = 1/window 지수가중)
+
+    Returns:
+    --------
+    np.ndarray
+        x와 같은 모양. 하락폭 평균이 0이면 100
+    """
+    d = diff(x)
+    # pandas where(delta > 0, 0)와 같이 NaN 변화량은 0으로 취급
+    gain = np.where(d > 0, d, 0.0)
+    loss = np.where(d < 0, -d, 0.0)
+    if method == "sma":
+        avg_gain = rolling_mean(gain, window)
+        avg_loss = rolling_mean(loss, window)
+    elif method == "wilder":
+        avg_gain = ewma(gain, 1.0 / window, window)
+        avg_loss = ewma(loss, 1.0 / window, window)
+    else:
+        raise ValueError("method must be one of 'sma' | 'wilder'")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+# ==================== 낙폭 ====================
+def drawdown(x):
+    """전고점 대비 낙폭 (비율, 0 이하). 전고점은 NaN을 건너뛴 누적 최대값"""
+    x = _as_float(x)
+    running_max = np.fmax.accumulate(x, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return x / running_max - 1
+
+def max_drawdown(x):
+    """기간 중 최대 낙폭 (비율)"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmin(drawdown(x), axis=-1)
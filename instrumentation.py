@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+단계별 계측 (span)
+
+각 업데이터의 fetch / parse / compute / write (필요하면 wait) 단계를
+span으로 기록한다. span 하나에는 소요 시간, 바이트 수, 행 수, 재시도 횟수가 담기며
+실행(run) 단위로 JSON lines 파일로 내보낼 수 있다.
+
+사용 예:
+    from instrumentation import span
+
+    with span("fx_swap", "parse", date=date_str) as sp:
+        df = _parse_table(html, date_str)
+        sp["bytes"] = len(html)
+        sp["rows"] = len(df)
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+STAGES = ("fetch", "wait", "parse", "compute", "write")
+
+class Profiler:
+    """span 수집기 (스레드 안전)"""
+
+    def __init__(self, run_id=None):
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.spans = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._next_id = 0
+
+    def reset(self, run_id=None):
+        """새 실행 시작 - 기존 span 삭제"""
+        with self._lock:
+            self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+            self.spans = []
+            self._next_id = 0
+
+    @contextlib.contextmanager
+    def span(self, updater, stage, **attrs):
+        """
+        단계 하나를 계측하는 context manager
+
+        Parameters:
+        -----------
+        updater : str
+            업데이터 이름 (fx_yfinance, fx_swap, kmb, krx_flow, kospi, workbook ...)
+        stage : str
+            fetch / wait / parse / compute / write
+        attrs : dict
+            추가로 기록할 값 (예: date, symbol, sheet)
+
+        Yields:
+        -------
+        dict
+            span 레코드. bytes, rows, retries 등을 블록 안에서 채운다.
+        """
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+
+        with self._lock:
+            span_id = self._next_id
+            self._next_id += 1
+
+        record = {
+            "run_id": self.run_id,
+            "span_id": span_id,
+            "parent_id": stack[-1] if stack else None,
+            "updater": updater,
+            "stage": stage,
+            "thread": threading.current_thread().name,
+            "start": time.time(),
+            "duration_s": None,
+            "bytes": None,
+            "rows": None,
+            "retries": 0,
+            "status": "ok",
+        }
+        record.update(attrs)
+
+        stack.append(span_id)
+        t0 = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record["duration_s"] = time.perf_counter() - t0
+            stack.pop()
+            with self._lock:
+                self.spans.append(record)
+
+    def export_jsonl(self, path):
+        """수집한 span을 JSON lines로 저장 (한 줄에 span 하나)"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._lock:
+            spans = sorted(self.spans, key=lambda r: r["span_id"])
+        with open(path, "w", encoding="utf-8") as f:
+            for record in spans:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        return path
+
+    def summary(self):
+        """
+        업데이터/단계별 합계
+
+        Returns:
+        --------
+        pd.DataFrame
+            count, total_s, max_s, bytes, rows, retries, errors
+        """
+        import pandas as pd
+
+        with self._lock:
+            df = pd.DataFrame(self.spans)
+        if df.empty:
+            return df
+        df["errors"] = (df["status"] == "error").astype(int)
+        return (
+            df.groupby(["updater", "stage"])
+              .agg(count=("span_id", "size"), total_s=("duration_s", "sum"),
+                   max_s=("duration_s", "max"), bytes=("bytes", "sum"),
+                   rows=("rows", "sum"), retries=("retries", "sum"),
+                   errors=("errors", "sum"))
+              .sort_values("total_s", ascending=False)
+        )
+
+# 기본 수집기 - 모듈 함수 span()은 이 수집기에 기록
+PROFILER = Profiler()
+
+def span(updater, stage, **attrs):
+    """PROFILER.span 단축 함수"""
+    return PROFILER.span(updater, stage, **attrs)
+
+def load_profile(path):
+    """JSON lines 프로파일 읽기 (실행 간 비교용)"""
+    import pandas as pd
+
+    with open(path, encoding="utf-8") as f:
+        return pd.DataFrame([json.loads(line) for line in f if line.strip()])
@@ -0,0 +1,140 @@
+# Net Buying Value by Investor Type (all investor columns at once)
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from workbook import EXCEL_PATH, publish_sheets
+from instrumentation import span
+import indicators as ind
+from trading_value_kospi import fetch_trading_value, fetch_market_frames, SUM_WINDOW, Z_WINDOW
+
+# Columns of get_market_trading_value_by_date that are not an investor type
+NON_INVESTOR_COLUMNS = ["전체"]
+
+METRICS = [
+    "Net Buying (Daily)",
+    "Net Buying (YTD Cumulative)",
+    "Net Buying (Recent 20 Trading Days Cumulative)",
+    "Daily Net Buying Z-score (Historical)",
+    "Recent 20 Trading Days Cumulative Z-score (60D)",
+]
+
+def _ytd_cumsum(values: np.ndarray, years: np.ndarray) -> np.ndarray:
+    """
+    Cumulative sum along the last axis that restarts at every new year.
+
+    One cumsum over the whole range, minus the running total at the end of
+    the previous year (broadcast to each row of that year).
+    """
+    total = np.cumsum(values, axis=-1)
+    new_year = np.r_[True, years[1:] != years[:-1]]
+    starts = np.flatnonzero(new_year)
+    base = np.zeros(values.shape[:-1] + (len(starts),))
+    base[..., 1:] = total[..., starts[1:] - 1]
+    return total - base[..., np.cumsum(new_year) - 1]
+
+def investor_flow_arrays(df: pd.DataFrame) -> dict:
+    """
+    Compute the flow metrics for every investor type as 2-D arrays.
+
+    Args:
+        df (pd.DataFrame): Output of fetch_trading_value (date index, investor columns)
+
+    Returns:
+        dict: {metric: np.ndarray of shape (n_investors, n_dates)} in METRICS order,
+              plus "investors" (column names) and "dates" (DatetimeIndex)
+    """
+    investors = [c for c in df.columns if c not in NON_INVESTOR_COLUMNS]
+    dates = pd.DatetimeIndex(df.index)
+    # (investor, date) so every kernel runs along the last axis for all investors at once
+    values = df[investors].to_numpy(dtype=float).T
+
+    sum20 = ind.rolling_sum(values, SUM_WINDOW)
+    return {
+        "investors": investors,
+        "dates": dates,
+        METRICS[0]: values,
+        METRICS[1]: _ytd_cumsum(values, dates.year.to_numpy()),
+        METRICS[2]: sum20,
+        METRICS[3]: ind.zscore(values, ddof=0),
+        METRICS[4]: ind.rolling_zscore(sum20, Z_WINDOW, ddof=0),
+    }
+
+def compute_investor_flow_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Flow metrics for every investor type in one frame.
+
+    Args:
+        df (pd.DataFrame): Output of fetch_trading_value
+
+    Returns:
+        pd.DataFrame: Columns "<metric> [<investor>]", grouped by investor
+    """
+    arrays = investor_flow_arrays(df)
+    investors = arrays["investors"]
+    # (metric, investor, date) -> (date, investor * metric)
+    stacked = np.stack([arrays[m] for m in METRICS], axis=1)
+    data = stacked.reshape(len(investors) * len(METRICS), -1).T
+    columns = [f"{m} [{inv}]" for inv in investors for m in METRICS]
+    out = pd.DataFrame(data, index=arrays["dates"], columns=columns)
+    out.index.name = "Date"
+    return out.sort_index()
+
+def get_investor_flow(start: str, end: str, market: str = "KOSPI", detail: bool = True,
+                      df: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    Compute the flow metrics for every investor type from one download.
+
+    Args:
+        start (str): Start date in YYYYMMDD format
+        end (str): End date in YYYYMMDD format
+        market (str): Market type - "KOSPI" | "KOSDAQ" | "BOTH"
+        detail (bool): Split institutions (pension funds, insurance, ...)
+        df (pd.DataFrame | None): An already fetched fetch_trading_value frame
+            (e.g. fetch_market_frames()[market]); downloaded here if None
+
+    Returns:
+        pd.DataFrame: Output of compute_investor_flow_metrics
+    """
+    if df is None:
+        df = fetch_trading_value(start, end, market, detail=detail)
+    with span("krx_flow", "compute", market=market, step="investor_types") as sp:
+        out = compute_investor_flow_metrics(df)
+        sp["rows"] = len(out)
+    return out
+
+def build_investor_flow_sheet(start: str = "19981207", end: str | None = None,
+                              frames: dict | None = None) -> pd.DataFrame:
+    """
+    Build the Kospi_Investor_Flow sheet frame with a "YYYY-MM-DD" string index.
+
+    Args:
+        start (str): Start date in YYYYMMDD format
+        end (str): End date in YYYYMMDD format (default: today)
+        frames (dict | None): Output of fetch_market_frames, shared with
+            Kospi_Liquidity (downloaded here if None)
+
+    Returns:
+        pd.DataFrame: Investor flow metrics ready to be written to the workbook
+    """
+    if end is None:
+        end = datetime.today().strftime("%Y%m%d")
+    df = frames["KOSPI"] if frames is not None else None
+    investor_flow = get_investor_flow(start, end, market="KOSPI", df=df)
+    investor_flow.index = investor_flow.index.strftime("%Y-%m-%d")
+    return investor_flow
+
+def main(excel_path: str = EXCEL_PATH, start: str = "19981207"):
+    from trading_value_kospi import build_kospi_liquidity
+
+    # One detail-mode download feeds both KRX flow sheets
+    end = datetime.today().strftime("%Y%m%d")
+    frames = fetch_market_frames(start, end, detail=True)
+    sheets = {
+        "Kospi_Liquidity": build_kospi_liquidity(start, end, frames),
+        "Kospi_Investor_Flow": build_investor_flow_sheet(start, end, frames),
+    }
+    publish_sheets(excel_path, sheets)
+    print("Kospi_Liquidity / Kospi_Investor_Flow data saved successfully!")
+
+if __name__ == "__main__":
+    main()
@@ -2,17 +2,20 @@ import time
 import pandas as pd
 import os
 import glob
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 from datetime import datetime
 import warnings
-warnings.filterwarnings('ignore')
+from workbook import EXCEL_PATH, publish_sheets
+from instrumentation import span
+from browser_pool import get_pool
+
+# Selenium은 무거우므로 크롤링 메서드 안에서 import (드라이버는 browser_pool에서 빌림)
+# 다운로드 경로 설정 (본인 경로로 수정)
+DOWNLOAD_PATH = "C:\\Users\\jesst\\Downloads"  # 여기를 본인 경로로 수정하세요
+# KMB_BASE_URL 환경변수로 다른 서버(예: fixture_server.py)를 가리킬 수 있음
+KMB_BASE_URL = os.environ.get("KMB_BASE_URL", "https://www.kmbco.com").rstrip("/")
 
 class KMBRateCrawler:
-    def __init__(self, download_path="C:\\Users\\jesst\\Downloads", headless=False):
+    def __init__(self, download_path=DOWNLOAD_PATH, headless=False):
         """
         KMB 금리 데이터 크롤러 초기화
         
@@ -23,45 +26,20 @@ class KMBRateCrawler:
         headless : bool
             브라우저를 숨김 모드로 실행할지 여부
         """
-        self.base_url = 'https://www.kmbco.com/kor/rate/deri_rate.do'
+        self.base_url = f'{KMB_BASE_URL}/kor/rate/deri_rate.do'
         self.download_path = download_path
         self.driver = None
+        self.pool = None
         self.downloaded_files = []  # 다운로드된 파일 추적
         self.setup_driver(headless)
         
     def setup_driver(self, headless):
-        """Chrome 드라이버 설정"""
-        options = Options()
-        if headless:
-            options.add_argument('--headless')
-        
-        # 창 크기 최대화
-        options.add_argument('--start-maximized')  # Windows용
-        options.add_argument('--window-size=1920,1080')  # 최소 해상도 보장
-        
-        # 기본 설정
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-blink-features=AutomationControlled')
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        
-        # 다운로드 경로 설정
-        prefs = {
-            "download.default_directory": self.download_path,
-            "download.prompt_for_download": False,
-            "download.directory_upgrade": True,
-            "safebrowsing.enabled": True,
-            "safebrowsing_for_trusted_sources_enabled": False
-        }
-        options.add_experimental_option("prefs", prefs)
-        
-        self.driver = webdriver.Chrome(options=options)
-        
-        # 추가로 창 최대화 (더블 체크)
-        self.driver.maximize_window()
+        """공유 드라이버 풀에서 Chrome 인스턴스를 빌려옴 (다운로드 경로 지정)"""
+        self.pool = get_pool(headless=headless)
+        self.driver = self.pool.acquire(download_path=os.path.abspath(self.download_path))
     
-    def parse_date(self, date_str):
+    @staticmethod
+    def parse_date(date_str):
         """
         날짜 문자열을 파싱하는 보조 함수
         25/07/22 -> 2025-07-22
@@ -92,6 +70,11 @@ class KMBRateCrawler:
         
         return pd.to_datetime(date_str)
     
+    def _pause(self, seconds):
+        """고정 대기 (계측 wait span으로 기록)"""
+        with span("kmb", "wait", seconds=seconds):
+            time.sleep(seconds)
+    
     def wait_for_download(self, timeout=30):
         """
         다운로드 완료 대기
@@ -150,6 +133,10 @@ class KMBRateCrawler:
         --------
         pd.DataFrame or None
         """
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        
         try:
             print(f"\n{'='*50}")
             print(f"{rate_type} 데이터 다운로드 시작")
@@ -160,11 +147,12 @@ class KMBRateCrawler:
             
             # URL 접속
             print(f"1. URL 접속: {self.base_url}")
-            self.driver.get(self.base_url)
+            with span("kmb", "fetch", rate_type=rate_type, url=self.base_url):
+                self.driver.get(self.base_url)
             wait = WebDriverWait(self.driver, 10)
             
             # 페이지 로딩 대기
-            time.sleep(3)
+            self._pause(3)
             
             # rate_type에 따라 버튼 클릭
             if rate_type == 'IRS':
@@ -176,7 +164,7 @@ class KMBRateCrawler:
             try:
                 button = self.driver.find_element(By.XPATH, button_xpath)
                 self.driver.execute_script("arguments[0].scrollIntoView(true);", button)
-                time.sleep(1)
+                self._pause(1)
             except:
                 pass
             
@@ -186,11 +174,11 @@ class KMBRateCrawler:
             print(f"2. {rate_type} 버튼 클릭 완료")
             
             # 로딩 대기
-            time.sleep(3)
+            self._pause(3)
             
             # 페이지 하단으로 스크롤
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
+            self._pause(2)
             print("3. 페이지 스크롤 완료")
             
             # 엑셀 다운로드 버튼 찾기 및 클릭
@@ -200,7 +188,7 @@ class KMBRateCrawler:
             try:
                 excel_button = self.driver.find_element(By.XPATH, excel_button_xpath)
                 self.driver.execute_script("arguments[0].scrollIntoView(true);", excel_button)
-                time.sleep(1)
+                self._pause(1)
                 
                 # 버튼이 화면에 보이는지 확인
                 print(f"   엑셀 버튼 위치: {excel_button.location}")
@@ -209,28 +197,32 @@ class KMBRateCrawler:
             except Exception as e:
                 print(f"   엑셀 버튼 찾기 실패: {e}")
             
-            # 엑셀 다운로드 버튼 클릭 (여러 방법 시도)
+            # 엑셀 다운로드 버튼 클릭 (여러 방법 시도 - 다음 방법으로 넘어갈 때마다 재시도로 기록)
             excel_button = wait.until(EC.presence_of_element_located((By.XPATH, excel_button_xpath)))
             
-            try:
-                # 방법 1: 일반 클릭
-                excel_button.click()
-                print("4. 엑셀 다운로드 버튼 클릭 (일반 클릭)")
-            except:
+            with span("kmb", "fetch", rate_type=rate_type, step="click") as sp:
                 try:
-                    # 방법 2: JavaScript 클릭
-                    self.driver.execute_script("arguments[0].click();", excel_button)
-                    print("4. 엑셀 다운로드 버튼 클릭 (JavaScript)")
+                    # 방법 1: 일반 클릭
+                    excel_button.click()
+                    print("4. 엑셀 다운로드 버튼 클릭 (일반 클릭)")
                 except:
-                    # 방법 3: ActionChains 사용
-                    from selenium.webdriver.common.action_chains import ActionChains
-                    actions = ActionChains(self.driver)
-                    actions.move_to_element(excel_button).click().perform()
-                    print("4. 엑셀 다운로드 버튼 클릭 (ActionChains)")
+                    sp["retries"] += 1
+                    try:
+                        # 방법 2: JavaScript 클릭
+                        self.driver.execute_script("arguments[0].click();", excel_button)
+                        print("4. 엑셀 다운로드 버튼 클릭 (JavaScript)")
+                    except:
+                        # 방법 3: ActionChains 사용
+                        sp["retries"] += 1
+                        from selenium.webdriver.common.action_chains import ActionChains
+                        actions = ActionChains(self.driver)
+                        actions.move_to_element(excel_button).click().perform()
+                        print("4. 엑셀 다운로드 버튼 클릭 (ActionChains)")
             
             # 다운로드 완료 대기
             print("5. 다운로드 대기 중...")
-            self.wait_for_download()
+            with span("kmb", "fetch", rate_type=rate_type, step="download"):
+                self.wait_for_download()
             
             # 새로 다운로드된 파일 찾기
             current_files = set(glob.glob(os.path.join(self.download_path, "KMB_파생금리_일자별*.xls")))
@@ -245,27 +237,13 @@ class KMBRateCrawler:
                 
                 # DataFrame으로 읽기
                 print("7. Excel 파일을 DataFrame으로 변환 중...")
-                df = pd.read_excel(downloaded_file)
-                
-                # 날짜 형식 수정 (25/07/22 -> 2025-07-22)
-                # 첫 번째 컬럼이 날짜라고 가정
-                if len(df.columns) > 0:
-                    date_col = df.columns[0]
+                with span("kmb", "parse", rate_type=rate_type) as sp:
+                    df = pd.read_excel(downloaded_file)
                     
-                    # 날짜 컬럼이 string 형태인 경우
-                    if df[date_col].dtype == 'object':
-                        try:
-                            # YY/MM/DD 형식으로 파싱
-                            # 25/07/22 -> 2025-07-22
-                            df[date_col] = pd.to_datetime(df[date_col], format='%y/%m/%d')
-                            print(f"   날짜 형식 변환 완료 (YY/MM/DD -> YYYY-MM-DD)")
-                        except:
-                            try:
-                                # 다른 형식 시도 (만약 위 방법이 실패하면)
-                                df[date_col] = df[date_col].apply(lambda x: self.parse_date(x))
-                                print(f"   날짜 형식 변환 완료 (커스텀 파싱)")
-                            except:
-                                print(f"   주의: 날짜 형식 자동 변환 실패. 수동 변환 필요")
+                    # 날짜 형식 수정 (25/07/22 -> 2025-07-22)
+                    df = normalize_kmb_frame(df)
+                    sp["bytes"] = os.path.getsize(downloaded_file)
+                    sp["rows"] = len(df)
                 
                 print(f"8. DataFrame 생성 완료!")
                 print(f"   - Shape: {df.shape[0]}행 x {df.shape[1]}열")
@@ -302,7 +280,7 @@ class KMBRateCrawler:
         if df_irs is not None:
             results['IRS'] = df_irs
         
-        time.sleep(2)  # 서버 부하 방지
+        self._pause(2)  # 서버 부하 방지
         
         # CRS 데이터 가져오기
         df_crs = self.download_and_read('CRS')
@@ -337,15 +315,75 @@ class KMBRateCrawler:
         print("파일 정리 완료!")
     
     def close(self):
-        """드라이버 종료"""
+        """드라이버를 풀에 반납"""
         if self.driver:
-            self.driver.quit()
-            print("\n브라우저 종료")
+            self.pool.release(self.driver)
+            self.driver = None
+            print("\n브라우저 반납")
+
+def normalize_kmb_frame(df):
+    """
+    KMB 엑셀 파일의 첫 번째(날짜) 컬럼을 datetime으로 변환
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        pd.read_excel로 읽은 KMB 파생금리 데이터
+        
+    Returns:
+    --------
+    pd.DataFrame
+    """
+    # 첫 번째 컬럼이 날짜라고 가정
+    if len(df.columns) > 0:
+        date_col = df.columns[0]
+
+        # 날짜 컬럼이 string 형태인 경우
+        if df[date_col].dtype == 'object':
+            try:
+                # YY/MM/DD 형식으로 파싱
+                # 25/07/22 -> 2025-07-22
+                df[date_col] = pd.to_datetime(df[date_col], format='%y/%m/%d')
+                print(f"   날짜 형식 변환 완료 (YY/MM/DD -> YYYY-MM-DD)")
+            except:
+                try:
+                    # 다른 형식 시도 (만약 위 방법이 실패하면)
+                    df[date_col] = df[date_col].apply(lambda x: KMBRateCrawler.parse_date(x))
+                    print(f"   날짜 형식 변환 완료 (커스텀 파싱)")
+                except:
+                    print(f"   주의: 날짜 형식 자동 변환 실패. 수동 변환 필요")
+    
+    return df
+
+def format_kmb_dates(df, date_col='전송일'):
+    """
+    '전송일' 컬럼을 YYYY-MM-DD 문자열로 통일 (워크북 저장 형식)
+    """
+    df = df.copy()
+    df[date_col] = pd.to_datetime(df[date_col], format='%y/%m/%d').dt.strftime("%Y-%m-%d")
+    return df
+
+def build_kmb_sheets(download_path=DOWNLOAD_PATH, headless=False):
+    """
+    IRS/CRS 데이터를 내려받아 워크북에 기록할 시트 딕셔너리로 반환
+    
+    Returns:
+    --------
+    dict
+        {'IRS': DataFrame, 'CRS': DataFrame} (받지 못한 항목은 제외)
+    """
+    crawler = KMBRateCrawler(download_path=download_path, headless=headless)
+    try:
+        rates = crawler.get_both_rates()
+    finally:
+        crawler.cleanup_files()
+        crawler.close()
+    
+    return {rate_type: format_kmb_dates(df) for rate_type, df in rates.items()}
 
 # 사용 예제
 if __name__ == "__main__":
-    # 다운로드 경로 설정 (본인 경로로 수정)
-    DOWNLOAD_PATH = "C:\\Users\\jesst\\Downloads"  # 여기를 본인 경로로 수정하세요
+    warnings.filterwarnings('ignore')
     
     # 크롤러 초기화
     crawler = KMBRateCrawler(download_path=DOWNLOAD_PATH, headless=False)
@@ -420,6 +458,12 @@ if __name__ == "__main__":
                     
                 except Exception as e:
                     print(f"날짜 변환 중 오류: {e}")
+            
+            # IRS/CRS 시트 저장
+            publish_sheets(EXCEL_PATH, {
+                "IRS": format_kmb_dates(df_irs),
+                "CRS": format_kmb_dates(df_crs),
+            })
         
     except KeyboardInterrupt:
         print("\n\n사용자에 의해 중단되었습니다.")
@@ -439,44 +483,3 @@ if __name__ == "__main__":
         print(f"\n{'='*60}")
         print("프로그램 종료")
         print("="*60)
-        
-
-
-
-
-IRS=df_irs
-CRS= df_crs
-
-
-
-
-import os
-import inspect
-
-def save_csv(df, path):
-
-    # 폴더가 없으면 생성
-    os.makedirs(path, exist_ok=True)
-    
-    # 호출한 곳의 프레임에서 변수명 찾기
-    frame = inspect.currentframe().f_back
-    for var_name, var_value in frame.f_locals.items():
-        if var_value is df:
-            filename = f"{var_name}.csv"
-            file_path = os.path.join(path, filename)
-            df.to_csv(file_path, sep=';', encoding='utf-8-sig', index=False)
-            print(f"저장완료: {file_path}")
-            return
-
-
-path = r"C:\Users\jesst\Agora\FX\FX_automation.xlsx"
-import pandas as pd
-
-IRS['전송일'] = pd.to_datetime(IRS['전송일'], format='%y/%m/%d').dt.strftime("%Y-%m-%d")
-CRS['전송일'] = pd.to_datetime(CRS['전송일'], format='%y/%m/%d').dt.strftime("%Y-%m-%d")
-print(IRS)
-print(CRS)
-with pd.ExcelWriter(path, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
-    IRS.to_excel(writer, sheet_name="IRS", index=False)
-with pd.ExcelWriter(path, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
-    CRS.to_excel(writer, sheet_name="CRS", index=False)
@@ -1,8 +1,9 @@
 import pandas as pd
-import FinanceDataReader as fdr
 from datetime import datetime, timedelta
 import os
-from openpyxl import load_workbook
+from workbook import EXCEL_PATH
+from instrumentation import span
+import data_catalog
 
 def get_last_date_from_excel(excel_path, sheet_name="Kospi"):
     """
@@ -20,9 +21,22 @@ def get_last_date_from_excel(excel_path, sheet_name="Kospi"):
     datetime or None
         마지막 날짜 또는 None
     """
+    # 카탈로그에 이 시트의 기록이 있으면 시트를 읽지 않음
+    # (워크북이 기록 당시보다 오래된 파일로 바뀌었으면 - 백업 복원 등 - 시트를 다시 읽음)
+    entry = data_catalog.get("kospi", path=excel_path)
+    if (entry is not None and entry.get("sheet") == sheet_name and entry.get("last_date")
+            and os.path.exists(excel_path)
+            and os.path.getmtime(excel_path) >= entry.get("workbook_mtime", float("inf"))):
+        last_date = pd.Timestamp(entry["last_date"])
+        print(f"기존 데이터의 마지막 날짜: {last_date.strftime('%Y-%m-%d')} (카탈로그)")
+        return last_date
+    
     try:
         # Excel 파일 읽기
-        df_existing = pd.read_excel(excel_path, sheet_name=sheet_name)
+        with span("kospi", "parse", sheet=sheet_name) as sp:
+            df_existing = pd.read_excel(excel_path, sheet_name=sheet_name)
+            sp["bytes"] = os.path.getsize(excel_path)
+            sp["rows"] = len(df_existing)
         
         if df_existing.empty or '날짜' not in df_existing.columns:
             print("기존 데이터가 없거나 '날짜' 컬럼을 찾을 수 없습니다.")
@@ -30,6 +44,8 @@ def get_last_date_from_excel(excel_path, sheet_name="Kospi"):
         
         # 날짜 컬럼을 datetime으로 변환
         df_existing['날짜'] = pd.to_datetime(df_existing['날짜'])
+        data_catalog.record("kospi", df_existing, path=excel_path, sheet=sheet_name,
+                            workbook_mtime=os.path.getmtime(excel_path))
         
         # 마지막 날짜 반환
         last_date = df_existing['날짜'].max()
@@ -60,6 +76,8 @@ def get_kospi_data(start_date=None, end_date=None):
     pd.DataFrame
         코스피 데이터
     """
+    import FinanceDataReader as fdr
+    
     if end_date is None:
         end_date = datetime.now().strftime('%Y-%m-%d')
     
@@ -67,7 +85,9 @@ def get_kospi_data(start_date=None, end_date=None):
         print(f"코스피 데이터 수집 중: {start_date} ~ {end_date}")
         
         # FinanceDataReader로 코스피 지수 데이터 가져오기
-        df = fdr.DataReader('KS11', start_date, end_date)  # KS11 = 코스피 지수
+        with span("kospi", "fetch", symbol="KS11") as sp:
+            df = fdr.DataReader('KS11', start_date, end_date)  # KS11 = 코스피 지수
+            sp["rows"] = len(df)
         
         if df.empty:
             print("수집된 데이터가 없습니다.")
@@ -102,6 +122,31 @@ def get_kospi_data(start_date=None, end_date=None):
         print(f"데이터 수집 오류: {e}")
         return pd.DataFrame()
 
+def merge_kospi_data(df_existing, new_data):
+    """
+    기존 데이터와 새 데이터를 날짜 기준으로 합치는 함수
+    
+    Parameters:
+    -----------
+    df_existing : pd.DataFrame
+        기존 Kospi 시트 데이터
+    new_data : pd.DataFrame
+        추가할 새 데이터
+        
+    Returns:
+    --------
+    pd.DataFrame
+        중복 제거 후 날짜순으로 정렬된 데이터
+    """
+    if df_existing.empty:
+        return new_data
+    
+    df_combined = pd.concat([df_existing, new_data], ignore_index=True)
+    # 중복 제거 (날짜 기준)
+    df_combined = df_combined.drop_duplicates(subset=['날짜'], keep='last')
+    df_combined = df_combined.sort_values('날짜').reset_index(drop=True)
+    return df_combined
+
 def append_data_to_excel(excel_path, new_data, sheet_name="Kospi"):
     """
     새로운 데이터를 Excel 파일에 추가하는 함수
@@ -127,17 +172,15 @@ def append_data_to_excel(excel_path, new_data, sheet_name="Kospi"):
             return
         
         # 데이터 합치기
-        if df_existing.empty:
-            df_combined = new_data
-        else:
-            df_combined = pd.concat([df_existing, new_data], ignore_index=True)
-            # 중복 제거 (날짜 기준)
-            df_combined = df_combined.drop_duplicates(subset=['날짜'], keep='last')
-            df_combined = df_combined.sort_values('날짜').reset_index(drop=True)
+        df_combined = merge_kospi_data(df_existing, new_data)
         
         # Excel 파일에 저장
-        with pd.ExcelWriter(excel_path, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
-            df_combined.to_excel(writer, sheet_name=sheet_name, index=False)
+        with span("kospi", "write", sheet=sheet_name) as sp:
+            with pd.ExcelWriter(excel_path, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
+                df_combined.to_excel(writer, sheet_name=sheet_name, index=False)
+            sp["rows"] = len(df_combined)
+        data_catalog.record("kospi", df_combined, path=excel_path, sheet=sheet_name,
+                            workbook_mtime=os.path.getmtime(excel_path))
         
         print(f"데이터가 {sheet_name} 시트에 저장되었습니다.")
         print(f"총 {len(df_combined)}건 (새로 추가: {len(new_data)}건)")
@@ -153,7 +196,49 @@ def append_data_to_excel(excel_path, new_data, sheet_name="Kospi"):
     except Exception as e:
         print(f"Excel 저장 오류: {e}")
 
-def update_kospi_data(excel_path=r"C:\Users\jesst\Agora\FX\FX_automation.xlsx"):
+def build_kospi_sheet(excel_path=EXCEL_PATH, sheet_name="Kospi"):
+    """
+    Kospi 시트에 기록할 전체 데이터를 만드는 함수 (저장은 하지 않음)
+    
+    Parameters:
+    -----------
+    excel_path : str
+        마지막 날짜와 기존 데이터를 읽을 Excel 파일 경로
+    sheet_name : str
+        시트 이름
+        
+    Returns:
+    --------
+    pd.DataFrame or None
+        기존+신규 데이터, 추가할 데이터가 없으면 None
+    """
+    last_date = get_last_date_from_excel(excel_path, sheet_name)
+    
+    if last_date is None:
+        start_date = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
+    else:
+        start_date = (last_date + timedelta(days=1)).strftime('%Y-%m-%d')
+    end_date = datetime.now().strftime('%Y-%m-%d')
+    
+    if start_date > end_date:
+        print("업데이트할 새로운 데이터가 없습니다.")
+        return None
+    
+    new_data = get_kospi_data(start_date, end_date)
+    if new_data.empty:
+        print("새로 추가할 데이터가 없습니다.")
+        return None
+    
+    try:
+        with span("kospi", "parse", sheet=sheet_name) as sp:
+            df_existing = pd.read_excel(excel_path, sheet_name=sheet_name)
+            sp["rows"] = len(df_existing)
+    except:
+        df_existing = pd.DataFrame()
+    
+    return merge_kospi_data(df_existing, new_data)
+
+def update_kospi_data(excel_path=EXCEL_PATH):
     """
     코스피 데이터를 업데이트하는 메인 함수
     
@@ -204,9 +289,6 @@ def update_kospi_data(excel_path=r"C:\Users\jesst\Agora\FX\FX_automation.xlsx"):
 
 # 실행
 if __name__ == "__main__":
-    # Excel 파일 경로 설정
-    EXCEL_PATH = r"C:\Users\jesst\Agora\FX\FX_automation.xlsx"
-    
     try:
         update_kospi_data(EXCEL_PATH)
     
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+아침 데이터 갱신 파이프라인
+
+각 업데이터를 의존성 그래프(DAG)의 태스크로 실행한다.
+서로 독립적인 수집 태스크(FX yfinance, SMBS 스왑, KMB IRS/CRS, KRX 수급, KOSPI)는
+병렬로 실행되고 (KRX 수급은 한 번 받아 Kospi_Liquidity와 투자자별 수급 시트가 함께 사용), 파생 계산과 워크북 저장은 입력이 준비된 뒤에만 실행된다.
+워크북은 마지막에 한 번만 열고 저장한다.
+"""
+import os
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from workbook import EXCEL_PATH, publish_sheets
+from instrumentation import PROFILER, span
+from browser_pool import get_pool, close_pools
+
+SWAP_CSV = "fx_swap_mid.csv"
+KRX_START = "19981207"    # KRX 수급 시트 시작일
+PROFILE_DIR = "profiles"  # 실행별 span 프로파일 (JSON lines)
+
+# ==================== 태스크 정의 ====================
+# 각 태스크는 {의존 태스크명: 결과} 딕셔너리를 받는다.
+# 의존 태스크가 실패하면 해당 결과는 None으로 전달된다.
+
+def task_fx_fetch(inputs):
+    import fx_analyze
+    return fx_analyze.fetch_fx_matrix()
+
+def task_fx_dashboard(inputs):
+    import fx_analyze
+    fx_matrix = inputs["fx_fetch"]
+    if fx_matrix is None or fx_matrix.empty:
+        return None
+    return fx_analyze.build_fx_sheets(fx_analyze.clean_fx_matrix(fx_matrix))
+
+def task_swap(inputs):
+    import fx_swap_updater
+    updated_df = fx_swap_updater.refresh_swap_points(SWAP_CSV)
+    if updated_df is None:
+        return None
+    return {"Swap_Point": updated_df}
+
+def task_kmb(inputs):
+    import irs_crs
+    return irs_crs.build_kmb_sheets(download_path=irs_crs.DOWNLOAD_PATH, headless=True)
+
+def task_krx_fetch(inputs):
+    import trading_value_kospi
+    # KOSPI/KOSDAQ를 상세(detail) 모드로 한 번만 받아 수급 시트 두 개(Kospi_Liquidity, 투자자별)가 함께 사용
+    return trading_value_kospi.fetch_market_frames(KRX_START, detail=True)
+
+def task_krx_flow(inputs):
+    import trading_value_kospi
+    frames = inputs["krx_fetch"]
+    if frames is None:
+        return None
+    return {"Kospi_Liquidity": trading_value_kospi.build_kospi_liquidity(KRX_START, frames=frames)}
+
+def task_investor_flow(inputs):
+    import investor_flow
+    frames = inputs["krx_fetch"]
+    if frames is None:
+        return None
+    return {"Kospi_Investor_Flow": investor_flow.build_investor_flow_sheet(KRX_START, frames=frames)}
+
+def task_kospi(inputs):
+    import kospi_updater
+    return {"Kospi": kospi_updater.build_kospi_sheet(EXCEL_PATH)}
+
+def task_publish(inputs):
+    import fx_analyze
+    sheets = {}
+    for result in inputs.values():
+        if result:
+            sheets.update(result)
+    publish_sheets(EXCEL_PATH, sheets, number_formats=fx_analyze.NUMBER_FORMATS)
+    return list(sheets)
+
+# 태스크명: (함수, 의존 태스크 목록)
+TASKS = {
+    "fx_fetch":     (task_fx_fetch, []),
+    "fx_dashboard": (task_fx_dashboard, ["fx_fetch"]),
+    "swap":         (task_swap, []),
+    "kmb":          (task_kmb, []),
+    "krx_fetch":    (task_krx_fetch, []),
+    "krx_flow":     (task_krx_flow, ["krx_fetch"]),
+    "investor_flow": (task_investor_flow, ["krx_fetch"]),
+    "kospi":        (task_kospi, []),
+    "publish":      (task_publish, ["fx_dashboard", "swap", "kmb", "krx_flow", "investor_flow", "kospi"]),
+}
+
+# ==================== DAG 실행 ====================
+def _check_dag(tasks):
+    """존재하지 않는 의존성과 순환 의존성 검사"""
+    for name, (_, deps) in tasks.items():
+        for dep in deps:
+            if dep not in tasks:
+                raise ValueError(f"{name}: 알 수 없는 의존 태스크 '{dep}'")
+
+    visiting, done = set(), set()
+
+    def _visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"순환 의존성: {name}")
+        visiting.add(name)
+        for dep in tasks[name][1]:
+            _visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in tasks:
+        _visit(name)
+
+def run_dag(tasks=TASKS, max_workers=None):
+    """
+    의존성이 충족된 태스크를 즉시 스레드 풀에 제출하는 방식으로 DAG 실행
+
+    Parameters:
+    -----------
+    tasks : dict
+        {태스크명: (함수, 의존 태스크 목록)}
+    max_workers : int or None
+        동시에 실행할 최대 태스크 수 (기본값: 태스크 수)
+
+    Returns:
+    --------
+    tuple
+        (results, errors, timings) - 태스크별 결과, 예외, 소요 시간(초)
+    """
+    _check_dag(tasks)
+
+    results, errors, timings = {}, {}, {}
+    pending = dict(tasks)
+    running = {}
+
+    def _timed(name, func, inputs):
+        t0 = time.perf_counter()
+        try:
+            with span("pipeline", "task", task=name):
+                return func(inputs)
+        finally:
+            timings[name] = time.perf_counter() - t0
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(tasks)) as pool:
+        while pending or running:
+            # 의존 태스크가 모두 끝난 태스크 제출
+            for name, (func, deps) in list(pending.items()):
+                if all(dep in results for dep in deps):
+                    inputs = {dep: results[dep] for dep in deps}
+                    running[pool.submit(_timed, name, func, inputs)] = name
+                    del pending[name]
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                    print(f"[{name}] 완료 ({timings[name]:.1f}초)")
+                except Exception as e:
+                    results[name] = None
+                    errors[name] = e
+                    print(f"[{name}] 실패: {e}")
+
+    return results, errors, timings
+
+def main():
+    warnings.filterwarnings('ignore')
+    PROFILER.reset()
+    t0 = time.perf_counter()
+    # SMBS/KMB 크롤러가 함께 쓸 브라우저를 수집 태스크와 동시에 예열
+    pool = get_pool(headless=True)
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        ex.submit(pool.warm)
+        try:
+            results, errors, timings = run_dag(TASKS)
+        finally:
+            close_pools()
+
+    print("\n" + "="*50)
+    print(f"전체 소요 시간: {time.perf_counter() - t0:.1f}초 (태스크 합계 {sum(timings.values()):.1f}초)")
+    if errors:
+        print(f"실패한 태스크: {', '.join(errors)}")
+    print(f"저장된 시트: {results.get('publish')}")
+
+    profile_path = PROFILER.export_jsonl(os.path.join(PROFILE_DIR, f"run_{PROFILER.run_id}.jsonl"))
+    print(f"\n단계별 프로파일: {profile_path}")
+    print(PROFILER.summary().to_string())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,421 @@
+# -*- coding: utf-8 -*-
+"""
+장중 폴링 서비스 (USD_KRW 현물, SMBS 스왑포인트)
+
+원천을 주기적으로 확인하고, 응답이 바뀌었을 때만 메모리의 지표를 고쳐 바뀐 시트만 저장한다.
+
+변경 감지:
+    HTTP 원천      조건부 요청 (ETag -> If-None-Match, Last-Modified -> If-Modified-Since).
+                   304 응답은 본문을 받지 않고 건너뜀
+    모든 원천      응답 본문 해시가 직전과 같으면 파싱하지 않음
+                   (SMBS는 결과 표 outerHTML만 해시)
+
+지표 갱신:
+    현물이 바뀌면 그 통화 행만 다시 계산하고 그 통화가 속한 지역 시트만 저장한다.
+    새 날짜(서울 외환시장 영업일만)의 첫 값이면 열을 추가하되 다른 통화는 값이 없는(NaN)
+    상태로 두어, 조회하지 않는 통화에 가짜 보합일이 생기거나 5B/21B 기준일이 밀리지 않는다.
+    변경은 PUBLISH_DELAY초 동안 모아서 한 번에 저장한다.
+
+기본 주기(FX 20초, SMBS 30초) + 저장 대기 5초이므로 원천 갱신부터 워크북 반영까지 1분 이내다.
+
+사용법:
+    python poller.py                      # FX_Data 시트와 fx_swap_mid.csv에서 시작
+"""
+import abc
+import hashlib
+import heapq
+import time
+from datetime import datetime
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import numpy as np
+import pandas as pd
+
+import business_calendar
+from workbook import EXCEL_PATH, publish_sheets
+from instrumentation import span
+from universe import FX_UNIVERSE
+
+FX_INTERVAL = 20        # 초
+SWAP_INTERVAL = 30      # 초
+PUBLISH_DELAY = 5       # 변경을 모으는 시간 (초)
+SWAP_HOURS = (9, 17)    # SMBS 조회 시간대 (시, 서울)
+
+def _digest(raw):
+    if isinstance(raw, str):
+        raw = raw.encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()
+
+# ==================== 원천 ====================
+class Source(abc.ABC):
+    def __init__(self, name, interval, hours=None):
+        """
+        Parameters:
+        -----------
+        name : str
+            원천 이름 (로그/통계용)
+        interval : float
+            조회 주기 (초)
+        hours : tuple or None
+            (시작 시, 종료 시). 이 시간대에만 조회 (None이면 항상)
+        """
+        self.name, self.interval, self.hours = name, interval, hours
+        self.last_hash = None
+        self.stats = {"polls": 0, "changed": 0, "unchanged": 0, "not_modified": 0, "errors": 0}
+
+    def active(self, now=None):
+        if self.hours is None:
+            return True
+        hour = (now or datetime.now()).hour
+        return self.hours[0] <= hour < self.hours[1]
+
+    @abc.abstractmethod
+    def fetch(self):
+        """원본 응답 (bytes/str). 조건부 요청으로 바뀌지 않았음을 확인했으면 None"""
+
+    def parse(self, raw):
+        return raw
+
+    @abc.abstractmethod
+    def apply(self, state, payload):
+        """IntradayState에 반영하고 바뀐 시트 이름 집합 반환"""
+
+    def poll(self):
+        """
+        한 번 조회
+
+        Returns:
+        --------
+        object or None
+            바뀐 경우 parse 결과, 304 / 같은 해시 / 빈 결과면 None
+        """
+        self.stats["polls"] += 1
+        with span("poller", "fetch", source=self.name) as sp:
+            raw = self.fetch()
+            sp["bytes"] = len(raw) if raw else 0
+        if raw is None:
+            self.stats["not_modified"] += 1
+            return None
+        h = _digest(raw)
+        if h == self.last_hash:
+            self.stats["unchanged"] += 1
+            return None
+        payload = self.parse(raw)
+        if payload is None:
+            return None
+        self.last_hash = h
+        self.stats["changed"] += 1
+        return payload
+
+class HttpSource(Source):
+    def __init__(self, name, url, interval, parse=None, apply=None, hours=None, timeout=10):
+        """
+        조건부 GET으로 조회하는 HTTP 원천
+
+        Parameters:
+        -----------
+        url : str
+            조회 URL
+        parse : callable or None
+            bytes -> payload (None이면 bytes 그대로)
+        apply : callable or None
+            (state, payload) -> 바뀐 시트 이름 집합
+        """
+        super().__init__(name, interval, hours)
+        self.url, self.timeout = url, timeout
+        self._parse, self._apply = parse, apply
+        self.etag = self.last_modified = None
+
+    def fetch(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        try:
+            with urlopen(Request(self.url, headers=headers), timeout=self.timeout) as resp:
+                self.etag = resp.headers.get("ETag") or self.etag
+                self.last_modified = resp.headers.get("Last-Modified") or self.last_modified
+                return resp.read()
+        except HTTPError as e:
+            if e.code == 304:
+                return None
+            raise
+
+    def parse(self, raw):
+        return self._parse(raw) if self._parse else raw
+
+    def apply(self, state, payload):
+        return self._apply(state, payload) if self._apply else set()
+
+class FxSpotSource(Source):
+    def __init__(self, name="USD_KRW", symbol="KRW=X", interval=FX_INTERVAL, provider="yfinance"):
+        """yfinance 1분봉 마지막 종가로 통화 하나의 현물을 조회"""
+        super().__init__(name, interval)
+        self.symbol, self.provider = symbol, provider
+
+    def fetch(self):
+        from openbb import obb
+
+        obb.user.preferences.output_type = "dataframe"
+        df = obb.currency.price.historical(symbol=self.symbol, provider=self.provider, interval="1m",
+                                           start_date=datetime.now().strftime("%Y-%m-%d"))
+        if df is None or df.empty:
+            return None
+        last = df["close"].dropna()
+        return f"{last.index[-1]}|{last.iloc[-1]!r}" if len(last) else None
+
+    def parse(self, raw):
+        stamp, value = raw.rsplit("|", 1)
+        return pd.Timestamp(stamp), float(value)
+
+    def apply(self, state, payload):
+        stamp, value = payload
+        return state.apply_spot(self.name, stamp, value)
+
+class SmbsSwapSource(Source):
+    def __init__(self, interval=SWAP_INTERVAL, hours=SWAP_HOURS, headless=True, depth_file=None):
+        """
+        SMBS 오늘 날짜 결과 표 (브라우저 하나를 계속 빌려 씀)
+
+        Parameters:
+        -----------
+        depth_file : str or None
+            Bid/Offer를 보관할 swap_store 파일 (None이면 fx_swap_mid.csv 옆)
+        """
+        import swap_store
+
+        super().__init__("SMBS", interval, hours)
+        self.headless = headless
+        self.depth_file = depth_file or swap_store.depth_path("fx_swap_mid.csv")
+        self._driver = None
+        self._date = None
+
+    def fetch(self):
+        import fx_swap_updater as fsu
+        from browser_pool import get_pool
+
+        if self._driver is None:
+            self._driver = get_pool(headless=self.headless).acquire()
+            self._driver.get(fsu.SMBS_URL)
+        self._date = datetime.now().strftime("%Y.%m.%d")
+        if not fsu._input_date_step_by_step(self._driver, self._date.replace(".", "")):
+            return None
+        _, html = fsu._result_table_html(self._driver)
+        return html
+
+    def parse(self, raw):
+        """결과 표 -> Bid/Offer 프레임 (디스크에는 쓰지 않음)"""
+        import fx_swap_updater as fsu
+        import swap_store
+
+        df = fsu._parse_table(raw, self._date)
+        if df.empty:
+            return None
+        df["date"] = pd.to_datetime(df["date"], format="%Y.%m.%d", errors="coerce")
+        df = df.dropna(subset=["date"]).set_index("date")
+        df.columns = ["Side"] + swap_store.TENORS
+        return df
+
+    def apply(self, state, payload):
+        """반영할 때만 호가를 저장소에 기록하고 Mid로 상태 갱신"""
+        import fx_swap_updater as fsu
+        import swap_store
+
+        swap_store.record_quotes(payload, self.depth_file)
+        return state.apply_swap(fsu.calculate_mid_values(payload))
+
+    def close(self):
+        if self._driver is not None:
+            from browser_pool import get_pool
+            get_pool(headless=self.headless).release(self._driver)
+            self._driver = None
+
+# ==================== 메모리 상태 ====================
+class IntradayState:
+    def __init__(self, fx_matrix, swap_mid=None, calendar="SEOUL_FX"):
+        """
+        Parameters:
+        -----------
+        fx_matrix : pd.DataFrame
+            clean_fx_matrix 결과 (행=통화, 열=날짜)
+        swap_mid : pd.DataFrame or None
+            fx_swap_mid.csv 내용
+        calendar : str
+            새 날짜 열을 만들 수 있는 영업일 캘린더 (business_calendar)
+        """
+        import fx_analyze
+
+        self.fx_matrix = fx_matrix.copy()
+        self.swap_mid = swap_mid
+        self.calendar = calendar
+        self.metrics = fx_analyze.calculate_basic_metrics(self.fx_matrix)
+        self.dirty = set()
+
+    def apply_spot(self, name, stamp, value):
+        """
+        현물 하나 반영. 바뀐 시트 이름 집합 반환
+
+        영업일이 아닌 날짜(주말 1분봉 등)는 무시한다. 새 날짜 열의 다른 통화는 NaN으로 두고
+        그 통화들의 지표는 마지막 실제 값 기준 그대로 둔다.
+        """
+        import fx_analyze
+
+        if name not in self.fx_matrix.index:
+            return set()
+        day = pd.Timestamp(stamp)
+        if day.tz is not None:
+            day = day.tz_convert("Asia/Seoul").tz_localize(None)
+        day = day.normalize()
+        if day < self.fx_matrix.columns[-1]:
+            return set()
+
+        if day > self.fx_matrix.columns[-1]:
+            if not business_calendar.is_session(day, self.calendar):
+                return set()
+            self.fx_matrix[day] = np.nan
+        elif self.fx_matrix.at[name, day] == value:
+            return set()
+
+        # 이 통화 행만 다시 계산 (행마다 독립인 지표)
+        self.fx_matrix.loc[name, day] = value
+        row = fx_analyze.calculate_basic_metrics(self.fx_matrix.loc[[name]])
+        pos = self.metrics.index[self.metrics["Currency"] == name]
+        self.metrics.loc[pos, row.columns] = row.to_numpy()
+        changed = {region for region, members in FX_UNIVERSE.regions.items() if name in members}
+        self.dirty |= changed
+        return changed
+
+    def apply_swap(self, mid):
+        """오늘 Mid 행 반영"""
+        if mid is None or mid.empty:
+            return set()
+        base = self.swap_mid if self.swap_mid is not None else mid.iloc[:0]
+        combined = pd.concat([base, mid])
+        self.swap_mid = combined[~combined.index.duplicated(keep="last")].sort_index()
+        self.dirty.add("Swap_Point")
+        return {"Swap_Point"}
+
+    def sheets(self, names):
+        """저장할 시트 딕셔너리 (지역 대시보드 / Swap_Point)"""
+        positions = FX_UNIVERSE.positions(list(self.metrics["Currency"]))
+        out = {}
+        for name in names:
+            if name in positions:
+                out[name] = self.metrics.iloc[positions[name]].reset_index(drop=True)
+            elif name == "Swap_Point" and self.swap_mid is not None:
+                out[name] = self.swap_mid
+        return out
+
+# ==================== 폴러 ====================
+class Poller:
+    def __init__(self, sources, state, excel_path=EXCEL_PATH, publish=None, publish_delay=PUBLISH_DELAY):
+        """
+        Parameters:
+        -----------
+        sources : list of Source
+        state : IntradayState
+        excel_path : str
+            저장할 워크북 (publish를 지정하지 않았을 때)
+        publish : callable or None
+            sheets dict -> None (기본: publish_sheets로 excel_path에 저장)
+        publish_delay : float
+            첫 변경 후 저장까지 모으는 시간 (초)
+        """
+        self.sources, self.state = sources, state
+        self.excel_path = excel_path
+        self.publish = publish or self._publish_workbook
+        self.publish_delay = publish_delay
+        self.publishes = 0
+        self._dirty_since = None
+        now = time.monotonic()
+        self._queue = [(now, i) for i in range(len(sources))]
+        heapq.heapify(self._queue)
+
+    def _publish_workbook(self, sheets):
+        import fx_analyze
+        publish_sheets(self.excel_path, sheets, number_formats=fx_analyze.NUMBER_FORMATS)
+
+    def _poll(self, source):
+        if not source.active():
+            return
+        try:
+            payload = source.poll()
+        except Exception as e:
+            source.stats["errors"] += 1
+            print(f"{source.name}: 조회 실패 -> {e}")
+            return
+        if payload is not None and source.apply(self.state, payload):
+            print(f"{datetime.now():%H:%M:%S} {source.name} 변경 감지")
+            if self._dirty_since is None:
+                self._dirty_since = time.monotonic()
+
+    def flush(self):
+        """모인 변경 저장"""
+        names = sorted(self.state.dirty)
+        self.state.dirty.clear()
+        self._dirty_since = None
+        sheets = self.state.sheets(names)
+        if sheets:
+            self.publish(sheets)
+            self.publishes += 1
+
+    def step(self, now=None):
+        """
+        기한이 된 원천을 조회하고 필요하면 저장
+
+        Returns:
+        --------
+        float
+            다음 할 일까지 남은 시간 (초)
+        """
+        now = time.monotonic() if now is None else now
+        while self._queue and self._queue[0][0] <= now:
+            due, i = heapq.heappop(self._queue)
+            self._poll(self.sources[i])
+            # 밀린 주기는 건너뛰고 다음 주기로
+            heapq.heappush(self._queue, (max(due + self.sources[i].interval, now), i))
+
+        if self._dirty_since is not None and now - self._dirty_since >= self.publish_delay:
+            self.flush()
+
+        wait = self._queue[0][0] - now if self._queue else self.publish_delay
+        if self._dirty_since is not None:
+            wait = min(wait, self._dirty_since + self.publish_delay - now)
+        return max(wait, 0.0)
+
+    def run(self, duration=None):
+        """duration초 동안 (None이면 중단할 때까지) 실행"""
+        end = None if duration is None else time.monotonic() + duration
+        try:
+            while end is None or time.monotonic() < end:
+                wait = self.step()
+                if end is not None:
+                    wait = min(wait, max(end - time.monotonic(), 0.0))
+                time.sleep(wait)
+        except KeyboardInterrupt:
+            print("\n폴링을 중단합니다.")
+        finally:
+            if self.state.dirty:
+                self.flush()
+            for source in self.sources:
+                if hasattr(source, "close"):
+                    source.close()
+        for source in self.sources:
+            print(f"{source.name}: {source.stats}")
+
+def main(excel_path=EXCEL_PATH, csv_file="fx_swap_mid.csv"):
+    import swap_store
+
+    fx_matrix = pd.read_excel(excel_path, sheet_name="FX_Data", index_col=0)
+    fx_matrix.columns = pd.to_datetime(fx_matrix.columns)
+    swap_mid = pd.read_csv(csv_file, index_col=0, parse_dates=True)
+    state = IntradayState(fx_matrix, swap_mid)
+    sources = [FxSpotSource(), SmbsSwapSource(depth_file=swap_store.depth_path(csv_file))]
+    poller = Poller(sources, state, excel_path)
+    print(f"장중 폴링 시작 (FX {FX_INTERVAL}초, SMBS {SWAP_INTERVAL}초)")
+    poller.run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+스왑포인트 보간 / 선물환 계산기 (broken date)
+
+calculate_mid_values 결과(또는 fx_swap_mid.csv)의 1M/2M/3M/6M/1Y Mid 스왑포인트로
+날짜별 곡선을 만들고, 임의의 (거래일, 결제일) 쌍에 대해 스왑포인트와
+선물환율(USD/KRW 현물 + 스왑포인트)을 계산한다.
+
+날짜 규칙 (서울 외환시장 영업일):
+    현물 결제일   거래일 + 2영업일
+    만기일       현물 결제일 + n개월, modified following
+    곡선        (현물 결제일 0일, 0) + 만기별 (일수, 스왑포인트) 선형 보간
+                현물 결제일 이전(당일/익일물)과 1Y 이후는 가장 가까운 구간 기울기로 연장
+
+거래일의 곡선은 그 날짜 이전 가장 최근 Mid 값을 쓰고, 거래일별 만기 일수(곡선 knot)는
+계산기 안에 캐시한다. 수천 건의 쌍도 한 번의 배열 연산으로 처리한다.
+
+사용 예:
+    calc = SwapForwardCalculator(mid_df, fx_matrix_clean.loc['USD_KRW'])
+    out = calc.price(['2025-06-30'] * 2, ['2025-08-14', '2025-12-31'])
+"""
+import numpy as np
+import pandas as pd
+
+import business_calendar
+from cross_asset_panel import to_days, from_days
+
+CALENDAR = "SEOUL_FX"
+TENORS = {"1M": 1, "2M": 2, "3M": 3, "6M": 6, "1Y": 12}
+SPOT_LAG = 2  # 영업일
+
+class SwapForwardCalculator:
+    def __init__(self, mids, spot=None, calendar=CALENDAR):
+        """
+        Parameters:
+        -----------
+        mids : pd.DataFrame
+            calculate_mid_values 결과 또는 fx_swap_mid.csv (날짜 인덱스, TENORS 컬럼)
+        spot : pd.Series or None
+            날짜 인덱스의 USD/KRW 현물 (예: fx_matrix_clean.loc['USD_KRW']).
+            None이면 스왑포인트만 계산
+        calendar : str
+            business_calendar 캘린더명
+        """
+        self.calendar = calendar
+        points = mids[list(TENORS)].apply(pd.to_numeric, errors="coerce")
+        points = points[~points.index.duplicated(keep="last")].sort_index()
+        self.curve_days = to_days(points.index)
+        self.points = points.to_numpy(dtype=float)
+
+        self.spot_days = self.spot = None
+        if spot is not None:
+            spot = pd.Series(spot, dtype=float).dropna()
+            spot.index = pd.to_datetime(spot.index)
+            spot = spot[~spot.index.duplicated(keep="last")].sort_index()
+            self.spot_days, self.spot = to_days(spot.index), spot.to_numpy()
+
+        self._sessions = np.empty(0, dtype=np.int64)
+        self._knot_cache = {}  # 거래일(일수) -> (현물 결제일, 만기별 일수 배열)
+
+    def _ensure_sessions(self, first, last):
+        """first~last 일수 범위를 덮는 영업일 배열 확보"""
+        s = self._sessions
+        if len(s) and s[0] <= first and s[-1] >= last:
+            return
+        lo = first if not len(s) else min(first, s[0])
+        hi = last if not len(s) else max(last, s[-1])
+        start, end = from_days([lo, hi])
+        self._sessions = to_days(business_calendar.sessions(start, end, self.calendar))
+
+    def _knots(self, trade_days):
+        """
+        거래일별 현물 결제일과 만기 일수 (캐시)
+
+        Returns:
+        --------
+        tuple
+            (spot_days (n,), knot_days (n, 만기 수)) - knot_days는 현물 결제일 기준 일수
+        """
+        unique = np.unique(trade_days)
+        missing = np.array([d for d in unique if d not in self._knot_cache], dtype=np.int64)
+        if len(missing):
+            # 12개월 + 주말/연휴 여유
+            self._ensure_sessions(missing.min(), missing.max() + 400)
+            sess = self._sessions
+            spot = sess[np.searchsorted(sess, missing, side="right") + SPOT_LAG - 1]
+            spot_dates = from_days(spot)
+            knots = np.empty((len(missing), len(TENORS)), dtype=np.int64)
+            for j, months in enumerate(TENORS.values()):
+                raw = spot_dates + pd.DateOffset(months=months)
+                raw_days = to_days(raw)
+                pos = np.searchsorted(sess, raw_days, side="left")
+                following = sess[pos]
+                # 다음 영업일이 다음 달로 넘어가면 직전 영업일 (modified following)
+                rolled = from_days(following).month != raw.month
+                pos = np.where(rolled, pos - 1, pos)
+                knots[:, j] = sess[pos] - spot
+            for d, s, k in zip(missing, spot, knots):
+                self._knot_cache[int(d)] = (int(s), k)
+
+        cached = [self._knot_cache[int(d)] for d in unique]
+        spot_u = np.array([c[0] for c in cached], dtype=np.int64)
+        knots_u = np.stack([c[1] for c in cached])
+        inv = np.searchsorted(unique, trade_days)
+        return spot_u[inv], knots_u[inv]
+
+    @staticmethod
+    def _asof(index_days, days):
+        """days 이전(당일 포함) 가장 최근 값의 위치 (없으면 -1)"""
+        return np.searchsorted(index_days, days, side="right") - 1
+
+    def price(self, trade_dates, value_dates):
+        """
+        (거래일, 결제일) 쌍의 스왑포인트와 선물환율
+
+        Parameters:
+        -----------
+        trade_dates : array-like
+            거래일 (같은 길이의 날짜 배열)
+        value_dates : array-like
+            결제일
+
+        Returns:
+        --------
+        pd.DataFrame
+            trade_date, value_date, spot_date, days (현물 결제일 기준), curve_date,
+            swap_points, spot, outright. 이전 곡선이 없으면 NaN
+        """
+        trade = to_days(trade_dates)
+        value = to_days(value_dates)
+        if trade.shape != value.shape:
+            raise ValueError("trade_dates와 value_dates의 길이가 다릅니다.")
+
+        spot_day, knots = self._knots(trade)
+        days = value - spot_day
+
+        # 곡선 선택: 거래일 이전 가장 최근 Mid
+        ci = self._asof(self.curve_days, trade)
+        has_curve = ci >= 0
+        pts = np.where(has_curve[:, None], self.points[np.maximum(ci, 0)], np.nan)
+
+        # (0, 0)을 첫 knot로 붙이고 구간별 선형 보간 / 양끝 연장
+        x = np.hstack([np.zeros((len(trade), 1)), knots]).astype(float)
+        y = np.hstack([np.zeros((len(trade), 1)), pts])
+        # Mid가 NaN인 테너는 행마다 빼고 (유효한 knot를 앞으로 모음) 남은 테너 사이에서 보간
+        valid = ~np.isnan(y)
+        order = np.argsort(~valid, axis=1, kind="stable")
+        x = np.where(np.take_along_axis(valid, order, axis=1), np.take_along_axis(x, order, axis=1), np.inf)
+        y = np.take_along_axis(y, order, axis=1)
+        n_valid = valid.sum(axis=1)
+        seg = np.clip((x <= days[:, None]).sum(axis=1) - 1, 0, np.maximum(n_valid - 2, 0))
+        rows = np.arange(len(trade))
+        x0, x1 = x[rows, seg], x[rows, seg + 1]
+        y0, y1 = y[rows, seg], y[rows, seg + 1]
+        with np.errstate(invalid="ignore"):
+            swap_points = np.where(n_valid >= 2, y0 + (y1 - y0) * (days - x0) / (x1 - x0), np.nan)
+
+        out = pd.DataFrame({
+            "trade_date": from_days(trade),
+            "value_date": from_days(value),
+            "spot_date": from_days(spot_day),
+            "days": days,
+            "curve_date": from_days(self.curve_days[np.maximum(ci, 0)]).where(has_curve),
+            "swap_points": swap_points,
+        })
+        if self.spot is not None:
+            si = self._asof(self.spot_days, trade)
+            spot = np.where(si >= 0, self.spot[np.maximum(si, 0)], np.nan)
+            out["spot"] = spot
+            out["outright"] = spot + swap_points
+        return out
+
+    def curve(self, trade_date, value_dates=None):
+        """
+        거래일 하나의 곡선 (기본: 현물 결제일부터 1Y 만기까지 매 영업일)
+
+        Returns:
+        --------
+        pd.DataFrame
+            price() 결과
+        """
+        trade = to_days([trade_date])
+        if value_dates is None:
+            spot_day, knots = self._knots(trade)
+            sess = self._sessions
+            value_dates = from_days(sess[(sess >= spot_day[0]) & (sess <= spot_day[0] + knots[0, -1])])
+        return self.price([trade_date] * len(value_dates), value_dates)
+
+def load_calculator(csv_file="fx_swap_mid.csv", fx_matrix=None):
+    """fx_swap_mid.csv와 (선택) clean_fx_matrix 결과로 계산기 생성"""
+    mids = pd.read_csv(csv_file, index_col=0, parse_dates=True)
+    spot = fx_matrix.loc["USD_KRW"] if fx_matrix is not None else None
+    return SwapForwardCalculator(mids, spot)
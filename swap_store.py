@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+FX 스왑포인트 호가 저장소 (Bid/Offer 원본 보관)
+
+SMBS에서 받은 Bid/Offer 행을 (Side, 만기, 날짜) float 배열 하나로 fx_swap_depth.npz에 보관한다.
+업데이터는 fx_swap_mid.csv와 같은 디렉토리의 파일을 쓴다 (depth_path).
+Mid와 스프레드는 저장하지 않고 필요할 때 배열 연산으로 만든 뒤 캐시하므로,
+Mid 정의를 바꾸거나 스프레드를 분석할 때 다시 수집할 필요가 없다.
+
+배열:
+    days    (날짜,) int64      1970-01-01 기준 일수
+    quotes  (2, 만기, 날짜)     [Bid, Offer] x TENORS, 없는 값은 NaN
+
+사용 예:
+    store = SwapDepthStore.load(depth_path("fx_swap_mid.csv"))
+    store.merge(df_new)            # fetch_fx_swap_points_* 결과 (Side 컬럼 포함)
+    store.save()
+    store.mid_frame()              # fx_swap_mid.csv와 같은 형식
+    store.spread()                 # (만기, 날짜) Offer - Bid
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from cross_asset_panel import to_days, from_days
+
+DEPTH_FILE = "fx_swap_depth.npz"
+TENORS = ["1M", "2M", "3M", "6M", "1Y"]
+SIDES = ["Bid", "Offer"]
+
+def depth_path(csv_file):
+    """Mid CSV와 같은 디렉토리의 호가 저장 파일 경로"""
+    return os.path.join(os.path.dirname(os.path.abspath(csv_file)), DEPTH_FILE)
+
+def _side_rows(df, side):
+    """Side가 side를 포함하는 행을 날짜별 첫 행만 남겨 (날짜, 만기) 배열로"""
+    rows = df[df["Side"].str.contains(side, case=False, na=False)]
+    rows = rows[~rows.index.duplicated(keep="first")]
+    values = rows[TENORS].apply(pd.to_numeric, errors="coerce")
+    return to_days(rows.index), values.to_numpy(dtype=float)
+
+class SwapDepthStore:
+    def __init__(self, days=None, quotes=None, path=DEPTH_FILE):
+        """
+        Parameters:
+        -----------
+        days : np.ndarray or None
+            (날짜,) int64 일수 (오름차순)
+        quotes : np.ndarray or None
+            (2, 만기, 날짜) Bid/Offer
+        path : str
+            저장 파일 경로
+        """
+        self.path = path
+        self.days = np.empty(0, dtype=np.int64) if days is None else np.asarray(days, dtype=np.int64)
+        self.quotes = (np.empty((len(SIDES), len(TENORS), 0)) if quotes is None
+                       else np.asarray(quotes, dtype=float))
+        self._derived = {}
+
+    @classmethod
+    def load(cls, path=DEPTH_FILE):
+        """저장 파일 읽기 (없으면 빈 저장소)"""
+        if not os.path.exists(path):
+            return cls(path=path)
+        with np.load(path) as data:
+            if list(data["tenors"]) != TENORS:
+                raise ValueError(f"{path}: 만기 구성이 다릅니다 ({list(data['tenors'])})")
+            return cls(data["days"], data["quotes"], path)
+
+    def save(self, path=None):
+        path = path or self.path
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, days=self.days, quotes=self.quotes, tenors=np.array(TENORS))
+        os.replace(tmp, path)
+
+    def __len__(self):
+        return len(self.days)
+
+    def merge(self, df_all):
+        """
+        수집 결과 병합 (같은 날짜는 새 값으로 교체)
+
+        Parameters:
+        -----------
+        df_all : pd.DataFrame
+            fetch_fx_swap_points_range_selenium / _dates_selenium 결과
+            (날짜 인덱스, Side + TENORS 컬럼, 날짜별 Bid/Offer 두 행)
+
+        Returns:
+        --------
+        int
+            새로 추가된 날짜 수
+        """
+        if df_all is None or df_all.empty:
+            return 0
+
+        parts = [_side_rows(df_all, side) for side in SIDES]
+        new_days = np.unique(np.concatenate([d for d, _ in parts]))
+        days = np.union1d(self.days, new_days)
+        quotes = np.full((len(SIDES), len(TENORS), len(days)), np.nan)
+        quotes[:, :, np.searchsorted(days, self.days)] = self.quotes
+
+        # 새로 받은 날짜는 양쪽 Side를 모두 새 값으로 교체 (없는 Side는 NaN)
+        quotes[:, :, np.searchsorted(days, new_days)] = np.nan
+        for s, (side_days, values) in enumerate(parts):
+            quotes[s][:, np.searchsorted(days, side_days)] = values.T
+
+        added = len(days) - len(self.days)
+        self.days, self.quotes = days, quotes
+        self._derived.clear()
+        return added
+
+    def _cached(self, name, func):
+        if name not in self._derived:
+            self._derived[name] = func()
+        return self._derived[name]
+
+    def bid(self):
+        """(만기, 날짜) Bid (저장 배열의 뷰)"""
+        return self.quotes[0]
+
+    def offer(self):
+        """(만기, 날짜) Offer (저장 배열의 뷰)"""
+        return self.quotes[1]
+
+    def mid(self):
+        """(만기, 날짜) (Bid + Offer) / 2. 한쪽이라도 없으면 NaN"""
+        return self._cached("mid", lambda: self.quotes.mean(axis=0))
+
+    def spread(self):
+        """(만기, 날짜) Offer - Bid"""
+        return self._cached("spread", lambda: self.quotes[1] - self.quotes[0])
+
+    def dates(self):
+        return from_days(self.days)
+
+    def mid_frame(self):
+        """
+        calculate_mid_values / fx_swap_mid.csv와 같은 형식의 Mid 표
+
+        Bid와 Offer가 모두 있는 날짜만 포함한다.
+        """
+        def build():
+            both = ~np.all(np.isnan(self.quotes), axis=1).any(axis=0)
+            out = pd.DataFrame(self.mid()[:, both].T, index=self.dates()[both], columns=TENORS)
+            out.insert(0, "Side", "mid")
+            return out
+        return self._cached("mid_frame", build).copy()
+
+    def spread_frame(self):
+        """날짜 x 만기 스프레드 표"""
+        return pd.DataFrame(self.spread().T, index=self.dates(), columns=TENORS)
+
+def record_quotes(df_all, path=DEPTH_FILE):
+    """수집한 Bid/Offer를 저장소에 병합하고 저장"""
+    store = SwapDepthStore.load(path)
+    added = store.merge(df_all)
+    store.save()
+    return store, added
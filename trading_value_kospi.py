@@ -1,39 +1,113 @@
 # Foreign Investor Net Buying Volume (Value-based)
 import pandas as pd
+import numpy as np
 from datetime import datetime
-from pykrx import stock
 import os
+import sys
+import json
+import glob
 import inspect
+from workbook import EXCEL_PATH, publish_sheets
+from instrumentation import span
+import indicators as ind
 
-def get_foreign_flow(start: str, end: str, market: str = "KOSPI") -> pd.DataFrame:
+def krx_stock():
     """
-    Returns a time series of daily foreign investor net buying volume in KRW.
+    KRX data source: pykrx.stock, or a replay client when KRX_BASE_URL is set
+    (e.g. a local fixture_server.py) so no request reaches the live site.
+    """
+    base_url = os.environ.get("KRX_BASE_URL")
+    if base_url:
+        from fixture_server import KRXReplayClient
+        return KRXReplayClient(base_url)
+    from pykrx import stock
+    return stock
+
+def fetch_trading_value(start: str, end: str, market: str = "KOSPI", detail: bool = False) -> pd.DataFrame:
+    """
+    Fetch daily trading value by investor type from KRX.
     
     Args:
         start (str): Start date in YYYYMMDD format
         end (str): End date in YYYYMMDD format
         market (str): Market type - "KOSPI" | "KOSDAQ" | "BOTH"
+        detail (bool): Split institutions into 금융투자/보험/투신/사모/은행/기타금융/연기금
     
     Returns:
-        pd.DataFrame: Foreign net buying data with multiple metrics
+        pd.DataFrame: Net buying value (KRW) per investor type, indexed by date
     """
+    stock = krx_stock()
+    
     # Fetch trading value data (business days only)
-    df1 = stock.get_market_trading_value_by_date(start, end, ticker="KOSPI")
+    with span("krx_flow", "fetch", ticker="KOSPI") as sp:
+        df1 = stock.get_market_trading_value_by_date(start, end, ticker="KOSPI", detail=detail)
+        sp["rows"] = len(df1)
     
     if market.upper() == "KOSPI":
         df = df1.copy()
     elif market.upper() == "KOSDAQ":
-        df2 = stock.get_market_trading_value_by_date(start, end, ticker="KOSDAQ")
+        with span("krx_flow", "fetch", ticker="KOSDAQ") as sp:
+            df2 = stock.get_market_trading_value_by_date(start, end, ticker="KOSDAQ", detail=detail)
+            sp["rows"] = len(df2)
         df = df2.copy()
     elif market.upper() == "BOTH":
-        df2 = stock.get_market_trading_value_by_date(start, end, ticker="KOSDAQ")
+        with span("krx_flow", "fetch", ticker="KOSDAQ") as sp:
+            df2 = stock.get_market_trading_value_by_date(start, end, ticker="KOSDAQ", detail=detail)
+            sp["rows"] = len(df2)
         # Combine based on common date index
         df = df1.add(df2, fill_value=0)
     else:
         raise ValueError("market must be one of 'KOSPI' | 'KOSDAQ' | 'BOTH'")
     
+    return df
+
+def fetch_market_frames(start: str, end: str | None = None, detail: bool = True) -> dict:
+    """
+    Download KOSPI and KOSDAQ once and return the frames every KRX flow
+    sheet is derived from (Kospi_Liquidity and Kospi_Investor_Flow).
+    
+    Args:
+        start (str): Start date in YYYYMMDD format
+        end (str): End date in YYYYMMDD format (default: today)
+        detail (bool): Split institutions (foreign totals are derived either way)
+    
+    Returns:
+        dict: {"KOSPI": frame, "BOTH": KOSPI + KOSDAQ frame}
+    """
+    if end is None:
+        end = datetime.today().strftime("%Y%m%d")
+    stock = krx_stock()
+    frames = {}
+    for ticker in ("KOSPI", "KOSDAQ"):
+        with span("krx_flow", "fetch", ticker=ticker, detail=detail) as sp:
+            frames[ticker] = stock.get_market_trading_value_by_date(start, end, ticker=ticker, detail=detail)
+            sp["rows"] = len(frames[ticker])
+    return {"KOSPI": frames["KOSPI"], "BOTH": frames["KOSPI"].add(frames["KOSDAQ"], fill_value=0)}
+
+def foreign_net_buying(df: pd.DataFrame) -> pd.Series:
+    """
+    Foreign net buying (KRW) from either layout of fetch_trading_value:
+    "외국인합계" in the summary layout, "외국인" + "기타외국인" with detail=True.
+    """
+    if "외국인합계" in df.columns:
+        return df["외국인합계"].astype("float")
+    s = df["외국인"].astype("float")
+    if "기타외국인" in df.columns:
+        s = s + df["기타외국인"].astype("float")
+    return s
+
+def compute_foreign_flow_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute the foreign net buying metrics from a KRX trading value frame.
+    
+    Args:
+        df (pd.DataFrame): Output of fetch_trading_value (summary or detail layout)
+    
+    Returns:
+        pd.DataFrame: Foreign net buying data with multiple metrics
+    """
     # Extract foreign investor net buying amount (unit: KRW)
-    s = df["외국인합계"].astype("float")
+    s = foreign_net_buying(df)
     out = pd.DataFrame(index=df.index)
     out.index.name = "Date"
     out["Foreign Net Buying (Daily)"] = s
@@ -44,38 +118,249 @@ def get_foreign_flow(start: str, end: str, market: str = "KOSPI") -> pd.DataFram
     out["Foreign Net Buying (YTD Cumulative)"] = y.groupby("Year")["Foreign Net Buying (Daily)"].cumsum()
     
     # Recent 20 trading days (approximately 1 month) cumulative
-    out["Foreign Net Buying (Recent 20 Trading Days Cumulative)"] = (
-        out["Foreign Net Buying (Daily)"].rolling(window=20, min_periods=20).sum()
-    )
+    values = s.to_numpy()
+    sum20 = ind.rolling_sum(values, 20)
+    out["Foreign Net Buying (Recent 20 Trading Days Cumulative)"] = sum20
     
     # Z-score calculation
     # Based on entire historical period (most accurate)
-    historical_mean = out["Foreign Net Buying (Daily)"].mean()
-    historical_std = out["Foreign Net Buying (Daily)"].std(ddof=0)
-    out["Daily Net Buying Z-score (Historical)"] = (out["Foreign Net Buying (Daily)"] - historical_mean) / historical_std
+    out["Daily Net Buying Z-score (Historical)"] = ind.zscore(values, ddof=0)
     
     # Z-score of recent 20 trading days cumulative (recommended to compare with 60D distribution)
-    roll_mean_60_sum20 = out["Foreign Net Buying (Recent 20 Trading Days Cumulative)"].rolling(60, min_periods=60).mean()
-    roll_std_60_sum20  = out["Foreign Net Buying (Recent 20 Trading Days Cumulative)"].rolling(60, min_periods=60).std(ddof=0)
-    out["Recent 20 Trading Days Cumulative Z-score (60D)"] = (
-        (out["Foreign Net Buying (Recent 20 Trading Days Cumulative)"] - roll_mean_60_sum20) / roll_std_60_sum20
-    )
+    out["Recent 20 Trading Days Cumulative Z-score (60D)"] = ind.rolling_zscore(sum20, 60, ddof=0)
     
     return out.sort_index()
 
-def build_foreign_flow_dashboard(start: str, end: str):
+# ==================== Streaming (yearly chunks) ====================
+FLOW_STORE_DIR = "krx_flow"   # <FLOW_STORE_DIR>/<market>/<year>.csv
+SUM_WINDOW = 20               # recent trading days cumulative
+Z_WINDOW = 60                 # distribution window for the cumulative z-score
+
+def _rolling_flow_metrics(daily: np.ndarray, carry: dict | None = None):
+    """
+    Rolling metrics of one chunk, continuing from the previous chunk's tail.
+    
+    Args:
+        daily (np.ndarray): Daily net buying values of the chunk
+        carry (dict | None): {"daily": last SUM_WINDOW-1 values,
+                              "sum20": last Z_WINDOW-1 cumulative values}
+    
+    Returns:
+        tuple: (sum20, z60, new carry) - same length as daily
+    """
+    carry = carry or {"daily": np.empty(0), "sum20": np.empty(0)}
+    ext = np.concatenate([carry["daily"], daily])
+    sum20 = ind.rolling_sum(ext, SUM_WINDOW)[len(carry["daily"]):]
+    ext_sum = np.concatenate([carry["sum20"], sum20])
+    z60 = ind.rolling_zscore(ext_sum, Z_WINDOW, ddof=0)[len(carry["sum20"]):]
+    new_carry = {"daily": ext[-(SUM_WINDOW - 1):], "sum20": ext_sum[-(Z_WINDOW - 1):]}
+    return sum20, z60, new_carry
+
+PARTITION_MANIFEST = "_partitions.json"   # {year: {"start", "end"}} range each partition was fetched for
+PARTITION_SLACK = pd.Timedelta(days=7)    # holidays at either end of a legacy partition
+
+def _load_partition_manifest(part_dir: str) -> dict:
+    path = os.path.join(part_dir, PARTITION_MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def _save_partition_manifest(part_dir: str, manifest: dict) -> None:
+    path = os.path.join(part_dir, PARTITION_MANIFEST)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+def _partition_complete(out: pd.DataFrame, entry: dict | None,
+                        chunk_start: pd.Timestamp, chunk_end: pd.Timestamp) -> bool:
+    """
+    Whether a stored partition covers [chunk_start, chunk_end].
+    
+    Partitions listed in the manifest are checked against the range they were
+    fetched for, so a year written by a run that stopped mid-year is refetched.
+    Partitions from before the manifest fall back to their first/last dates.
+    """
+    if out.empty:
+        return False
+    if entry is not None:
+        return pd.Timestamp(entry["start"]) <= chunk_start and pd.Timestamp(entry["end"]) >= chunk_end
+    return out.index[0] <= chunk_start + PARTITION_SLACK and out.index[-1] >= chunk_end - PARTITION_SLACK
+
+def _merge_moments(stats: tuple, values: np.ndarray) -> tuple:
+    """Combine running (count, mean, M2) with a new chunk (Chan et al.)."""
+    values = values[~np.isnan(values)]
+    n_b = len(values)
+    if n_b == 0:
+        return stats
+    n_a, mean_a, m2_a = stats
+    mean_b = values.mean()
+    m2_b = ((values - mean_b) ** 2).sum()
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    return n, mean_a + delta * n_b / n, m2_a + m2_b + delta * delta * n_a * n_b / n
+
+def stream_foreign_flow(start: str, end: str | None = None, market: str = "KOSPI",
+                        store_dir: str = FLOW_STORE_DIR, resume: bool = True) -> list:
+    """
+    Compute the foreign flow metrics one calendar year at a time and write
+    each year to its own partition file, so memory stays flat over any range.
+    
+    Rolling windows continue across years through a carried tail
+    (last 19 daily values, last 59 cumulative values). The YTD cumulative
+    resets at each year anyway. The historical z-score needs the full-period
+    mean/std, so it is filled in a second pass over the partitions.
+    
+    Args:
+        start (str): Start date in YYYYMMDD format
+        end (str): End date in YYYYMMDD format (default: today)
+        market (str): Market type - "KOSPI" | "KOSDAQ" | "BOTH"
+        store_dir (str): Root directory of the yearly partitions
+        resume (bool): Reuse partitions of completed years instead of refetching
+            (only if the partition was fetched through the end of its year)
+    
+    Returns:
+        list: Paths of the written partitions (oldest first)
+    """
+    if end is None:
+        end = datetime.today().strftime("%Y%m%d")
+    start_ts, end_ts = pd.Timestamp(start), pd.Timestamp(end)
+    part_dir = os.path.join(store_dir, market.upper())
+    os.makedirs(part_dir, exist_ok=True)
+    
+    carry = None
+    stats = (0, 0.0, 0.0)
+    paths = []
+    manifest = _load_partition_manifest(part_dir)
+    
+    # Pass 1: fetch -> rolling metrics -> write, one year at a time
+    for year in range(start_ts.year, end_ts.year + 1):
+        path = os.path.join(part_dir, f"{year}.csv")
+        chunk_start = max(start_ts, pd.Timestamp(year, 1, 1))
+        chunk_end = min(end_ts, pd.Timestamp(year, 12, 31))
+        
+        out = None
+        if resume and year < end_ts.year and os.path.exists(path):
+            out = pd.read_csv(path, index_col="Date", parse_dates=True)
+            if not _partition_complete(out, manifest.get(str(year)), chunk_start, chunk_end):
+                print(f"{market} {year}: partition incomplete, refetching")
+                out = None
+        
+        if out is not None:
+            daily = out["Foreign Net Buying (Daily)"].to_numpy(dtype=float)
+            sum20 = out["Foreign Net Buying (Recent 20 Trading Days Cumulative)"].to_numpy(dtype=float)
+            # Rebuild the carried tail from the stored partition
+            prev = carry or {"daily": np.empty(0), "sum20": np.empty(0)}
+            carry = {
+                "daily": np.concatenate([prev["daily"], daily])[-(SUM_WINDOW - 1):],
+                "sum20": np.concatenate([prev["sum20"], sum20])[-(Z_WINDOW - 1):],
+            }
+        else:
+            df = fetch_trading_value(chunk_start.strftime("%Y%m%d"), chunk_end.strftime("%Y%m%d"), market)
+            if df.empty:
+                continue
+            with span("krx_flow", "compute", market=market, year=year) as sp:
+                daily = foreign_net_buying(df).to_numpy()
+                sum20, z60, carry = _rolling_flow_metrics(daily, carry)
+                out = pd.DataFrame({
+                    "Foreign Net Buying (Daily)": daily,
+                    "Foreign Net Buying (YTD Cumulative)": np.cumsum(daily),
+                    "Foreign Net Buying (Recent 20 Trading Days Cumulative)": sum20,
+                    "Daily Net Buying Z-score (Historical)": np.nan,
+                    "Recent 20 Trading Days Cumulative Z-score (60D)": z60,
+                }, index=pd.DatetimeIndex(df.index, name="Date"))
+                sp["rows"] = len(out)
+            with span("krx_flow", "write", market=market, year=year) as sp:
+                out.to_csv(path, encoding="utf-8-sig", date_format="%Y-%m-%d")
+                sp["bytes"] = os.path.getsize(path)
+            manifest[str(year)] = {"start": chunk_start.strftime("%Y-%m-%d"),
+                                   "end": chunk_end.strftime("%Y-%m-%d")}
+            _save_partition_manifest(part_dir, manifest)
+        
+        stats = _merge_moments(stats, daily)
+        paths.append(path)
+        print(f"{market} {year}: {len(out)} rows")
+    
+    # Pass 2: historical z-score with the full-period mean/std (ddof=0)
+    n, mean, m2 = stats
+    std = np.sqrt(m2 / n) if n else np.nan
+    for path in paths:
+        with span("krx_flow", "write", market=market, step="historical_z"):
+            out = pd.read_csv(path, index_col="Date", parse_dates=True)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                out["Daily Net Buying Z-score (Historical)"] = (
+                    (out["Foreign Net Buying (Daily)"] - mean) / std
+                )
+            out.to_csv(path, encoding="utf-8-sig", date_format="%Y-%m-%d")
+    
+    return paths
+
+def load_foreign_flow(market: str = "KOSPI", store_dir: str = FLOW_STORE_DIR,
+                      start: str | None = None, end: str | None = None) -> pd.DataFrame:
+    """
+    Read the yearly partitions written by stream_foreign_flow.
+    
+    Args:
+        market (str): Market type - "KOSPI" | "KOSDAQ" | "BOTH"
+        store_dir (str): Root directory of the yearly partitions
+        start (str | None): Only read years from this date (YYYYMMDD)
+        end (str | None): Only read years up to this date (YYYYMMDD)
+    
+    Returns:
+        pd.DataFrame: Same columns as get_foreign_flow
+    """
+    paths = sorted(glob.glob(os.path.join(store_dir, market.upper(), "*.csv")))
+    lo = pd.Timestamp(start).year if start else None
+    hi = pd.Timestamp(end).year if end else None
+    paths = [p for p in paths
+             if (lo is None or int(os.path.basename(p)[:4]) >= lo)
+             and (hi is None or int(os.path.basename(p)[:4]) <= hi)]
+    if not paths:
+        return pd.DataFrame()
+    out = pd.concat([pd.read_csv(p, index_col="Date", parse_dates=True) for p in paths])
+    if start or end:
+        out = out.loc[start and pd.Timestamp(start):end and pd.Timestamp(end)]
+    return out
+
+def get_foreign_flow(start: str, end: str, market: str = "KOSPI") -> pd.DataFrame:
+    """
+    Returns a time series of daily foreign investor net buying volume in KRW.
+    
+    Args:
+        start (str): Start date in YYYYMMDD format
+        end (str): End date in YYYYMMDD format
+        market (str): Market type - "KOSPI" | "KOSDAQ" | "BOTH"
+    
+    Returns:
+        pd.DataFrame: Foreign net buying data with multiple metrics
+    """
+    df = fetch_trading_value(start, end, market)
+    with span("krx_flow", "compute", market=market) as sp:
+        out = compute_foreign_flow_metrics(df)
+        sp["rows"] = len(out)
+    return out
+
+def build_foreign_flow_dashboard(start: str, end: str, frames: dict | None = None):
     """
     Build a comprehensive dashboard with both KOSPI and KOSPI+KOSDAQ views.
     
     Args:
         start (str): Start date in YYYYMMDD format
         end (str): End date in YYYYMMDD format
+        frames (dict | None): Output of fetch_market_frames (downloaded here if None)
     
     Returns:
         pd.DataFrame: Combined dashboard with dual market perspectives
     """
-    kospi = get_foreign_flow(start, end, market="KOSPI")
-    both  = get_foreign_flow(start, end, market="BOTH")
+    if frames is None:
+        frames = fetch_market_frames(start, end, detail=False)
+    with span("krx_flow", "compute", market="KOSPI") as sp:
+        kospi = compute_foreign_flow_metrics(frames["KOSPI"])
+        sp["rows"] = len(kospi)
+    with span("krx_flow", "compute", market="BOTH") as sp:
+        both = compute_foreign_flow_metrics(frames["BOTH"])
+        sp["rows"] = len(both)
     
     # Add market suffix to column names for distinction
     kospi = kospi.add_suffix(" [KOSPI]")
@@ -106,23 +391,43 @@ def save_csv(df, path):
             print(f"Save completed: {file_path}")
             return
 
-# Usage example
-start = "19981207"
-end   = datetime.today().strftime("%Y%m%d")
-
-df_foreign = build_foreign_flow_dashboard(start, end)
-kospi_liquidity = df_foreign
-
-# Convert index to string format (only once!)
-kospi_liquidity.index = kospi_liquidity.index.strftime("%Y-%m-%d")
+def build_kospi_liquidity(start: str = "19981207", end: str | None = None,
+                          frames: dict | None = None) -> pd.DataFrame:
+    """
+    Build the Kospi_Liquidity sheet frame with a "YYYY-MM-DD" string index.
+    
+    Args:
+        start (str): Start date in YYYYMMDD format
+        end (str): End date in YYYYMMDD format (default: today)
+        frames (dict | None): Output of fetch_market_frames, shared with the
+            investor flow sheet (downloaded here if None)
+    
+    Returns:
+        pd.DataFrame: Dashboard ready to be written to the workbook
+    """
+    if end is None:
+        end = datetime.today().strftime("%Y%m%d")
+    
+    kospi_liquidity = build_foreign_flow_dashboard(start, end, frames)
+    
+    # Convert index to string format (only once!)
+    kospi_liquidity.index = kospi_liquidity.index.strftime("%Y-%m-%d")
+    return kospi_liquidity
 
-# Save to Excel file
-# Please change the path
-path = r"C:\Users\jesst\Agora\FX\FX_automation.xlsx"
-with pd.ExcelWriter(path, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
-    kospi_liquidity.to_excel(writer, sheet_name="Kospi_Liquidity", index=True)
+def main(excel_path: str = EXCEL_PATH):
+    kospi_liquidity = build_kospi_liquidity()
+    
+    # Save to Excel file
+    publish_sheets(excel_path, {"Kospi_Liquidity": kospi_liquidity})
+    print("Kospi_Liquidity data saved successfully!")
 
-print("Kospi_Liquidity data saved successfully!")
+if __name__ == "__main__":
+    if "--stream" in sys.argv:
+        # Yearly partitions only (no workbook write)
+        for market in ("KOSPI", "BOTH"):
+            stream_foreign_flow("19981207", market=market)
+    else:
+        main()
 
 # output column
 ## Foreign Net Buying (Daily) [KOSPI]
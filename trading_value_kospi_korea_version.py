@@ -1,15 +1,17 @@
 # 외국인 증시 순매수 (금액 기준)
 import pandas as pd
 from datetime import datetime
-from pykrx import stock
 import os
 import inspect
+from workbook import EXCEL_PATH, publish_sheets
 
 def get_foreign_flow(start: str, end: str, market: str = "KOSPI") -> pd.DataFrame:
     """
     외국인 일별 순매수 금액 시계열을 반환.
     market: "KOSPI" | "KOSDAQ" | "BOTH"
     """
+    from pykrx import stock
+    
     # 거래대금(금액) 기준으로 변경
     df1 = stock.get_market_trading_value_by_date(start, end, ticker="KOSPI")
     
@@ -85,23 +87,28 @@ def save_csv(df, path):
             print(f"저장완료: {file_path}")
             return
 
-# 사용 예시
-start = "19981207"
-end   = datetime.today().strftime("%Y%m%d")
-
-df_foreign = build_foreign_flow_dashboard(start, end)
-Kospi_Liquidity = df_foreign
-
-# 인덱스를 문자열로 변환
-Kospi_Liquidity.index = Kospi_Liquidity.index.strftime("%Y-%m-%d")
-
-# Excel 파일 저장
-path = r"C:\Users\jesst\Agora\FX\FX_automation.xlsx"
-with pd.ExcelWriter(path, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
-    Kospi_Liquidity.to_excel(writer, sheet_name="Kospi_Liquidity", index=True)
+def build_kospi_liquidity(start="19981207", end=None):
+    """
+    Kospi_Liquidity 시트에 기록할 대시보드 (인덱스는 "YYYY-MM-DD" 문자열).
+    """
+    if end is None:
+        end = datetime.today().strftime("%Y%m%d")
+    
+    Kospi_Liquidity = build_foreign_flow_dashboard(start, end)
+    
+    # 인덱스를 문자열로 변환
+    Kospi_Liquidity.index = Kospi_Liquidity.index.strftime("%Y-%m-%d")
+    return Kospi_Liquidity
 
-print("Kospi_Liquidity 데이터 저장 완료")
+def main(excel_path=EXCEL_PATH):
+    Kospi_Liquidity = build_kospi_liquidity()
+    
+    # Excel 파일 저장
+    publish_sheets(excel_path, {"Kospi_Liquidity": Kospi_Liquidity})
+    print("Kospi_Liquidity 데이터 저장 완료")
 
+if __name__ == "__main__":
+    main()
 
 # Columns (컬럼):
 
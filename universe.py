@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+FX 유니버스 레지스트리
+
+심볼, 표시명, 지역, 표시 순서, 호가 방식, 수집 경로를 한 표로 관리한다.
+수집 목록, 이름 변환, 역수 변환 대상, 지역별 행 위치(정수 인덱스)는 모두
+이 표에서 만들어지므로 지역이나 심볼 추가는 UNIVERSE에 한 줄을 넣으면 된다.
+
+호가 방식 (quote):
+    direct   심볼 값이 USD/XXX (예: JPY=X)
+    inverse  심볼 값이 XXX/USD (예: EURUSD=X) -> 역수를 취해 USD/XXX로 표시
+
+수집 경로 (route):
+    currency  obb.currency.price.historical
+    index     obb.index.price.historical ('=X'를 붙이지 않음)
+"""
+import numpy as np
+
+# symbol, 표시명, 지역, 지역 내 표시 순서, 호가 방식, 수집 경로
+UNIVERSE = [
+    ("DX-Y.NYB", "DXY",     "g10",  0, "direct",  "index"),
+    ("EURUSD=X", "USD_EUR", "g10",  1, "inverse", "currency"),
+    ("JPY=X",    "USD_JPY", "g10",  2, "direct",  "currency"),
+    ("GBPUSD=X", "USD_GBP", "g10",  3, "inverse", "currency"),
+    ("CAD=X",    "USD_CAD", "g10",  4, "direct",  "currency"),
+    ("SEK=X",    "USD_SEK", "g10",  5, "direct",  "currency"),
+    ("CHF=X",    "USD_CHF", "g10",  6, "direct",  "currency"),
+    ("NOK=X",    "USD_NOK", "g10",  7, "direct",  "currency"),
+    ("AUDUSD=X", "USD_AUD", "g10",  8, "inverse", "currency"),
+    ("NZDUSD=X", "USD_NZD", "g10",  9, "inverse", "currency"),
+    ("CNY=X",    "USD_CNY", "asia", 0, "direct",  "currency"),
+    ("INR=X",    "USD_INR", "asia", 1, "direct",  "currency"),
+    ("KRW=X",    "USD_KRW", "asia", 2, "direct",  "currency"),
+    ("IDR=X",    "USD_IDR", "asia", 3, "direct",  "currency"),
+    ("TWD=X",    "USD_TWD", "asia", 4, "direct",  "currency"),
+    ("THB=X",    "USD_THB", "asia", 5, "direct",  "currency"),
+    ("SGD=X",    "USD_SGD", "asia", 6, "direct",  "currency"),
+    ("MYR=X",    "USD_MYR", "asia", 7, "direct",  "currency"),
+    ("PHP=X",    "USD_PHP", "asia", 8, "direct",  "currency"),
+    ("HKD=X",    "USD_HKD", "asia", 9, "direct",  "currency"),
+]
+
+QUOTES = ("direct", "inverse")
+ROUTES = ("currency", "index")
+
+def _raw_name(name, quote):
+    """수집 직후 이름 (inverse는 XXX_USD)"""
+    if quote == "inverse":
+        base, ccy = name.split("_", 1)
+        return f"{ccy}_{base}"
+    return name
+
+class Universe:
+    def __init__(self, entries=UNIVERSE):
+        """
+        Parameters:
+        -----------
+        entries : list of tuple
+            (symbol, 표시명, 지역, 표시 순서, 호가 방식, 수집 경로)
+        """
+        self.entries = list(entries)
+        for symbol, name, region, order, quote, route in self.entries:
+            if quote not in QUOTES:
+                raise ValueError(f"{symbol}: quote must be one of {QUOTES}")
+            if route not in ROUTES:
+                raise ValueError(f"{symbol}: route must be one of {ROUTES}")
+        names = [e[1] for e in self.entries]
+        if len(set(names)) != len(names):
+            raise ValueError("표시명이 중복되었습니다.")
+
+        # 심볼 -> 수집 직후 이름 (clean 전 행 이름)
+        self.rename_map = {e[0]: _raw_name(e[1], e[4]) for e in self.entries}
+        # 역수 변환 대상 (수집 직후 이름, 표시명)
+        self.inversions = [(_raw_name(e[1], e[4]), e[1]) for e in self.entries if e[4] == "inverse"]
+        # 지역별 표시명 (지역은 처음 나온 순서, 통화는 표시 순서대로)
+        self.regions = {}
+        for symbol, name, region, order, quote, route in sorted(self.entries, key=lambda e: e[3]):
+            self.regions.setdefault(region, []).append(name)
+        self.regions = {region: self.regions[region] for region in dict.fromkeys(e[2] for e in self.entries)}
+
+    def symbols(self, route=None):
+        """수집할 심볼 목록 (route 지정 시 해당 경로만, 정렬)"""
+        return sorted(e[0] for e in self.entries if route is None or e[5] == route)
+
+    def order(self, region):
+        """지역의 표시명 목록 (표시 순서대로)"""
+        return list(self.regions.get(region, []))
+
+    def positions(self, names):
+        """
+        지역별 행 위치 (정수 인덱스) 계산
+
+        Parameters:
+        -----------
+        names : sequence
+            지표 배열의 행 이름 (예: calculate_basic_metrics 결과의 Currency)
+
+        Returns:
+        --------
+        dict
+            {지역: np.ndarray}. 표시 순서대로이며 names에 없는 통화는 제외
+        """
+        loc = {name: i for i, name in enumerate(names)}
+        return {
+            region: np.array([loc[n] for n in members if n in loc], dtype=np.intp)
+            for region, members in self.regions.items()
+        }
+
+# 기본 레지스트리
+FX_UNIVERSE = Universe()
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+구체화 뷰 (materialized view) 캐시
+
+대시보드 조각(지역별 표, KRW/DXY 행, 기간 수익률 표 등)을 결과와 함께
+그 결과가 의존하는 입력 지문(행 값 + 날짜 축)으로 저장해 두고,
+의존하는 행이나 날짜가 바뀐 뷰만 다시 만든다. 바뀌지 않은 뷰는 캐시에서 바로 돌려준다.
+
+구성:
+    공유 계산 (define_shared)   행마다 독립인 계산 (예: calculate_basic_metrics).
+                                결과를 행 단위로 캐시하므로 바뀐 행만 다시 계산
+    뷰 (define)                 행 목록 + (공유 계산 조각 또는 build 함수)
+
+지문:
+    행 지문 = sha1(날짜 축 해시, 행 이름, 행 값)
+    계산 지문 = sha1(함수 이름, 바이트코드, 상수, 참조 이름) + 버전
+    뷰 지문 = sha1(뷰 이름, 버전, 계산 지문, 의존 행 지문들)
+
+계산 지문은 함수 본문이 바뀌면 달라지지만, 함수가 호출하는 다른 함수의 변경은
+알 수 없으므로 그런 변경 뒤에는 version을 올린다.
+
+cache_dir를 지정하면 뷰 결과와 지문을 <cache_dir>/<뷰>.pkl, manifest.json에 저장해
+다음 실행에서도 바뀌지 않은 뷰를 다시 계산하지 않는다.
+
+사용 예:
+    store = ViewStore()
+    store.define_shared("metrics", calculate_basic_metrics, key="Currency")
+    store.define("asia", ["USD_CNY", "USD_KRW"], shared="metrics")
+    views = store.refresh(fx_matrix_clean)      # {'asia': DataFrame}
+"""
+import hashlib
+import json
+import os
+import types
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import span
+
+MANIFEST_FILE = "manifest.json"
+
+def _axis_hash(axis):
+    return pd.util.hash_pandas_object(pd.Index(axis)).to_numpy().tobytes()
+
+def _code_digest(code, h):
+    h.update(code.co_code)
+    h.update(repr(code.co_names).encode("utf-8"))
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _code_digest(const, h)  # 중첩 함수/람다 (repr에 메모리 주소가 들어가므로 재귀)
+        else:
+            h.update(repr(const).encode("utf-8"))
+
+def computation_id(func, version=1):
+    """함수 이름/본문과 버전으로 만든 계산 지문 (실행 간 안정적)"""
+    h = hashlib.sha1(f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', func)}|{version}".encode("utf-8"))
+    code = getattr(func, "__code__", None)
+    if code is not None:
+        _code_digest(code, h)
+    return h.hexdigest()
+
+class ViewStore:
+    def __init__(self, cache_dir=None):
+        """
+        Parameters:
+        -----------
+        cache_dir : str or None
+            뷰 결과를 저장할 디렉토리 (None이면 메모리에만 보관)
+        """
+        self.cache_dir = cache_dir
+        self._shared = {}   # 이름 -> {'func', 'key', 'fp': {행: 지문}, 'frame': DataFrame}
+        self._views = {}    # 이름 -> {'rows', 'shared', 'build', 'version'}
+        self._cache = {}    # 이름 -> (지문, DataFrame)
+        self._loaded = False
+        self.stats = {"hits": 0, "misses": 0, "rows_computed": 0}
+
+    # ---------- 정의 ----------
+    def define_shared(self, name, func, key=None, version=1):
+        """
+        행 단위 공유 계산 등록
+
+        Parameters:
+        -----------
+        func : callable
+            행 부분집합 DataFrame -> 행마다 한 줄인 DataFrame (행 순서 유지).
+            각 행의 결과가 다른 행에 의존하지 않아야 한다
+        key : str or None
+            결과에서 행 이름이 들어 있는 컬럼 (None이면 결과 인덱스가 행 이름)
+        version : int
+            func가 호출하는 로직(지표 함수, 기간 정의 등)을 바꾸면 올려서 캐시를 무효화
+        """
+        self._shared[name] = {"func": func, "key": key, "fp": {}, "frame": None,
+                              "id": computation_id(func, version)}
+
+    def define(self, name, rows=None, shared=None, build=None, version=1):
+        """
+        뷰 등록
+
+        Parameters:
+        -----------
+        rows : list or None
+            의존 행 (표시 순서). None이면 모든 행. 입력에 없는 행은 건너뜀
+        shared : str or None
+            공유 계산 이름. 지정하면 그 결과에서 rows를 순서대로 뽑은 표가 뷰
+        build : callable or None
+            shared가 없을 때 rows 부분집합 DataFrame -> 뷰 DataFrame
+        version : int
+            build 로직을 바꾸면 올려서 기존 캐시를 무효화
+        """
+        if (shared is None) == (build is None):
+            raise ValueError("shared와 build 중 하나만 지정해야 합니다.")
+        if shared is not None and shared not in self._shared:
+            raise ValueError(f"등록되지 않은 공유 계산: {shared}")
+        computation = self._shared[shared]["id"] if shared is not None else computation_id(build)
+        self._views[name] = {"rows": rows, "shared": shared, "build": build, "version": version,
+                             "id": computation}
+
+    # ---------- 디스크 캐시 ----------
+    def _view_path(self, name):
+        return os.path.join(self.cache_dir, f"{name}.pkl")
+
+    def _load(self):
+        self._loaded = True
+        if not self.cache_dir:
+            return
+        path = os.path.join(self.cache_dir, MANIFEST_FILE)
+        if not os.path.exists(path):
+            return
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        for name, fp in manifest.items():
+            if os.path.exists(self._view_path(name)):
+                self._cache[name] = (fp, pd.read_pickle(self._view_path(name)))
+
+    def _save(self, names):
+        if not self.cache_dir or not names:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        for name in names:
+            self._cache[name][1].to_pickle(self._view_path(name))
+        manifest = {name: fp for name, (fp, _) in self._cache.items()}
+        tmp = os.path.join(self.cache_dir, f"{MANIFEST_FILE}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp, os.path.join(self.cache_dir, MANIFEST_FILE))
+
+    # ---------- 갱신 ----------
+    def _row_fingerprints(self, matrix):
+        date_hash = _axis_hash(matrix.columns)
+        values = np.ascontiguousarray(matrix.to_numpy(dtype=float))
+        fps = {}
+        for name, row in zip(matrix.index, values):
+            h = hashlib.sha1(date_hash)
+            h.update(str(name).encode("utf-8"))
+            h.update(row.tobytes())
+            fps[name] = h.hexdigest()
+        return fps
+
+    def _refresh_shared(self, name, matrix, rows, row_fps):
+        """공유 계산에서 지문이 바뀐 행만 다시 계산"""
+        sh = self._shared[name]
+        stale = [r for r in rows if sh["fp"].get(r) != row_fps[r]]
+        if not stale:
+            return
+        with span("views", "compute", shared=name) as sp:
+            new = sh["func"](matrix.loc[stale])
+            if sh["key"] is not None:
+                new = new.set_index(sh["key"], drop=False)
+            sp["rows"] = len(new)
+        self.stats["rows_computed"] += len(new)
+        frame = sh["frame"]
+        sh["frame"] = new if frame is None else pd.concat([frame.drop(index=stale, errors="ignore"), new])
+        for r in stale:
+            sh["fp"][r] = row_fps[r]
+
+    def refresh(self, matrix, names=None):
+        """
+        입력 행렬 기준으로 뷰를 최신화해 반환
+
+        Parameters:
+        -----------
+        matrix : pd.DataFrame
+            행=이름 (예: 통화), 열=날짜인 입력
+        names : list or None
+            필요한 뷰 (None이면 전부)
+
+        Returns:
+        --------
+        dict
+            {뷰 이름: DataFrame} (캐시 결과는 복사하지 않으므로 수정하지 말 것)
+        """
+        if not self._loaded:
+            self._load()
+        names = list(self._views) if names is None else names
+        row_fps = self._row_fingerprints(matrix)
+        present = set(matrix.index)
+
+        out, rebuilt = {}, []
+        for name in names:
+            view = self._views[name]
+            rows = list(matrix.index) if view["rows"] is None else [r for r in view["rows"] if r in present]
+            h = hashlib.sha1(f"{name}|{view['version']}|{view['id']}|{len(rows)}".encode("utf-8"))
+            for r in rows:
+                h.update(row_fps[r].encode("ascii"))
+            fp = h.hexdigest()
+
+            cached = self._cache.get(name)
+            if cached is not None and cached[0] == fp:
+                self.stats["hits"] += 1
+                out[name] = cached[1]
+                continue
+
+            self.stats["misses"] += 1
+            if view["shared"] is not None:
+                self._refresh_shared(view["shared"], matrix, rows, row_fps)
+                result = self._shared[view["shared"]]["frame"].loc[rows].reset_index(drop=True)
+            else:
+                with span("views", "compute", view=name) as sp:
+                    result = view["build"](matrix.loc[rows])
+                    sp["rows"] = len(result)
+            self._cache[name] = (fp, result)
+            out[name] = result
+            rebuilt.append(name)
+
+        self._save(rebuilt)
+        return out
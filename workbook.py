@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import os
+import pandas as pd
+from instrumentation import span
+import data_catalog
+
+EXCEL_PATH = r"C:\Users\jesst\Agora\FX\FX_automation.xlsx"
+
+# 저장 시 data_catalog에 상태를 기록할 시트 (Swap_Point는 CSV 기준으로 기록)
+SHEET_DATASETS = {
+    "Kospi": "kospi",
+    "IRS": "irs",
+    "CRS": "crs",
+    "Kospi_Liquidity": "krx_flow",
+    "FX_Data": "fx",
+}
+
+def _apply_number_formats(ws, df, formats, index_cols):
+    """
+    데이터 셀에 Excel 표시 형식 적용
+
+    formats의 키는 컬럼명이며 '*'는 모든 데이터 컬럼을 뜻한다.
+    """
+    from openpyxl.utils import get_column_letter
+
+    default = formats.get("*")
+    last_row = len(df) + 1  # 1행은 헤더
+    if last_row < 2:
+        return
+    for pos, col in enumerate(df.columns):
+        fmt = formats.get(col, default)
+        if fmt is None:
+            continue
+        letter = get_column_letter(index_cols + pos + 1)
+        for (cell,) in ws[f"{letter}2:{letter}{last_row}"]:
+            cell.number_format = fmt
+
+def publish_sheets(excel_path, sheets, number_formats=None, catalog_file=data_catalog.CATALOG_FILE):
+    """
+    여러 시트를 한 번의 워크북 열기/저장으로 기록하는 함수
+
+    Parameters:
+    -----------
+    excel_path : str
+        Excel 파일 경로
+    sheets : dict
+        {시트명: DataFrame}. 기본 RangeIndex가 아닌 인덱스는 함께 기록
+    number_formats : dict or None
+        {시트명: {컬럼명: Excel 표시 형식}} (예: {'g10': {'YTD(%)': '0.00"%"'}}).
+        값은 숫자로 기록하고 표시 형식만 셀에 지정한다. '*'는 모든 데이터 컬럼
+    catalog_file : str or None
+        SHEET_DATASETS 시트 상태를 기록할 data_catalog 파일 (None이면 기록하지 않음).
+        운영 워크북이 아닌 파일(벤치마크, 테스트)에 쓸 때는 별도 경로나 None을 넘긴다
+    """
+    sheets = {name: df for name, df in sheets.items() if df is not None}
+    number_formats = number_formats or {}
+    if not sheets:
+        print("저장할 시트가 없습니다.")
+        return
+
+    with span("workbook", "write", sheets=list(sheets)) as sp:
+        with pd.ExcelWriter(excel_path, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
+            for sheet_name, df in sheets.items():
+                write_index = not isinstance(df.index, pd.RangeIndex)
+                df.to_excel(writer, sheet_name=sheet_name, index=write_index)
+                if sheet_name in number_formats:
+                    index_cols = df.index.nlevels if write_index else 0
+                    _apply_number_formats(writer.sheets[sheet_name], df,
+                                          number_formats[sheet_name], index_cols)
+        sp["rows"] = sum(len(df) for df in sheets.values())
+        sp["bytes"] = os.path.getsize(excel_path)
+
+    if catalog_file is not None:
+        for sheet_name, df in sheets.items():
+            if sheet_name in SHEET_DATASETS:
+                data_catalog.record(SHEET_DATASETS[sheet_name], df, path=excel_path,
+                                    catalog_file=catalog_file, sheet=sheet_name)
+
+    print(f"Excel 저장 완료: {', '.join(sheets)}")